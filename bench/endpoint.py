@@ -0,0 +1,111 @@
+"""
+Local HTTP stand-in for the Trends endpoints pytrends calls, served from
+Fixtures through FakeTrendReq. Point RebasedTrendReq (TRENDS_BASE_URL /
+TrendsWorkerConfig.base_url) at FakeTrendsEndpoint.url to run the worker
+pool over real HTTP without touching Google.
+"""
+import json
+import sqlite3
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from bench.fixtures import Fixtures
+from bench.fakes import RequestCounter, FakeTrendReq
+
+class FakeTrendsEndpoint:
+    """
+    /explore/ (cookie), /api/explore (widget tokens) and
+    /api/widgetdata/multiline (interest over time). Each multiline request
+    counts as one 'trends' request.
+    """
+    def __init__(self, fixtures: Fixtures, counter: RequestCounter):
+        self.trends = FakeTrendReq(fixtures, counter)
+        self.counter = counter
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def __enter__(self) -> 'FakeTrendsEndpoint':
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-trends', daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def timeline(self, request: dict) -> dict:
+        self.counter.hit('trends')
+        keywords = [item['keyword'] for item in request['comparisonItem']]
+        df = self.trends.frame(keywords)
+        return {'default': {'timelineData': [
+            {'time': str(int(ts.timestamp())), 'value': [int(row[kw]) for kw in keywords]}
+            for ts, row in df.iterrows()
+        ]}}
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, prefix: str, payload: dict):
+                body = (prefix + json.dumps(payload)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Set-Cookie', 'NID=bench; Path=/')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if url.path.endswith('/api/widgetdata/multiline'):
+                    # pytrends trims 5 characters here
+                    self._send(")]}',", endpoint.timeline(json.loads(params['req'][0])))
+                elif url.path.endswith('/explore/'):
+                    self._send('', {})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if not url.path.endswith('/api/explore'):
+                    self.send_error(404)
+                    return
+                request = json.loads(parse_qs(url.query)['req'][0])
+                widget = {'id': 'TIMESERIES', 'token': 'bench', 'request': request}
+                # ... and 4 characters here
+                self._send(")]}'", {'widgets': [widget]})
+
+        return Handler
+
+class FlakyCache:
+    """
+    Wraps a cache so the first `failures` writes raise the error SQLite gives
+    under write contention. Used to make one pool worker fail mid-task.
+    """
+    def __init__(self, cache, failures: int = 1):
+        self.cache = cache
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+
+    def set(self, *args, **kwargs):
+        self._maybe_fail()
+        return self.cache.set(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        self._maybe_fail()
+        return self.cache.set_many(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
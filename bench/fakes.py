@@ -0,0 +1,157 @@
+"""
+In-process stand-ins for the three external APIs, served from Fixtures.
+Each fake counts the requests it receives; SimClock replaces real sleeping
+in the rate limiters and pacing, so "time slept" is simulated and free.
+"""
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from bench.fixtures import Fixtures, ANCHOR_VOLUME
+
+INDEX_KEYS = ('id', 'status', 'updatedAt', 'averageScore', 'popularity', 'trending', 'favourites')
+DETAIL_KEYS = ('id', 'title', 'synonyms', 'genres', 'relations')
+
+class SimClock:
+    """Monotonic clock that only moves when someone sleeps."""
+    def __init__(self, start: float = 1000.0):
+        self.current = start
+        self.slept = 0.0
+        self.lock = threading.Lock()
+
+    def now(self) -> float:
+        with self.lock:
+            return self.current
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        with self.lock:
+            # Real clocks always move on; a sub-ulp step here would spin the caller forever
+            self.current += max(seconds, 1e-6)
+            self.slept += seconds
+
+class RequestCounter:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def hit(self, api: str):
+        with self.lock:
+            self.counts[api] += 1
+
+class FakeResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.content = json.dumps(payload).encode('utf-8')
+        self.status_code = 200
+        self.headers = {'X-RateLimit-Limit': '90'}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self.payload
+
+class FakeAniListSession:
+    """Answers the aliased index queries and id_in detail queries AniListClient sends."""
+    PAGE_BLOCK = re.compile(r"(p\d+): Page \(page: (\d+), perPage: \$perPage\)\s*\{\s*media \([^)]*sort: \[(\w+)\]")
+
+    def __init__(self, fixtures: Fixtures, counter: RequestCounter):
+        self.counter = counter
+        self.by_id = {item['id']: item for item in fixtures.media}
+        self.sorted = {
+            'TRENDING_DESC': sorted(fixtures.media, key=lambda m: -m['trending']),
+            'POPULARITY_DESC': sorted(fixtures.media, key=lambda m: -m['popularity']),
+        }
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def post(self, url, json=None, timeout=None) -> FakeResponse:
+        self.counter.hit('anilist')
+        query, variables = json['query'], json.get('variables') or {}
+        per_page = variables.get('perPage', 50)
+        if 'id_in' in query:
+            media = [{k: self.by_id[i][k] for k in DETAIL_KEYS} for i in variables['ids'] if i in self.by_id]
+            return FakeResponse({'data': {'Page': {'media': media}}})
+        data = {}
+        for alias, page, sort in self.PAGE_BLOCK.findall(query):
+            start = (int(page) - 1) * per_page
+            data[alias] = {'media': [{k: m[k] for k in INDEX_KEYS}
+                                     for m in self.sorted[sort][start:start + per_page]]}
+        return FakeResponse({'data': data})
+
+class FakeTrendReq:
+    """pytrends TrendReq: weekly interest_over_time scaled like Google (max = 100)."""
+    def __init__(self, fixtures: Fixtures, counter: RequestCounter):
+        self.volumes = fixtures.volumes
+        self.counter = counter
+        self.index = pd.date_range('2025-01-05', periods=52, freq='W')
+        self.growth = 1 + 0.01 * np.arange(52)
+        self.kw_list = []
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        self.kw_list = list(kw_list)
+
+    def _volume(self, keyword: str) -> float:
+        if keyword in self.volumes:
+            return self.volumes[keyword]
+        for suffix, share in ((' manga', 0.3), (' figure', 0.1), (' merch', 0.05)):
+            if keyword.endswith(suffix):
+                return self.volumes.get(keyword[:-len(suffix)], 1.0) * share
+        return ANCHOR_VOLUME  # Anchors ("One Piece", ...)
+
+    def interest_over_time(self) -> pd.DataFrame:
+        self.counter.hit('trends')
+        return self.frame(self.kw_list)
+
+    def frame(self, kw_list: List[str]) -> pd.DataFrame:
+        raw = {kw: self._volume(kw) * self.growth for kw in kw_list}
+        peak = max(values.max() for values in raw.values())
+        df = pd.DataFrame({kw: np.round(values / peak * 100).astype(int) for kw, values in raw.items()},
+                          index=self.index)
+        df['isPartial'] = False
+        return df
+
+class FakeSubreddit:
+    QUOTED = re.compile(r'"([^"]+)"')
+
+    def __init__(self, reddit: 'FakeReddit'):
+        self.reddit = reddit
+
+    def search(self, query, sort='new', time_filter='month', limit=20):
+        self.reddit.counter.hit('reddit')
+        found = []
+        for term in self.QUOTED.findall(query):
+            found.extend(self.reddit.by_title.get(term, []))
+        return [SimpleNamespace(title=p['text'], selftext='', score=p['score']) for p in found[:limit]]
+
+    def new(self, limit=100):
+        return self._listing('submission', limit, lambda p: SimpleNamespace(title=p['text'], selftext='', score=p['score']))
+
+    def comments(self, limit=100):
+        return self._listing('comment', limit, lambda p: SimpleNamespace(body=p['text'], score=p['score']))
+
+    def _listing(self, kind, limit, build):
+        posts = [p for p in self.reddit.posts if p['kind'] == kind][:limit]
+        # One request per 100-item listing page
+        for _ in range(max(1, -(-len(posts) // 100))):
+            self.reddit.counter.hit('reddit')
+        return [build(p) for p in posts]
+
+class FakeReddit:
+    """praw.Reddit: search/new/comments over the fixture posts."""
+    def __init__(self, fixtures: Fixtures, counter: RequestCounter):
+        self.counter = counter
+        self.posts = fixtures.posts
+        self.by_title: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for post in fixtures.posts:
+            self.by_title[post['title']].append(post)
+
+    def subreddit(self, name):
+        return FakeSubreddit(self)
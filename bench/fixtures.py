@@ -0,0 +1,87 @@
+"""
+Deterministic stand-ins for recorded API data: AniList media records,
+Google Trends search volumes and Reddit posts. Generated from a seed so
+every run of a given size sees the same data; save()/load() write and read
+them as JSON so a real recording can be dropped in instead.
+"""
+import json
+import os
+import random
+from typing import Dict, Any, List
+
+STATUSES = ['RELEASING', 'FINISHED', 'HIATUS', 'NOT_YET_RELEASED']
+ANIME_STATUSES = ['FINISHED', 'RELEASING', 'NOT_YET_RELEASED']
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Fantasy', 'Romance', 'Slice of Life', 'Sports']
+WORDS = ['Blade', 'Moon', 'Hero', 'Academy', 'Chronicle', 'Dragon', 'Ghost', 'Summer', 'Shadow', 'Kingdom',
+         'Witch', 'Knight', 'Star', 'Tale', 'Garden', 'Hunter', 'Sky', 'Flower', 'Iron', 'Spirit']
+SYLLABLES = ['ka', 'no', 'shi', 'ma', 'ri', 'to', 'yu', 'ki', 'ha', 're', 'mi', 'sa', 'ko', 'na']
+KANA = 'あいうえおかきくけこさしすせそたちつてとなにぬねのまみむめもやゆよらりるれろわん'
+ANCHOR_VOLUME = 1000.0
+INTENT_WORDS = ['bought', 'figure', 'merch', 'preorder', 'price', 'haul', 'box set']
+
+class Fixtures:
+    def __init__(self, media: List[Dict[str, Any]], volumes: Dict[str, float], posts: List[Dict[str, Any]]):
+        self.media = media          # AniList media records (index + detail fields)
+        self.volumes = volumes      # Trends search volume per keyword
+        self.posts = posts          # Reddit posts: {'kind', 'title', 'text', 'score'}
+
+    @classmethod
+    def generate(cls, n: int, seed: int = 0) -> 'Fixtures':
+        rng = random.Random(seed)
+        media, volumes, posts = [], {}, []
+        for i in range(n):
+            romaji = " ".join(
+                "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+                for _ in range(rng.randint(1, 3))
+            ) + f" {i}"
+            english = (" ".join(rng.sample(WORDS, rng.randint(1, 3))) + f" {i}") if rng.random() < 0.7 else None
+            native = "".join(rng.choice(KANA) for _ in range(rng.randint(3, 8)))
+            popularity = int(rng.paretovariate(1.2) * 1000)
+            edges = []
+            if rng.random() < 0.3:
+                edges.append({'relationType': 'ADAPTATION',
+                              'node': {'type': 'ANIME', 'status': rng.choice(ANIME_STATUSES)}})
+            media.append({
+                'id': 100000 + i,
+                'status': rng.choice(STATUSES),
+                'updatedAt': 1700000000 + rng.randint(0, 10 ** 7),
+                'averageScore': rng.randint(40, 90),
+                'popularity': popularity,
+                'trending': int(rng.expovariate(1 / 20)),
+                'favourites': popularity // rng.randint(5, 50),
+                'title': {'romaji': romaji, 'english': english, 'native': native},
+                'synonyms': [romaji.upper()] if rng.random() < 0.2 else [],
+                'genres': rng.sample(GENRES, 2),
+                'relations': {'edges': edges},
+            })
+            term = english or romaji
+            # Anchors sit at ANCHOR_VOLUME; keep titles below them like real searches
+            volumes[term] = min(ANCHOR_VOLUME / 2, max(0.5, popularity / 500 * rng.uniform(0.5, 1.5)))
+
+            # Busier titles get more posts
+            for _ in range(min(20, int(rng.expovariate(1 / 2) * popularity / 5000))):
+                intent = rng.choice(INTENT_WORDS) if rng.random() < 0.5 else 'chapter'
+                posts.append({'kind': rng.choice(['submission', 'comment']), 'title': term,
+                              'text': f"{term} {intent} discussion", 'score': rng.randint(0, 500)})
+        rng.shuffle(posts)
+        return cls(media, volumes, posts)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'anilist_media.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.media, f, ensure_ascii=False)
+        with open(os.path.join(directory, 'trends_volumes.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.volumes, f, ensure_ascii=False)
+        with open(os.path.join(directory, 'reddit_posts.jsonl'), 'w', encoding='utf-8') as f:
+            for post in self.posts:
+                f.write(json.dumps(post, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def load(cls, directory: str) -> 'Fixtures':
+        with open(os.path.join(directory, 'anilist_media.json'), 'r', encoding='utf-8') as f:
+            media = json.load(f)
+        with open(os.path.join(directory, 'trends_volumes.json'), 'r', encoding='utf-8') as f:
+            volumes = json.load(f)
+        with open(os.path.join(directory, 'reddit_posts.jsonl'), 'r', encoding='utf-8') as f:
+            posts = [json.loads(line) for line in f if line.strip()]
+        return cls(media, volumes, posts)
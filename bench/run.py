@@ -0,0 +1,260 @@
+"""
+Offline replay benchmark for the weekly batch.
+
+Runs each stage (AniListClient.get_candidates, DataProcessor.process,
+Reporter, MarketGate) and then main() end to end against the in-process
+fakes in bench/fakes.py, at several candidate counts. Reports wall time,
+peak Python memory (tracemalloc), requests per API and simulated sleep.
+
+    python -m bench.run                      # 200, 2000, 20000 candidates
+    python -m bench.run --sizes 200 --json bench.json
+    python -m bench.run --fixtures DIR       # replay saved/recorded fixtures
+
+The 'TrendsWorkerPool' stage runs DataProcessor.process on a two-worker
+pool over HTTP against bench/endpoint.py (RebasedTrendReq), with one
+worker's cache writes failing ("database is locked") to exercise handoff.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench.fixtures import Fixtures
+from bench.fakes import SimClock, RequestCounter, FakeAniListSession, FakeTrendReq, FakeReddit
+from bench.endpoint import FakeTrendsEndpoint, FlakyCache
+from src.config import Config
+from src.anilist_client import AniListClient
+from src.google_trends_client import GoogleTrendsClient
+from src.pacing import PacingController
+from src.rate_limiter import TokenBucket
+from src.reddit_client import RedditClient
+from src.history_store import HistoryStore
+from src.processor import DataProcessor, is_failed
+from src.trends_pool import TrendsWorkerPool, TrendsWorkerConfig
+from src.reporter import Reporter
+from src.market_gate import MarketGate
+
+APIS = ('anilist', 'trends', 'reddit')
+
+class FakeWorld:
+    """Client factories wired to the fakes, a shared SimClock and request counter."""
+    def __init__(self, fixtures: Fixtures):
+        self.fixtures = fixtures
+        self.clock = SimClock()
+        self.counter = RequestCounter()
+        self.reddit = FakeReddit(fixtures, self.counter)
+
+    def anilist(self) -> AniListClient:
+        client = AniListClient()
+        client.session = FakeAniListSession(self.fixtures, self.counter)
+        client.limiter = TokenBucket(Config.ANILIST_RATE_LIMIT, burst=Config.ANILIST_BURST,
+                                     clock=self.clock.now, sleep=self.clock.sleep)
+        return client
+
+    def pacing(self, min_delay: float = None) -> PacingController:
+        return PacingController(
+            min_delay=Config.TRENDS_MIN_DELAY if min_delay is None else min_delay,
+            max_delay=Config.TRENDS_MAX_DELAY,
+            breaker_threshold=Config.TRENDS_BREAKER_THRESHOLD,
+            cooldown=Config.TRENDS_BREAKER_COOLDOWN,
+            sleep=self.clock.sleep,
+            clock=self.clock.now
+        )
+
+    def trends(self) -> GoogleTrendsClient:
+        return GoogleTrendsClient(pacing=self.pacing(), pytrends=FakeTrendReq(self.fixtures, self.counter))
+
+    def trends_pool(self, base_url: str, workers: int = 2, failing: Optional[str] = None,
+                    failures: int = 1) -> TrendsWorkerPool:
+        """
+        TrendsWorkerPool whose workers talk HTTP to `base_url`; the worker
+        named `failing` gets a cache whose first `failures` writes raise.
+        """
+        def factory(config, cache, anchors):
+            client = GoogleTrendsClient(cache=cache, pacing=self.pacing(config.min_delay), anchors=anchors,
+                                        pytrends_factory=config.build_pytrends)
+            if config.name == failing:
+                client.cache = FlakyCache(client.cache, failures)
+            return client
+        configs = [TrendsWorkerConfig(f"worker-{i}", base_url=base_url) for i in range(workers)]
+        return TrendsWorkerPool(configs, client_factory=factory)
+
+    def reddit_client(self) -> RedditClient:
+        limiter = TokenBucket(Config.REDDIT_RATE_LIMIT, burst=Config.REDDIT_BURST,
+                              clock=self.clock.now, sleep=self.clock.sleep)
+        return RedditClient(limiter=limiter)
+
+    @contextmanager
+    def installed(self):
+        """Reddit credentials + PRAW connection pointed at the fake for the duration."""
+        saved = (Config.REDDIT_CLIENT_ID, Config.REDDIT_CLIENT_SECRET, RedditClient._connect)
+        Config.REDDIT_CLIENT_ID, Config.REDDIT_CLIENT_SECRET = 'bench', 'bench'
+        RedditClient._connect = staticmethod(lambda: self.reddit)
+        try:
+            yield
+        finally:
+            Config.REDDIT_CLIENT_ID, Config.REDDIT_CLIENT_SECRET, RedditClient._connect = saved
+
+@contextmanager
+def workdir():
+    """Run in a scratch directory so stores, caches and reports start cold."""
+    previous = os.getcwd()
+    path = tempfile.mkdtemp(prefix="ip-bench-")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def measure(world: FakeWorld, fn: Callable[[], Any]):
+    counts = dict(world.counter.counts)
+    slept = world.clock.slept
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    metrics = {
+        'wall_s': round(wall, 3),
+        'peak_mb': round(peak / 2 ** 20, 1),
+        'sim_sleep_s': round(world.clock.slept - slept, 1),
+    }
+    for api in APIS:
+        metrics[f'{api}_requests'] = world.counter.counts[api] - counts.get(api, 0)
+    return result, metrics
+
+def trends_args(trends_limit: Optional[int], trends_budget: Optional[int]) -> List[str]:
+    if trends_limit is not None:
+        return ['--trends-limit', str(trends_limit)]
+    if trends_budget is not None:
+        return ['--trends-budget', str(trends_budget)]
+    return []
+
+def bench_stages(fixtures: Fixtures, size: int, trends_limit: Optional[int],
+                 trends_budget: Optional[int]) -> List[Dict[str, Any]]:
+    world = FakeWorld(fixtures)
+    results = []
+    with workdir(), world.installed():
+        anilist = world.anilist()
+        candidates, metrics = measure(world, lambda: anilist.get_candidates(target_count=size))
+        results.append({'stage': 'get_candidates', 'rows': len(candidates), **metrics})
+
+        processor = DataProcessor(world.trends(), world.reddit_client(), HistoryStore())
+        if trends_limit is None and trends_budget is None:
+            trends_budget = Config.TRENDS_LIVE_BUDGET
+        rows, metrics = measure(world, lambda: processor.process(candidates, trends_limit=trends_limit or 0,
+                                                                 batch_mode=True, trends_budget=trends_budget))
+        results.append({'stage': 'DataProcessor.process', 'rows': len(rows), **metrics})
+
+        _, metrics = measure(world, lambda: Reporter.generate(rows, Config.REPORT_FILE, ['csv']))
+        results.append({'stage': 'Reporter', 'rows': len(rows), **metrics})
+
+        _, metrics = measure(world, lambda: MarketGate().process(rows))
+        results.append({'stage': 'MarketGate', 'rows': len(rows), **metrics})
+    return results
+
+def bench_pool(fixtures: Fixtures, size: int, trends_limit: Optional[int],
+               trends_budget: Optional[int]) -> Dict[str, Any]:
+    world = FakeWorld(fixtures)
+    with workdir(), FakeTrendsEndpoint(fixtures, world.counter) as endpoint:
+        candidates = world.anilist().get_candidates(target_count=size)
+        # worker-1's first cache write fails, so its first chain is handed to worker-0
+        pool = world.trends_pool(endpoint.url, workers=2, failing='worker-1')
+        processor = DataProcessor(pool, None, HistoryStore())
+        if trends_limit is None and trends_budget is None:
+            trends_budget = Config.TRENDS_LIVE_BUDGET
+        rows, metrics = measure(world, lambda: processor.process(candidates, trends_limit=trends_limit or 0,
+                                                                 batch_mode=True, trends_budget=trends_budget))
+        pool.cache.close()
+    failed = sum(is_failed(row['trends_status']) for row in rows)
+    if failed:
+        logging.warning(f"TrendsWorkerPool: {failed} rows with failed Trends lookups")
+    return {'stage': 'TrendsWorkerPool', 'rows': len(rows), 'trends_failed': failed, **metrics}
+
+def bench_main(fixtures: Fixtures, size: int, trends_limit: Optional[int],
+               trends_budget: Optional[int]) -> Dict[str, Any]:
+    world = FakeWorld(fixtures)
+    with workdir(), world.installed():
+        import main as batch
+        logging.getLogger().setLevel(logging.WARNING)
+        saved = (batch.create_anilist_client, batch.create_trends_client, batch.create_reddit_client)
+        batch.create_anilist_client = world.anilist
+        batch.create_trends_client = world.trends
+        batch.create_reddit_client = world.reddit_client
+        try:
+            _, metrics = measure(world, lambda: batch.main(['--candidates', str(size)] +
+                                                           trends_args(trends_limit, trends_budget)))
+        finally:
+            batch.create_anilist_client, batch.create_trends_client, batch.create_reddit_client = saved
+        with open(Config.REPORT_FILE, encoding='utf-8-sig') as f:
+            rows = sum(1 for _ in f) - 1
+    return {'stage': 'main', 'rows': rows, **metrics}
+
+def print_table(results: List[Dict[str, Any]]):
+    columns = (['size', 'stage', 'rows', 'wall_s', 'peak_mb', 'sim_sleep_s'] +
+               [f'{api}_requests' for api in APIS] + ['trends_failed'])
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in results)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in results:
+        print("  ".join(str(r.get(c, '')).ljust(widths[c]) for c in columns))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for the weekly batch")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20000],
+                        help="Candidate counts to run")
+    trends = parser.add_mutually_exclusive_group()
+    trends.add_argument('--trends-budget', dest='trends_budget', type=int,
+                        help="Live Trends requests (default: TRENDS_LIVE_BUDGET)")
+    trends.add_argument('--trends-limit', dest='trends_limit', type=int,
+                        help="Enrich a fixed top N instead of budget-based selection")
+    parser.add_argument('--fixtures', help="Load fixtures from this directory instead of generating them")
+    parser.add_argument('--save-fixtures', dest='save_fixtures', help="Write the generated fixtures here")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-main', dest='skip_main', action='store_true')
+    parser.add_argument('--skip-pool', dest='skip_pool', action='store_true',
+                        help="Skip the worker pool run against the local HTTP endpoint")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+def run(argv=None) -> List[Dict[str, Any]]:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    results = []
+    for size in args.sizes:
+        if args.fixtures:
+            fixtures = Fixtures.load(args.fixtures)
+        else:
+            # Twice as many titles as candidates, so Trending and Popular only partly overlap
+            fixtures = Fixtures.generate(size * 2, seed=args.seed)
+            if args.save_fixtures:
+                fixtures.save(os.path.join(args.save_fixtures, str(size)))
+        for result in bench_stages(fixtures, size, args.trends_limit, args.trends_budget):
+            results.append({'size': size, **result})
+        if not args.skip_pool:
+            results.append({'size': size, **bench_pool(fixtures, size, args.trends_limit, args.trends_budget)})
+        if not args.skip_main:
+            results.append({'size': size, **bench_main(fixtures, size, args.trends_limit, args.trends_budget)})
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    run()
@@ -1,10 +1,13 @@
+import os
 import sys
+import argparse
 import logging
 from src.config import Config
-from src.anilist_client import AniListClient
-from src.google_trends_client import GoogleTrendsClient
-from src.processor import DataProcessor
-from src.reporter import Reporter
+from src.checkpoint import CheckpointStore
+from src.metrics import metrics
+
+# pandas/numpy, pytrends, praw and requests are imported by the stages that
+# use them, so `gate` and `report` runs skip that startup cost entirely
 
 # Configure logging
 logging.basicConfig(
@@ -17,45 +20,255 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
-    logger.info("Starting IP Research Tool Weekly Batch...")
-    
-    # Validate Config
+# Mirrors trends_series.VELOCITY_VARIANTS without importing numpy at startup
+VELOCITY_CHOICES = ('step', 'window')
+
+COMMANDS = {
+    'all': "Run every stage (default when no command is given)",
+    'fetch': "Step 1: fetch AniList candidates into a new batch checkpoint",
+    'enrich': "Step 2: enrich and score the checkpointed candidates (Trends, Reddit)",
+    'report': "Step 3: write the report from the checkpointed results",
+    'gate': "Step 4: run Market Gate on report.csv (buy_list.csv)",
+    'refresh': "Daily: re-fetch Trends cache entries about to expire (within a request budget)",
+    'recompute': "Offline: re-derive cached Trends signals from their stored raw series",
+}
+
+def _formats(value: str):
+    return [f.strip() for f in value.split(",") if f.strip()]
+
+def parse_args(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # No command means the whole batch, so `python main.py --resume` keeps working
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'all')
+
+    parser = argparse.ArgumentParser(description="IP Research Tool weekly batch")
+    subparsers = parser.add_subparsers(dest='command', metavar="{" + ",".join(COMMANDS) + "}")
+    commands = {name: subparsers.add_parser(name, help=text, description=text) for name, text in COMMANDS.items()}
+
+    for name in ('all', 'fetch'):
+        commands[name].add_argument('--candidates', type=int, default=200,
+                                    help="AniList candidates to fetch (split between Trending and Popular)")
+    for name in ('all', 'enrich'):
+        commands[name].add_argument('--trends-budget', dest='trends_budget', type=int, default=None,
+                                    help="Live Google Trends requests to spend on base, intent and regional "
+                                         "lookups; cached Trends are always used, 0 means cache only "
+                                         "(default: TRENDS_LIVE_BUDGET)")
+        commands[name].add_argument('--trends-limit', dest='trends_limit', type=int, default=None,
+                                    help="Enrich exactly the top N candidates (by AniList score) instead of "
+                                         "budget-based selection (--async default: 50)")
+        commands[name].add_argument('--retry-failed', dest='retry_failed', action='store_true',
+                                    help="Resume and re-enrich only titles whose Trends status is error_* or no_data")
+    for name in ('all', 'report'):
+        commands[name].add_argument('--formats', type=_formats,
+                                    help="Report formats, comma-separated (default: REPORT_FORMATS)")
+    commands['refresh'].add_argument('--budget', type=int, default=None,
+                                     help="Live Trends requests to spend (default: TRENDS_REFRESH_BUDGET)")
+    commands['recompute'].add_argument('--window', type=int, default=None,
+                                       help="Recent weeks averaged (default: TRENDS_SIGNAL_WINDOW)")
+    commands['recompute'].add_argument('--velocity', choices=sorted(VELOCITY_CHOICES), default=None,
+                                       help="Velocity variant (default: TRENDS_VELOCITY)")
+    commands['all'].add_argument('--async', dest='use_async', action='store_true',
+                                 help="Overlap AniList detail fetching with Trends enrichment of the top "
+                                      "--trends-limit titles (no Reddit, regions, budget selection or "
+                                      "checkpoints; see src/pipeline.py)")
+    commands['all'].add_argument('--resume', action='store_true',
+                                 help="Continue the last batch from its checkpoints instead of starting over")
+
+    args = parser.parse_args(argv)
+    if args.command == 'all' and args.use_async and (args.resume or args.retry_failed):
+        parser.error("--resume/--retry-failed apply to the batch path, not --async")
+    if args.command == 'all' and args.use_async and args.trends_budget is not None:
+        parser.error("--async enriches a fixed --trends-limit; --trends-budget applies to the batch path")
+    if getattr(args, 'trends_limit', None) is not None and args.trends_budget is not None:
+        parser.error("--trends-limit and --trends-budget are alternatives")
+    return args
+
+def create_anilist_client():
+    from src.anilist_client import AniListClient
+    return AniListClient()
+
+def create_trends_client():
+    if Config.TRENDS_WORKERS > 1 or Config.TRENDS_PROXIES:
+        from src.trends_pool import TrendsWorkerPool
+        return TrendsWorkerPool.from_config()
+    from src.google_trends_client import GoogleTrendsClient
+    return GoogleTrendsClient()
+
+def create_reddit_client():
+    from src.reddit_client import RedditClient
+    client = RedditClient()
+    if Config.REDDIT_MODE == 'stream':
+        from src.reddit_stream import RedditStreamMatcher
+        return RedditStreamMatcher(reddit=client.reddit, limiter=client.limiter)
+    return client
+
+def record_history(items):
+    from src.history_store import HistoryStore
+    history = HistoryStore()
+    with metrics.stage('anilist.history'):
+        history.record(items)
+    for mover in history.movers(top_n=5):
+        logger.info(f"AniList mover: id {mover['anilist_id']} popularity {mover['velocity']:+.1%} w/w")
+    return history
+
+def fetch_candidates(checkpoint: CheckpointStore, target_count: int):
+    candidates = checkpoint.load('candidates')
+    if candidates is not None:
+        logger.info(f"Step 1: Resuming with {len(candidates)} checkpointed candidates...")
+        return candidates
+    logger.info("Step 1: Fetching candidates from AniList...")
+    # --candidates is split evenly between the Trending and Popular lists,
+    # then deduplicated by AniList ID
+    candidates = create_anilist_client().get_candidates(target_count=target_count)
+    if candidates:
+        checkpoint.save('candidates', candidates)
+    return candidates
+
+def enrich_candidates(candidates, checkpoint: CheckpointStore, trends_limit=None, trends_budget=None,
+                      retry_failed: bool = False, sink=None):
+    from src.processor import DataProcessor
+    from src.refresh import RefreshScheduler
+    history = record_history(candidates)
+    trends = create_trends_client()
+    processor = DataProcessor(trends, create_reddit_client(), history, RefreshScheduler(trends))
+    # Cached Trends are free; live requests are capped by a budget (or a fixed
+    # top N with --trends-limit). Packed base scores for every selected title,
+    # intents only where they matter
+    if trends_limit is None:
+        trends_budget = trends_budget if trends_budget is not None else Config.TRENDS_LIVE_BUDGET
+    return processor.process(candidates, trends_limit=trends_limit or 0, batch_mode=True,
+                             checkpoint=checkpoint, retry_failed=retry_failed, sink=sink,
+                             trends_budget=trends_budget)
+
+def run_gate(rows=None):
+    logger.info("Step 4: Running Market Gate (buy_list.csv)...")
+    from src.market_gate import MarketGate
+    MarketGate().process(rows)
+
+def run_all(args) -> str:
+    from src.reporter import Reporter
     Config.validate()
-    
-    try:
+
+    if args.use_async:
+        # Steps 1+2 overlap: AniList detail chunks go to Trends enrichment as they
+        # arrive. Trends only (fixed top N); the report is written once all rows are in.
+        logger.info("Steps 1-2: Running async pipeline (AniList -> Trends -> scoring)...")
+        from src.pipeline import AsyncPipeline
+        from src.processor import DataProcessor
+        anilist = create_anilist_client()
+        # Index is cached by the AniList store, so recording history costs no extra request
+        history = record_history(anilist.get_index(target_count=args.candidates))
+        processor = DataProcessor(create_trends_client(), history=history)
+        processed_data = AsyncPipeline(anilist, processor).run(target_count=args.candidates,
+                                                               trends_limit=args.trends_limit or 50)
+        if not processed_data:
+            logger.warning("No candidates found. Exiting.")
+            return 'empty'
+
+        # Step 3 - Generate Report
+        logger.info("Step 3: Generating report...")
+        Reporter.generate(processed_data, formats=args.formats)
+    else:
+        checkpoint = CheckpointStore()
+        if not (args.resume or args.retry_failed):
+            checkpoint.clear()
+
         # Step 1 - Fetch Candidates from AniList
-        logger.info("Step 1: Fetching candidates from AniList...")
-        anilist = AniListClient()
-        # Fetching 200 candidates total (100 Trending, 100 Popular)
-        candidates = anilist.get_candidates(target_count=200)
-        
+        candidates = fetch_candidates(checkpoint, args.candidates)
         if not candidates:
             logger.warning("No candidates found. Exiting.")
-            return
-
-        # Step 2 - Enrich with Google Trends Signals
-        logger.info("Step 2: Enriching data with Google Trends signals...")
-        google_trends = GoogleTrendsClient()
-        processor = DataProcessor(google_trends)
-        # Only check Trends for Top 50 to save quota/time
-        processed_data = processor.process(candidates, trends_limit=50)
-        
-        # Step 3 - Generate Report
-        logger.info("Step 3: Generating report.csv...")
-        Reporter.generate_csv(processed_data)
-        
-        # Step 4 - Market Gate (Buy List)
-        logger.info("Step 4: Running Market Gate (buy_list.csv)...")
-        from src.market_gate import MarketGate
-        gate = MarketGate()
-        gate.process()
-        
-        logger.info("Batch completed successfully.")
-        
+            return 'empty'
+
+        # Steps 2+3 - Enrich with Google Trends Signals; the ranked rows are
+        # written to the report sinks (renamed into place on success)
+        logger.info("Steps 2-3: Enriching data with Google Trends and Reddit signals and writing report...")
+        with Reporter.open(formats=args.formats) as report:
+            processed_data = enrich_candidates(candidates, checkpoint, args.trends_limit, args.trends_budget,
+                                               retry_failed=args.retry_failed, sink=report)
+
+    # Step 4 - Market Gate (Buy List)
+    run_gate(processed_data)
+    return 'success'
+
+def run_fetch(args) -> str:
+    checkpoint = CheckpointStore()
+    # fetch starts a new batch
+    checkpoint.clear()
+    if not fetch_candidates(checkpoint, args.candidates):
+        logger.warning("No candidates found.")
+        return 'empty'
+    return 'success'
+
+def run_enrich(args) -> str:
+    checkpoint = CheckpointStore()
+    candidates = checkpoint.load('candidates')
+    if not candidates:
+        logger.error("No checkpointed candidates. Run `main.py fetch` first.")
+        return 'empty'
+    Config.validate()
+    logger.info(f"Step 2: Enriching {len(candidates)} checkpointed candidates...")
+    enrich_candidates(candidates, checkpoint, args.trends_limit, args.trends_budget,
+                      retry_failed=args.retry_failed)
+    return 'success'
+
+def run_report(args) -> str:
+    from src.reporter import Reporter
+    rows = CheckpointStore().load('results')
+    if not rows:
+        logger.error("No checkpointed results. Run `main.py enrich` first.")
+        return 'empty'
+    logger.info(f"Step 3: Generating report from {len(rows)} checkpointed results...")
+    Reporter.generate(rows, formats=args.formats)
+    return 'success'
+
+def run_gate_only(args) -> str:
+    if not os.path.exists(Config.REPORT_FILE):
+        logger.error(f"{Config.REPORT_FILE} not found. Run `main.py report` first.")
+        return 'empty'
+    run_gate()
+    return 'success'
+
+def run_refresh(args) -> str:
+    from src.refresh import RefreshScheduler
+    RefreshScheduler(create_trends_client(), budget=args.budget).run()
+    return 'success'
+
+def run_recompute(args) -> str:
+    counts = create_trends_client().recompute(window=args.window, velocity=args.velocity)
+    # The batch's checkpointed Trends results predate the new numbers
+    CheckpointStore().drop('selection', 'signals', 'base', 'intent', 'regions', 'results')
+    logger.info(f"Recomputed {sum(counts.values())} cached Trends results. "
+                f"`main.py enrich --trends-budget 0` re-scores the batch from the cache "
+                f"(no live base, intent or regional requests).")
+    return 'success'
+
+HANDLERS = {
+    'all': run_all,
+    'fetch': run_fetch,
+    'enrich': run_enrich,
+    'report': run_report,
+    'gate': run_gate_only,
+    'refresh': run_refresh,
+    'recompute': run_recompute,
+}
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger.info(f"Starting IP Research Tool Weekly Batch ({args.command})...")
+    metrics.reset()
+    status = 'failed'
+
+    try:
+        status = HANDLERS[args.command](args)
+        if status == 'success':
+            logger.info("Batch completed successfully.")
+
     except Exception as e:
         logger.error(f"Batch failed: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        metrics.write(Config.METRICS_FILE, Config.METRICS_PROM_FILE, status=status, command=args.command)
 
 if __name__ == "__main__":
     main()
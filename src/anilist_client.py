@@ -1,93 +1,92 @@
+import json
 import requests
 import time
+import math
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
 from src.config import Config
+from src.rate_limiter import TokenBucket
+from src.media_store import MediaStore
+from src.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 class AniListClient:
-    def __init__(self):
+    def __init__(self, store: Optional[MediaStore] = None):
         self.url = Config.ANILIST_API_URL
+        # Local snapshot store; full records are only refetched when updatedAt moves
+        self.store = store if store is not None else MediaStore()
+        # One keep-alive session shared by all page workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.ANILIST_MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = TokenBucket(Config.ANILIST_RATE_LIMIT, burst=Config.ANILIST_BURST)
 
     def _query(self, query: str, variables: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """
-        Execute GraphQL query with simple rate limit handling.
-        """
-        try:
-            response = requests.post(
-                self.url,
-                json={'query': query, 'variables': variables},
-                timeout=10
-            )
-            
-            # Rate limit handling (naive)
-            # Headers: X-RateLimit-Limit, X-RateLimit-Remaining
-            remaining = int(response.headers.get('X-RateLimit-Remaining', 90))
-            if remaining < 10:
-                logger.warning(f"AniList Rate Limit low ({remaining}). Sleeping 2s...")
-                time.sleep(2)
-                
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'errors' in data:
-                logger.error(f"GraphQL Errors: {data['errors']}")
+        Execute GraphQL query through the shared session and rate limiter.
+        Retries 429s after honoring Retry-After.
+        """
+        payload = {'query': query, 'variables': variables}
+        for attempt in range(Config.ANILIST_MAX_RETRIES + 1):
+            metrics.inc('sleep_seconds', self.limiter.acquire(), api='anilist')
+            if attempt:
+                metrics.inc('retries', api='anilist')
+            metrics.inc('requests', api='anilist')
+            metrics.inc('request_bytes', len(json.dumps(payload)), api='anilist')
+            try:
+                response = self.session.post(self.url, json=payload, timeout=10)
+                metrics.inc('response_bytes', len(response.content or b''), api='anilist')
+
+                # Headers: X-RateLimit-Limit, X-RateLimit-Remaining, Retry-After
+                self.limiter.update_from_headers(response.headers)
+
+                if response.status_code == 429:
+                    metrics.inc('rate_limited', api='anilist')
+                    logger.warning(f"AniList 429 (attempt {attempt + 1}/{Config.ANILIST_MAX_RETRIES + 1})")
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+
+                if 'errors' in data:
+                    metrics.inc('errors', api='anilist', kind='graphql')
+                    logger.error(f"GraphQL Errors: {data['errors']}")
+                    return None
+
+                return data.get('data')
+
+            except requests.exceptions.RequestException as e:
+                metrics.inc('errors', api='anilist', kind='request')
+                logger.error(f"AniList Request Failed: {e}")
                 return None
-                
-            return data.get('data')
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"AniList Request Failed: {e}")
-            return None
 
-    def get_candidates(self, target_count: int = 200) -> List[Dict[str, Any]]:
-        """
-        Fetch candidate manga merging Trending and Popular lists.
-        Deduplicates by ID.
-        """
-        # We'll split the target budget between Trending and Popular
-        # e.g. 100 Trending, 100 Popular
-        batch_size = target_count // 2
-        
-        # 1. Fetch Trending
-        trending = self._fetch_list(sort='TRENDING_DESC', limit=batch_size)
-        
-        # 2. Fetch Popularity
-        popular = self._fetch_list(sort='POPULARITY_DESC', limit=batch_size)
-        
-        # 3. Merge and Deduplicate
-        seen_ids = set()
-        merged = []
-        
-        for item in trending + popular:
-            if item['id'] not in seen_ids:
-                merged.append(item)
-                seen_ids.add(item['id'])
-        
-        logger.info(f"Merged candidates: {len(merged)} unique items (from {len(trending)} trending, {len(popular)} popular)")
-        return merged
+        logger.error("AniList rate limit retries exhausted.")
+        return None
 
-    def _fetch_list(self, sort: str, limit: int) -> List[Dict[str, Any]]:
-        """
-        Internal helper to fetch a list with specific sort.
-        """
-        query = '''
-        query ($page: Int, $perPage: Int, $sort: [MediaSort]) {
-          Page (page: $page, perPage: $perPage) {
-            media (type: MANGA, sort: $sort, countryOfOrigin: "JP", isAdult: false) {
+    # Cheap fields used for ranking/dedupe; fetched for every list position
+    INDEX_FIELDS = '''
               id
-              title {
-                romaji
-                english
-                native
-              }
               status
               updatedAt
               averageScore
               popularity
               trending
               favourites
+    '''
+
+    # Heavy fields; fetched once per unique ID via id_in
+    DETAIL_FIELDS = '''
+              id
+              title {
+                romaji
+                english
+                native
+              }
+              synonyms
               genres
               relations {
                 edges {
@@ -98,29 +97,210 @@ class AniListClient:
                   }
                 }
               }
-            }
-          }
-        }
-        '''
-        
-        variables = {
-            'page': 1,
-            'perPage': limit,
-            'sort': sort
-        }
-        
-        logger.info(f"Fetching {limit} items sorted by {sort}...")
-        data = self._query(query, variables)
-        
-        if not data or 'Page' not in data or 'media' not in data['Page']:
-            logger.error("Failed to parse AniList response.")
+    '''
+
+    def get_candidates(self, target_count: int = 200) -> List[Dict[str, Any]]:
+        """
+        Fetch candidate manga merging Trending and Popular lists.
+        Deduplicates by ID before any heavy fields are transferred.
+        """
+        # target_count is split evenly between the Trending and Popular lists
+        # (both fetched as aliased pages in the same requests); overlap is
+        # deduplicated, so fewer unique IDs than target_count may come back
+        with metrics.stage('anilist.index'):
+            index = self.get_index(target_count)
+        with metrics.stage('anilist.details'):
+            details = self.get_details(index)
+        merged = self._merge(index, details)
+
+        logger.info(f"Candidates with details: {len(merged)} of {len(index)} unique IDs")
+        return merged
+
+    def iter_candidates(self, index: List[Dict[str, Any]], chunk_size: int = None):
+        """
+        Yield full candidates chunk by chunk, in index order, so downstream
+        stages can start before every detail request has finished.
+        """
+        chunk_size = chunk_size or Config.ANILIST_PER_PAGE
+        for i in range(0, len(index), chunk_size):
+            chunk = index[i:i + chunk_size]
+            yield self._merge(chunk, self.get_details(chunk))
+
+    @staticmethod
+    def _merge(index: List[Dict[str, Any]], details: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        merged = []
+        for item in index:
+            detail = details.get(item['id'])
+            if detail is None:
+                continue
+            # Index fields (popularity, trending, ...) are always the fresher copy
+            merged.append({**detail, **item})
+        return merged
+
+    def get_index(self, target_count: int) -> List[Dict[str, Any]]:
+        """
+        Light ID + sort-key index for the candidate lists.
+        Same-day re-runs reuse the last index instead of hitting AniList again.
+        """
+        key = f"TRENDING_DESC+POPULARITY_DESC:{target_count}"
+        max_age = Config.ANILIST_INDEX_TTL_HOURS * 3600
+        index = self.store.get_index(key, max_age)
+        if index is not None:
+            metrics.cache_lookup('anilist_index', 'hit')
+            logger.info(f"Using cached AniList index ({len(index)} items)")
+            return index
+        metrics.cache_lookup('anilist_index', 'miss')
+
+        index = self.fetch_index(target_count)
+        if index:
+            self.store.put_index(key, index)
+        return index
+
+    def get_details(self, index: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Details for each index item. Served from the local store unless the
+        item is new, its updatedAt changed, or the snapshot has aged out.
+        """
+        stored = self.store.get_many(item['id'] for item in index)
+        max_age = Config.MEDIA_STORE_MAX_AGE_DAYS * 86400
+        now = time.time()
+
+        details = {}
+        stale_ids = []
+        for item in index:
+            entry = stored.get(item['id'])
+            if (entry is None
+                    or item.get('updatedAt') is None
+                    or entry['updatedAt'] != item.get('updatedAt')
+                    or now - entry['fetched_at'] > max_age):
+                stale_ids.append(item['id'])
+            else:
+                details[item['id']] = entry['data']
+
+        logger.info(f"Media store: {len(details)} hits, {len(stale_ids)} to refresh")
+        missing = sum(1 for media_id in stale_ids if media_id not in stored)
+        metrics.cache_lookup('anilist_media', 'hit', len(details))
+        metrics.cache_lookup('anilist_media', 'miss', missing)
+        metrics.cache_lookup('anilist_media', 'expired', len(stale_ids) - missing)
+        if stale_ids:
+            fresh = self.fetch_details(stale_ids)
+            updated_at = {item['id']: item.get('updatedAt') for item in index}
+            for media_id, detail in fresh.items():
+                detail['updatedAt'] = updated_at.get(media_id)
+            self.store.put_many(list(fresh.values()))
+            details.update(fresh)
+        return details
+
+    def fetch_index(self, target_count: int = 200, sorts: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Light first pass: ID + sort keys for every list, batched via GraphQL aliases.
+        Returns unique items in list order (first sort first).
+        """
+        sorts = sorts or ['TRENDING_DESC', 'POPULARITY_DESC']
+        batch_size = target_count // len(sorts)
+        if batch_size <= 0:
             return []
-            
-        return data['Page']['media']
-        
+
+        per_page = min(batch_size, Config.ANILIST_PER_PAGE)
+        pages = math.ceil(batch_size / per_page)
+        specs = [(sort, page) for sort in sorts for page in range(1, pages + 1)]
+
+        # Several sort/page combinations per POST
+        chunk = Config.ANILIST_PAGES_PER_QUERY
+        spec_chunks = [specs[i:i + chunk] for i in range(0, len(specs), chunk)]
+
+        def fetch_chunk(chunk_specs) -> Dict[Any, Optional[List[Dict[str, Any]]]]:
+            query = self._build_index_query(chunk_specs)
+            data = self._query(query, {'perPage': per_page})
+            out = {}
+            for i, spec in enumerate(chunk_specs):
+                page_data = (data or {}).get(f"p{i}")
+                out[spec] = page_data.get('media') if page_data else None
+            return out
+
+        logger.info(f"Fetching index: {batch_size} items x {len(sorts)} sorts in {len(spec_chunks)} requests...")
+        pages_by_spec = {}
+        with ThreadPoolExecutor(max_workers=min(len(spec_chunks), Config.ANILIST_MAX_WORKERS)) as executor:
+            for result in executor.map(fetch_chunk, spec_chunks):
+                pages_by_spec.update(result)
+
+        seen_ids = set()
+        merged = []
+        counts = {}
+        for sort in sorts:
+            items = []
+            for page in range(1, pages + 1):
+                page_media = pages_by_spec.get((sort, page))
+                # Stop at the first failed/short page so ordering stays contiguous
+                if page_media is None:
+                    logger.error(f"Failed to parse AniList response ({sort} page {page}).")
+                    break
+                items.extend(page_media)
+                if len(page_media) < per_page:
+                    break
+            items = items[:batch_size]
+            counts[sort] = len(items)
+
+            for item in items:
+                if item['id'] not in seen_ids:
+                    merged.append(item)
+                    seen_ids.add(item['id'])
+
+        summary = ", ".join(f"{n} {sort}" for sort, n in counts.items())
+        logger.info(f"Merged candidates: {len(merged)} unique items (from {summary})")
+        return merged
+
+    def fetch_details(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Heavy second pass: titles, genres and relations for each unique ID.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+
+        per_page = Config.ANILIST_PER_PAGE
+        id_chunks = [ids[i:i + per_page] for i in range(0, len(ids), per_page)]
+        query = f'''
+        query ($ids: [Int], $perPage: Int) {{
+          Page (page: 1, perPage: $perPage) {{
+            media (id_in: $ids, type: MANGA) {{{self.DETAIL_FIELDS.rstrip()}
+            }}
+          }}
+        }}
+        '''
+
+        def fetch_chunk(chunk_ids: List[int]) -> List[Dict[str, Any]]:
+            data = self._query(query, {'ids': chunk_ids, 'perPage': per_page})
+            if not data or 'Page' not in data or 'media' not in data['Page']:
+                logger.error(f"Failed to fetch details for {len(chunk_ids)} IDs.")
+                return []
+            return data['Page']['media']
+
+        logger.info(f"Fetching details for {len(ids)} unique IDs in {len(id_chunks)} requests...")
+        details = {}
+        with ThreadPoolExecutor(max_workers=min(len(id_chunks), Config.ANILIST_MAX_WORKERS)) as executor:
+            for media in executor.map(fetch_chunk, id_chunks):
+                for item in media:
+                    details[item['id']] = item
+        return details
+
+    def _build_index_query(self, specs) -> str:
+        """
+        One aliased Page per (sort, page) so several lists share a single POST.
+        """
+        blocks = []
+        for i, (sort, page) in enumerate(specs):
+            blocks.append(f'''
+          p{i}: Page (page: {page}, perPage: $perPage) {{
+            media (type: MANGA, sort: [{sort}], countryOfOrigin: "JP", isAdult: false) {{{self.INDEX_FIELDS.rstrip()}
+            }}
+          }}''')
+        return "query ($perPage: Int) {" + "".join(blocks) + "\n        }"
+
     # Deprecated fallback
     def get_trending_manga(self, limit: int = 50) -> List[Dict[str, Any]]:
-        return self._fetch_list('TRENDING_DESC', limit)
+        index = self.fetch_index(limit, sorts=['TRENDING_DESC'])
+        return self._merge(index, self.get_details(index))
 
 if __name__ == "__main__":
     # Test run
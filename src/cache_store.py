@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(ABC):
+    """
+    Key/value cache with per-entry expiry, split into namespaces.
+    Values are JSON-serializable dicts; every read returns a fresh copy, so
+    callers may modify what they get back.
+    """
+    def get(self, key: str, namespace: str = 'default') -> Optional[Dict[str, Any]]:
+        """Return the value if present and not expired."""
+        entry = self.get_entry(key, namespace)
+        if entry is None or entry['expires_at'] <= time.time():
+            return None
+        return entry['data']
+
+    def get_many(self, keys: List[str], namespace: str = 'default') -> Dict[str, Dict[str, Any]]:
+        """Values for the keys that are present and not expired."""
+        found = {}
+        for key in dict.fromkeys(keys):
+            data = self.get(key, namespace)
+            if data is not None:
+                found[key] = data
+        return found
+
+    @abstractmethod
+    def get_entry(self, key: str, namespace: str = 'default') -> Optional[Dict[str, Any]]:
+        """
+        Raw entry including expired ones: {'data', 'created_at', 'expires_at'}.
+        """
+
+    @abstractmethod
+    def set(self, key: str, data: Dict[str, Any], ttl_seconds: float, namespace: str = 'default'):
+        """Store `data` under `key` for ttl_seconds."""
+
+    def set_many(self, rows: List[tuple], namespace: str = 'default'):
+        """Bulk set of (key, data, ttl_seconds) rows."""
+        for key, data, ttl_seconds in rows:
+            self.set(key, data, ttl_seconds, namespace)
+
+    @abstractmethod
+    def evict_expired(self, grace_seconds: float = 0) -> int:
+        """Delete entries expired more than grace_seconds ago. Returns count."""
+
+    @abstractmethod
+    def scan(self, namespace: str = 'default') -> Dict[str, Dict[str, Any]]:
+        """Every raw entry in a namespace (expired ones included), by key."""
+
+    def close(self):
+        pass
+
+class MemoryCache(CacheBackend):
+    """
+    Process-local cache. Useful for tests and dry runs. Values are kept
+    JSON-encoded like in SQLiteCache, so both backends hand out independent
+    copies and reject the same non-serializable values.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _decode(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {**entry, 'data': json.loads(entry['data'])}
+
+    def get_entry(self, key, namespace='default'):
+        with self.lock:
+            entry = self.entries.get((namespace, key))
+        return self._decode(entry) if entry else None
+
+    def set(self, key, data, ttl_seconds, namespace='default'):
+        now = time.time()
+        encoded = json.dumps(data, ensure_ascii=False)
+        with self.lock:
+            self.entries[(namespace, key)] = {
+                'data': encoded,
+                'created_at': now,
+                'expires_at': now + ttl_seconds
+            }
+
+    def evict_expired(self, grace_seconds=0):
+        cutoff = time.time() - grace_seconds
+        with self.lock:
+            expired = [k for k, v in self.entries.items() if v['expires_at'] <= cutoff]
+            for k in expired:
+                del self.entries[k]
+        return len(expired)
+
+    def scan(self, namespace='default'):
+        with self.lock:
+            entries = {key: entry for (ns, key), entry in self.entries.items() if ns == namespace}
+        return {key: self._decode(entry) for key, entry in entries.items()}
+
+class SQLiteCache(CacheBackend):
+    """
+    SQLite-backed cache. Each write is a single-row upsert in its own
+    transaction, so a crash never corrupts other entries. WAL mode lets
+    overlapping runs read while another writes; each thread gets its own
+    connection (tracked so close() can close them all).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.connections = {}
+        self.lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+
+    def _conn(self) -> sqlite3.Connection:
+        thread_id = threading.get_ident()
+        with self.lock:
+            conn = self.connections.get(thread_id)
+        if conn is None:
+            # Still one connection per thread; check_same_thread is off only so
+            # close() may close other threads' connections
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            with self.lock:
+                self.connections[thread_id] = conn
+        return conn
+
+    def get_entry(self, key, namespace='default'):
+        row = self._conn().execute(
+            "SELECT data, created_at, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if not row:
+            return None
+        return {'data': json.loads(row[0]), 'created_at': row[1], 'expires_at': row[2]}
+
+    def get(self, key, namespace='default'):
+        row = self._conn().execute(
+            "SELECT data FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, keys, namespace='default'):
+        keys = list(dict.fromkeys(keys))
+        conn = self._conn()
+        now = time.time()
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, data FROM cache WHERE namespace = ? AND expires_at > ? "
+                f"AND key IN ({','.join('?' * len(chunk))})",
+                (namespace, now, *chunk)
+            ).fetchall()
+            found.update((key, json.loads(data)) for key, data in rows)
+        return found
+
+    def set(self, key, data, ttl_seconds, namespace='default'):
+        now = time.time()
+        self._upsert([(namespace, key, json.dumps(data, ensure_ascii=False), now, now + ttl_seconds)])
+
+    def set_many(self, rows, namespace='default'):
+        now = time.time()
+        self._upsert([(namespace, key, json.dumps(data, ensure_ascii=False), now, now + ttl_seconds)
+                      for key, data, ttl_seconds in rows])
+
+    def _upsert(self, rows: List[tuple]):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO cache (namespace, key, data, created_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET data=excluded.data, "
+                "created_at=excluded.created_at, expires_at=excluded.expires_at",
+                rows
+            )
+
+    def evict_expired(self, grace_seconds=0):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time() - grace_seconds,))
+        if cur.rowcount:
+            logger.info(f"Evicted {cur.rowcount} expired cache entries")
+        return cur.rowcount
+
+    def scan(self, namespace='default'):
+        rows = self._conn().execute(
+            "SELECT key, data, created_at, expires_at FROM cache WHERE namespace = ?", (namespace,)
+        ).fetchall()
+        return {row[0]: {'data': json.loads(row[1]), 'created_at': row[2], 'expires_at': row[3]} for row in rows}
+
+    def import_json(self, json_path: str, ttl_seconds: float, namespace: str = 'default') -> int:
+        """
+        One-time import of the legacy {key: {'timestamp', 'data'}} JSON cache.
+        Existing rows win; the import is recorded so it never runs twice.
+        """
+        marker = f"imported:{namespace}:{os.path.abspath(json_path)}"
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+            return 0
+        if not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read legacy cache {json_path}: {e}")
+            return 0
+
+        rows = []
+        for key, entry in legacy.items():
+            try:
+                created = datetime.fromisoformat(entry['timestamp']).timestamp()
+                rows.append((namespace, key, json.dumps(entry['data'], ensure_ascii=False),
+                             created, created + ttl_seconds))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping legacy cache entry '{key}': {e}")
+
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache (namespace, key, data, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         (marker, datetime.now().isoformat()))
+        logger.info(f"Imported {len(rows)} entries from legacy cache {json_path}")
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            connections, self.connections = list(self.connections.values()), {}
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import logging
+from typing import Dict, Any, Optional
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class CheckpointStore:
+    """
+    On-disk stage outputs for the current batch, so a failed run can resume.
+    - Whole-stage outputs (candidates, pre_processed, results) are JSON files
+      written atomically (temp file + rename).
+    - Per-title enrichment results are appended to JSONL files as each unit
+      finishes, so a crash loses at most the unit in flight. Later lines win.
+    """
+    def __init__(self, directory: str = None):
+        self.directory = directory or Config.CHECKPOINT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def clear(self):
+        """Start a fresh run."""
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def drop(self, *stages: str):
+        """Forget these stages (whole-stage outputs and units) so they rerun."""
+        for stage in stages:
+            for suffix in ('.json', '.jsonl'):
+                path = self._path(f"{stage}{suffix}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def has(self, stage: str) -> bool:
+        return os.path.exists(self._path(f"{stage}.json"))
+
+    def save(self, stage: str, data: Any):
+        path = self._path(f"{stage}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        logger.info(f"Checkpoint saved: {stage}")
+
+    def load(self, stage: str) -> Optional[Any]:
+        path = self._path(f"{stage}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def append_units(self, stage: str, units: Dict[str, Any]):
+        """Record finished per-title units (term -> result)."""
+        if not units:
+            return
+        with open(self._path(f"{stage}.jsonl"), 'a', encoding='utf-8') as f:
+            for key, value in units.items():
+                f.write(json.dumps({'key': key, 'value': value}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_units(self, stage: str) -> Dict[str, Any]:
+        path = self._path(f"{stage}.jsonl")
+        units = {}
+        if not os.path.exists(path):
+            return units
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write
+                    logger.warning(f"Ignoring partial checkpoint line in {path}")
+                    continue
+                units[record['key']] = record['value']
+        return units
@@ -1,20 +1,104 @@
 import os
-from dotenv import load_dotenv
+
+def _load_dotenv():
+    """
+    Load the nearest .env (searching up from this package, like
+    python-dotenv's find_dotenv). python-dotenv is only imported when there
+    is a file to read.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables from .env file
-load_dotenv()
+_load_dotenv()
 
 class Config:
     # AniList
     ANILIST_API_URL = "https://graphql.anilist.co"
+    ANILIST_PER_PAGE = 50        # AniList caps perPage at 50
+    ANILIST_RATE_LIMIT = 90      # Requests/min (corrected from X-RateLimit-Limit at runtime)
+    ANILIST_BURST = 10
+    ANILIST_MAX_WORKERS = 4
+    ANILIST_MAX_RETRIES = 3
+    ANILIST_PAGES_PER_QUERY = 4  # Aliased Page blocks per POST (keeps query complexity in bounds)
+    ANILIST_INDEX_TTL_HOURS = 12 # Reuse the ID/sort-key lists for same-day re-runs
+    MEDIA_STORE_FILE = "anilist_store.db"
+    MEDIA_STORE_MAX_AGE_DAYS = 14  # Refetch details even without an updatedAt change (e.g. anime relation status)
+    HISTORY_FILE = "anilist_history.npz"  # Weekly popularity/trending/favourites per title
     
+    # Google Trends
+    TRENDS_CACHE_DB = "trends_cache.db"
+    TRENDS_CACHE_GRACE_DAYS = 30  # Keep expired entries this long before eviction
+    TRENDS_ANCHOR_MIN_AVG = 5     # Anchors last measured below this raw avg are tried after the others
+    TRENDS_LADDER_MIN_RAW = 10    # Min raw (0-100) value for a term to serve as a ladder reference
+    TRENDS_INTENT_CACHE_DAYS = 14 # Intents move slower than base interest
+    TRENDS_INTENT_MIN_SCORE = 1.0 # Intent phase runs for titles at/above this normalized_score...
+    TRENDS_INTENT_TOP_N = 20      # ...or within the top N by normalized_score
+    TRENDS_MIN_DELAY = 3.0        # Seconds between live requests when healthy (x1-2 jitter)
+    TRENDS_MAX_DELAY = 120.0      # Backoff ceiling
+    TRENDS_BREAKER_THRESHOLD = 3  # Consecutive 429s before the circuit opens
+    TRENDS_BREAKER_COOLDOWN = 900 # Seconds before a trial request is allowed
+    # Worker pool: one worker per proxy (comma-separated), at least TRENDS_WORKERS
+    TRENDS_PROXIES = [p.strip() for p in os.getenv("TRENDS_PROXIES", "").split(",") if p.strip()]
+    TRENDS_WORKERS = int(os.getenv("TRENDS_WORKERS", "1"))
+    TRENDS_BASE_URL = os.getenv("TRENDS_BASE_URL")  # Override trends.google.com (e.g. local fake endpoint)
+    # Regional markets (ISO codes, e.g. US,GB,FR,DE): base scores for the top titles only
+    TRENDS_GEOS = [g.strip().upper() for g in os.getenv("TRENDS_GEOS", "").split(",") if g.strip()]
+    TRENDS_REGION_TOP_N = 20      # Titles (by score_total) scored per region: ~TOP_N/4 requests each
+    TRENDS_POOL_CHAIN_GROUPS = 3  # Batch payloads per ladder chain handed to one worker
+    TRENDS_SIGNAL_WINDOW = 4      # Recent weeks averaged for scores and intents
+    TRENDS_VELOCITY = 'step'      # Velocity variant (trends_series.VELOCITY_VARIANTS)
+    TRENDS_SERIES_DAYS = 400      # Raw series behind cached results, kept for offline recompute
+    TRENDS_CACHE_JITTER = 0.2     # Cache TTLs vary +/- this fraction so one batch's entries expire on different days
+    # Batch selection: cached titles are free, live requests go where the rank can move most
+    TRENDS_LIVE_BUDGET = 65            # Live Trends requests per batch: base, then intents, then regions
+    TRENDS_BASE_BUDGET_SHARE = 0.2     # Base requests (x TITLES_PER_PAYLOAD titles) get at most this share
+    TRENDS_EXPECTED_UPLIFT = 10.0      # Assumed score_total uplift from Trends when nothing is cached
+    # Daily refresh (`main.py refresh`): re-fetch entries about to expire, in small batches
+    TRENDS_REFRESH_BUDGET = 8         # Live Trends requests per refresh run
+    TRENDS_REFRESH_HORIZON_DAYS = 1   # Refresh entries expiring before the next daily run
+    TRENDS_REFRESH_TRACK_DAYS = 21    # A term stays on the refresh list this long after its last batch
+
+    # Async pipeline
+    PIPELINE_QUEUE_SIZE = 4  # Chunks buffered between stages
+
+    # Checkpoints (--resume / --retry-failed)
+    CHECKPOINT_DIR = "checkpoints"
+    CHECKPOINT_CHUNK_SIZE = 16   # Titles enriched between checkpoint writes (a worker pool rounds up to a ladder chain per worker)
+
     # Reddit
     REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
     REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
     REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "python:ip-research-tool:v0.1 (by /u/your_username)")
+    REDDIT_SUBREDDITS = "manga+anime+AnimeFigures+MangaCollectors"
+    REDDIT_RATE_LIMIT = 60        # Requests/min (OAuth clients get 100; PRAW backs off on top of this)
+    REDDIT_BURST = 5
+    REDDIT_MAX_WORKERS = 4
+    REDDIT_TITLES_PER_QUERY = 5   # Titles OR-ed into one search...
+    REDDIT_MAX_QUERY_LENGTH = 512 # ...as long as the query stays under Reddit's limit
+    REDDIT_CACHE_DB = "reddit_cache.db"
+    REDDIT_CACHE_HOURS = 24
+    # Stream mode: pull recent posts once per run and match every title locally
+    REDDIT_MODE = os.getenv("REDDIT_MODE", "search")  # search | stream
+    REDDIT_STREAM_LIMIT = 1000    # Per listing (submissions, comments); Reddit stops at ~1000
+    REDDIT_MIN_TITLE_LENGTH = 4   # Shorter Latin aliases are too ambiguous to match
     
     # Output
     REPORT_FILE = "report.csv"
+    # Any of csv, jsonl, sqlite (comma-separated); extra formats share REPORT_FILE's stem
+    REPORT_FORMATS = [f.strip() for f in os.getenv("REPORT_FORMATS", "csv").split(",") if f.strip()]
+    # Run summary: stage timings, request/retry/429 counts, sleep seconds, cache hits
+    METRICS_FILE = os.getenv("METRICS_FILE", "run_metrics.json")
+    METRICS_PROM_FILE = os.getenv("METRICS_PROM_FILE", "run_metrics.prom")  # Prometheus textfile; empty disables
     
     @classmethod
     def validate(cls):
@@ -1,18 +1,95 @@
 
 import logging
-import time
-import random
-import json
-import os
 import math
-from typing import Dict, List, Optional, Any
-from pytrends.request import TrendReq
-from datetime import datetime, timedelta
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Any, Callable, TYPE_CHECKING
+from src.config import Config
+from src.cache_store import CacheBackend, SQLiteCache
+from src.pacing import PacingController, CircuitOpenError
+from src.titles import canonical_title
+from src.trends_series import pack_series, derive_signals, rederive
+from src.metrics import metrics
+
+if TYPE_CHECKING:
+    from pytrends.request import TrendReq
 
 logger = logging.getLogger(__name__)
 
+class AnchorHealth:
+    """
+    Per-run anchor selection, shared by every term (and every client/worker
+    given the same instance). An anchor measured near zero once is skipped
+    for the rest of the run. Other measurements, including those read back
+    from cache entries, are kept as the anchor's recent average; anchors whose
+    last average is below TRENDS_ANCHOR_MIN_AVG (coarse 0-100 resolution) are
+    tried after the well-resolved ones. Anchor volume differs by market, so
+    each region keeps its own health (for_geo).
+    """
+    def __init__(self, candidates: List[str]):
+        self.candidates = list(candidates)
+        self.bad = set()
+        self.recent_avg = {}
+        self.lock = threading.Lock()
+        self._regions = {}
+
+    def for_geo(self, geo: str) -> 'AnchorHealth':
+        """Health for one region; the same instance for every caller sharing this one."""
+        if not geo:
+            return self
+        with self.lock:
+            if geo not in self._regions:
+                self._regions[geo] = AnchorHealth(self.candidates)
+            return self._regions[geo]
+
+    def ordered(self, term: Optional[str] = None, preferred: Optional[str] = None) -> List[str]:
+        """Healthy anchors in try order, excluding the term itself."""
+        with self.lock:
+            healthy = [a for a in self.candidates if a not in self.bad]
+            weak = {a for a, avg in self.recent_avg.items() if avg < Config.TRENDS_ANCHOR_MIN_AVG}
+        # Stable: candidate order within the well-resolved and the weak group
+        healthy.sort(key=lambda a: a in weak)
+        if term is not None:
+            healthy = [a for a in healthy if a.casefold() != term.casefold()]
+        if preferred in healthy:
+            healthy.remove(preferred)
+            healthy.insert(0, preferred)
+        return healthy
+
+    def record(self, anchor: str, avg: float):
+        with self.lock:
+            self.recent_avg[anchor] = float(avg)
+
+    def mark_bad(self, anchor: str, avg: float):
+        metrics.inc('anchor_failures', anchor=anchor)
+        with self.lock:
+            if anchor not in self.bad:
+                logger.warning(f"Anchor '{anchor}' marked unhealthy for this run (recent avg {avg})")
+            self.bad.add(anchor)
+            self.recent_avg[anchor] = float(avg)
+
+    def seed_from_cache(self, data: Dict[str, Any]):
+        """Reuse the anchor measurement stored with a cached result."""
+        anchor = data.get('anchor_term')
+        value = data.get('anchor_value')
+        if anchor in self.candidates and anchor not in self.recent_avg \
+                and value is not None and not math.isnan(value):
+            self.record(anchor, value)
+
 class GoogleTrendsClient:
-    CACHE_FILE = "trends_cache.json"
+    LEGACY_CACHE_FILE = "trends_cache.json"
+    CACHE_NAMESPACE = 'trends'
+    BASE_CACHE_NAMESPACE = 'trends_base'
+    INTENT_CACHE_NAMESPACE = 'trends_intent'
+    # Raw interest_over_time behind each cached result (see trends_series.py)
+    SERIES_NAMESPACES = {
+        CACHE_NAMESPACE: 'trends_series',
+        BASE_CACHE_NAMESPACE: 'trends_base_series',
+        INTENT_CACHE_NAMESPACE: 'trends_intent_series',
+    }
+    # pytrends allows 5 keywords per payload: 1 reference + 4 titles
+    TITLES_PER_PAYLOAD = 4
     # List of anchors to try in order. We want a stable high-volume term.
     ANCHOR_CANDIDATES = [
         "One Piece",
@@ -22,27 +99,199 @@ class GoogleTrendsClient:
         "Demon Slayer"
     ]
     CACHE_EXPIRY_DAYS = 7
+    # Extra requests a single term may spend finding a working anchor
+    MAX_ANCHOR_RETRIES = 1
 
-    def __init__(self):
+    def __init__(self, cache: Optional[CacheBackend] = None, pacing: Optional[PacingController] = None,
+                 anchors: Optional[AnchorHealth] = None, pytrends: Optional['TrendReq'] = None,
+                 pytrends_factory: Optional[Callable[[], 'TrendReq']] = None, geo: str = ''):
+        # Built on the first live request (TrendReq fetches a Google cookie on
+        # construction), so fully cached runs never import or connect pytrends
+        self._pytrends = pytrends
+        self._pytrends_factory = pytrends_factory or self._default_pytrends
+        self.cache = cache if cache is not None else self._open_default_cache()
+        # Shared across every request this client makes (base, intents, anchor fallbacks)
+        self.pacing = pacing if pacing is not None else PacingController(
+            min_delay=Config.TRENDS_MIN_DELAY,
+            max_delay=Config.TRENDS_MAX_DELAY,
+            breaker_threshold=Config.TRENDS_BREAKER_THRESHOLD,
+            cooldown=Config.TRENDS_BREAKER_COOLDOWN
+        )
+        self.anchors = anchors if anchors is not None else AnchorHealth(self.ANCHOR_CANDIDATES)
+        # Region (ISO code, '' = worldwide); see for_geo()
+        self.geo = geo
+        self._regions = {}
+
+    @staticmethod
+    def _default_pytrends() -> 'TrendReq':
+        from pytrends.request import TrendReq
         # hl='en-US', tz=360 (US CST)
-        self.pytrends = TrendReq(hl='en-US', tz=360)
-        self.cache = self._load_cache()
+        return TrendReq(hl='en-US', tz=360)
 
-    def _load_cache(self) -> Dict[str, Any]:
-        if os.path.exists(self.CACHE_FILE):
-            try:
-                with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
-        return {}
+    @property
+    def pytrends(self) -> 'TrendReq':
+        if self._pytrends is None:
+            self._pytrends = self._pytrends_factory()
+        return self._pytrends
+
+    def _open_default_cache(self) -> CacheBackend:
+        cache = SQLiteCache(Config.TRENDS_CACHE_DB)
+        cache.import_json(self.LEGACY_CACHE_FILE, self._ttl(), namespace=self.CACHE_NAMESPACE)
+        cache.evict_expired(grace_seconds=Config.TRENDS_CACHE_GRACE_DAYS * 86400)
+        return cache
+
+    def _ttl(self) -> float:
+        return self.CACHE_EXPIRY_DAYS * 86400
+
+    def for_geo(self, geo: str) -> 'GoogleTrendsClient':
+        """
+        Client for one region. It shares this client's cache (keys prefixed
+        by region), pacing and pytrends session, so regions queue behind one
+        rate budget. Anchor health is kept per region (AnchorHealth.for_geo):
+        an anchor that is near zero in one small market stays usable
+        worldwide and in the others.
+        """
+        if geo == self.geo:
+            return self
+        if geo not in self._regions:
+            self._regions[geo] = GoogleTrendsClient(cache=self.cache, pacing=self.pacing,
+                                                    anchors=self.anchors.for_geo(geo),
+                                                    pytrends_factory=lambda: self.pytrends, geo=geo)
+        return self._regions[geo]
+
+    def get_regional_base_scores(self, terms_by_geo: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        get_base_scores per region ({geo: terms} -> {geo: {term: result}}),
+        one region after another through the shared pacing.
+        """
+        return {geo: self.for_geo(geo).get_base_scores(terms) for geo, terms in terms_by_geo.items()}
 
-    def _save_cache(self):
+    def _cache_key(self, term: str) -> str:
+        key = canonical_title(term) or term
+        return f"{self.geo}|{key}" if self.geo else key
+
+    def _cache_keys(self, term: str) -> List[str]:
+        # Worldwide entries written before canonical keys are stored under the raw term
+        if self.geo:
+            return [self._cache_key(term)]
+        return list(dict.fromkeys([self._cache_key(term), term]))
+
+    def _cache_get(self, term: str, namespace: str) -> Optional[Dict[str, Any]]:
+        outcome = 'miss'
+        for key in self._cache_keys(term):
+            entry = self.cache.get_entry(key, namespace=namespace)
+            if entry is None:
+                continue
+            if entry['expires_at'] > time.time():
+                metrics.cache_lookup(namespace, 'hit')
+                return entry['data']
+            outcome = 'expired'
+        metrics.cache_lookup(namespace, outcome)
+        return None
+
+    def _peek_many(self, terms: List[str], namespaces: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fresh cached data per term from the first namespace that has it, in
+        bulk and without touching hit/miss metrics (used to plan work).
+        """
+        found = {}
+        for namespace in namespaces:
+            pending = [term for term in terms if term not in found]
+            if not pending:
+                break
+            keys = {term: self._cache_keys(term) for term in pending}
+            hits = self.cache.get_many([key for term_keys in keys.values() for key in term_keys],
+                                       namespace=namespace)
+            for term, term_keys in keys.items():
+                data = next((hits[key] for key in term_keys if key in hits), None)
+                if data is not None:
+                    found[term] = data
+        return found
+
+    def cached_base_scores(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Terms get_base_scores would answer from cache, with their data."""
+        return self._peek_many(terms, [self.CACHE_NAMESPACE, self.BASE_CACHE_NAMESPACE])
+
+    def cached_intents(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Terms get_intents would answer from cache, with their data."""
+        return self._peek_many(terms, [self.INTENT_CACHE_NAMESPACE, self.CACHE_NAMESPACE])
+
+    def cached_regional_base_scores(self, terms_by_geo: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{geo: {term: data}} that get_regional_base_scores would answer from cache."""
+        return {geo: self.for_geo(geo).cached_base_scores(terms) for geo, terms in terms_by_geo.items()}
+
+    def _cache_set(self, term: str, data: Dict[str, Any], ttl: float, namespace: str):
+        # Jittered so entries written by one batch don't all expire on the same day
+        jitter = Config.TRENDS_CACHE_JITTER
+        ttl *= random.uniform(1 - jitter, 1 + jitter)
+        self.cache.set(self._cache_key(term), data, ttl, namespace=namespace)
+
+    def _store_series(self, term: str, record: Dict[str, Any], namespace: str):
+        # Kept well past the derived entry so formulas can be replayed offline
+        self.cache.set(self._cache_key(term), record, Config.TRENDS_SERIES_DAYS * 86400,
+                       namespace=self.SERIES_NAMESPACES[namespace])
+
+    def recompute(self, window: Optional[int] = None, velocity: Optional[str] = None) -> Dict[str, int]:
+        """
+        Re-derive every cached result (expired ones too) from its stored
+        series with the current formulas; no requests. Expiry is unchanged.
+        Returns updated entries per namespace.
+        """
+        now = time.time()
+        counts = {}
+        for namespace, series_namespace in self.SERIES_NAMESPACES.items():
+            records = self.cache.scan(series_namespace)
+            rows = []
+            for key, entry in self.cache.scan(namespace).items():
+                # Legacy raw-term keys share the canonical key's series
+                record = records.get(key) or records.get(self._cache_key(key))
+                if record is None:
+                    continue
+                rows.append((key, rederive(entry['data'], record['data'], window, velocity),
+                             entry['expires_at'] - now))
+            self.cache.set_many(rows, namespace=namespace)
+            counts[namespace] = len(rows)
+            logger.info(f"Recomputed {len(rows)} '{namespace}' entries from stored series")
+        return counts
+
+    def _fetch_interest(self, kw_list: List[str], label: str):
+        """
+        Paced interest_over_time request. Raises CircuitOpenError without
+        sleeping when the breaker is open.
+        """
+        try:
+            metrics.inc('sleep_seconds', self.pacing.wait(label), api='trends')
+        except CircuitOpenError:
+            metrics.inc('circuit_open_skips', api='trends')
+            raise
+        metrics.inc('requests', api='trends')
+        metrics.inc('request_keywords', len(kw_list), api='trends')
+        if self.geo:
+            metrics.inc('region_requests', geo=self.geo)
         try:
-            with open(self.CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            self.pytrends.build_payload(kw_list, cat=0, timeframe='today 12-m', geo=self.geo)
+            df = self.pytrends.interest_over_time()
         except Exception as e:
-            logger.warning(f"Failed to save cache: {e}")
+            metrics.inc('rate_limited' if "429" in str(e) else 'errors', api='trends')
+            self.pacing.record_error(e)
+            raise
+        metrics.inc('response_rows', len(df), api='trends')
+        self.pacing.record_success()
+        return df
+
+    def _stale_fallback(self, term: str, namespaces: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Expired-but-not-evicted cache entry, used while the breaker is open.
+        """
+        for namespace in namespaces:
+            entry = next(filter(None, (self.cache.get_entry(key, namespace=namespace)
+                                       for key in self._cache_keys(term))), None)
+            if entry:
+                logger.info(f"Circuit open: using stale cached Trends data for '{term}'")
+                data = entry['data']
+                data['status'] = 'cached_stale'
+                return data
+        return None
 
     def get_signals(self, term: str) -> Dict[str, Any]:
         """
@@ -50,25 +299,17 @@ class GoogleTrendsClient:
         Returns keys: normalized_score, intent_manga, intent_merch, velocity, status, notes, anchor_term, anchor_value
         """
         # 1. Check Cache
-        cached_entry = self.cache.get(term)
-        if cached_entry:
-            timestamp = cached_entry.get('timestamp')
-            if timestamp:
-                dt_ts = datetime.fromisoformat(timestamp)
-                if datetime.now() - dt_ts < timedelta(days=self.CACHE_EXPIRY_DAYS):
-                     logger.info(f"Using cached Trends data for '{term}'")
-                     cached_entry['data']['status'] = 'cached'
-                     return cached_entry['data']
-
-        # 2. Fetch Live with Anchor Fallback
-        # Sleep to avoid rate limits
-        sleep_time = random.uniform(3, 6)
-        logger.info(f"Sleeping {sleep_time:.2f}s before Trends request for '{term}'...")
-        time.sleep(sleep_time)
-
-        final_result = self._create_empty_result('error_no_anchor')
+        cached_data = self._cache_get(term, self.CACHE_NAMESPACE)
+        if cached_data:
+            logger.info(f"Using cached Trends data for '{term}'")
+            cached_data['status'] = 'cached'
+            self.anchors.seed_from_cache(cached_data)
+            return cached_data
+
+        # 2. Fetch Live with Anchor Fallback (pacing sleeps before each request)
+        final_result = self.empty_result('error_no_anchor')
         
-        for anchor in self.ANCHOR_CANDIDATES:
+        for anchor in self.anchors.ordered(term)[:1 + self.MAX_ANCHOR_RETRIES]:
             try:
                 kw_list = [
                     term,
@@ -78,8 +319,7 @@ class GoogleTrendsClient:
                     f"{term} merch"
                 ]
                 
-                self.pytrends.build_payload(kw_list, cat=0, timeframe='today 12-m')
-                df = self.pytrends.interest_over_time()
+                df = self._fetch_interest(kw_list, term)
                 
                 if df.empty:
                     # If empty, maybe the TERM is obscure, or API failed silently? 
@@ -89,64 +329,48 @@ class GoogleTrendsClient:
                     # actually if df is empty, we have nothing.
                     logger.warning(f"No data returned for [{term}, {anchor}]")
                     # If purely no data, returning NaN is correct. 
-                    final_result = self._create_empty_result('no_data')
+                    final_result = self.empty_result('no_data')
                     break 
 
                 # Check Anchor Health
-                recent_df = df.tail(4)
+                recent_df = df.tail(Config.TRENDS_SIGNAL_WINDOW)
                 anchor_avg = recent_df[anchor].mean()
                 
                 if anchor_avg < 0.1:
                     logger.warning(f"Anchor '{anchor}' has near-zero volume ({anchor_avg}). Trying next anchor...")
+                    self.anchors.mark_bad(anchor, anchor_avg)
                     continue # Try next anchor
+                self.anchors.record(anchor, float(anchor_avg))
 
                 # --- Valid Anchor Found ---
-                term_avg = recent_df[term].mean()
-                
-                # Normalize Score (100 = 100% of Anchor Volume)
-                norm_score = (term_avg / anchor_avg) * 100
-                
-                # Intents
-                img_manga = recent_df[kw_list[2]].mean()
-                img_figure = recent_df[kw_list[3]].mean()
-                img_merch = recent_df[kw_list[4]].mean()
-                intent_merch_raw = max(img_figure, img_merch)
-                
-                intent_manga_norm = (img_manga / anchor_avg) * 100
-                intent_merch_norm = (intent_merch_raw / anchor_avg) * 100
-
-                # Velocity
-                velocity = float('nan')
-                if len(df) >= 3:
-                     current = df[term].iloc[-2]
-                     prev = df[term].iloc[-3]
-                     if prev > 0:
-                         velocity = (current - prev) / prev
-                     elif current > 0:
-                         velocity = 1.0 
-                     else:
-                         velocity = 0.0
+                # Score (100 = 100% of Anchor Volume), intents and velocity
+                # all come from the stored series
+                record = pack_series(df, {'term': term, 'reference': anchor, 'manga': kw_list[2],
+                                          'figure': kw_list[3], 'merch': kw_list[4]}, anchor=anchor)
+                signals = derive_signals(record)
+                norm_score = signals['normalized_score']
                 
                 result_data = {
-                    'normalized_score': float(norm_score),
-                    'intent_manga': float(intent_manga_norm),
-                    'intent_merch': float(intent_merch_norm),
-                    'velocity': float(velocity),
+                    'normalized_score': norm_score,
+                    'intent_manga': signals['intent_manga'],
+                    'intent_merch': signals['intent_merch'],
+                    'velocity': signals['velocity'],
                     'status': 'success',
                     'notes': f"Anchor: {anchor} (Avg {anchor_avg:.1f})",
                     'anchor_term': anchor,
-                    'anchor_value': float(anchor_avg)
+                    'anchor_value': signals['anchor_value']
                 }
                 
                 # Success! Save and Return
-                self.cache[term] = {
-                    'timestamp': datetime.now().isoformat(),
-                    'data': result_data
-                }
-                self._save_cache()
+                self._store_series(term, record, self.CACHE_NAMESPACE)
+                self._cache_set(term, result_data, self._ttl(), self.CACHE_NAMESPACE)
                 logger.info(f"Trends success for '{term}' via '{anchor}': Score {norm_score:.1f}")
                 return result_data
 
+            except CircuitOpenError:
+                stale = self._stale_fallback(term, [self.CACHE_NAMESPACE])
+                return stale if stale else self.empty_result('error_circuit_open')
+
             except Exception as e:
                 logger.error(f"Trends API error for [{term}, {anchor}]: {e}")
                 # If it's a 429, switching anchor might not help immediately, 
@@ -154,15 +378,241 @@ class GoogleTrendsClient:
                 # Generally 429 means we are blocked. 
                 # Break loop and return failure if it's a RateLimit (usually response code 429)
                 if "429" in str(e):
-                    final_result = self._create_empty_result('error_api')
+                    final_result = self.empty_result('error_api')
                     break
                 # Other errors? Continue to try next anchor just in case.
-                final_result = self._create_empty_result('error_unknown')
+                final_result = self.empty_result('error_unknown')
         
         # If loop finishes without returning
         return final_result
 
-    def _create_empty_result(self, status: str) -> Dict[str, Any]:
+    def get_base_scores(self, terms: List[str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch mode: base normalized_score + velocity for many terms, packing
+        TITLES_PER_PAYLOAD titles next to one reference term per request.
+        Groups are chained into a ladder: when a group contains a term that is
+        well resolved but smaller than the current reference, it becomes the
+        reference for the next group and scores are rescaled back to the anchor.
+        Intents are not queried (NaN). Same result keys as get_signals.
+        refresh: fetch every term live even if it is cached (see refresh.py).
+        """
+        results = {}
+        live_terms = []
+        for term in dict.fromkeys(terms):
+            cached_data = None if refresh else (self._cache_get(term, self.CACHE_NAMESPACE)
+                                                or self._cache_get(term, self.BASE_CACHE_NAMESPACE))
+            if cached_data:
+                cached_data['status'] = 'cached'
+                self.anchors.seed_from_cache(cached_data)
+                results[term] = cached_data
+            else:
+                live_terms.append(term)
+
+        logger.info(f"Trends batch: {len(results)} cached, {len(live_terms)} live "
+                    f"(~{math.ceil(len(live_terms) / self.TITLES_PER_PAYLOAD)} requests)")
+        if not live_terms:
+            return results
+
+        anchors = self.anchors.ordered()
+        if not anchors:
+            logger.warning("No healthy anchors left for this run.")
+            for term in live_terms:
+                results[term] = self.empty_result('error_no_anchor')
+            return results
+        anchor = anchors.pop(0)
+        # Reference term and its score relative to the anchor (anchor itself = 100)
+        reference, reference_norm = anchor, 100.0
+
+        groups = [live_terms[i:i + self.TITLES_PER_PAYLOAD]
+                  for i in range(0, len(live_terms), self.TITLES_PER_PAYLOAD)]
+        g = 0
+        while g < len(groups):
+            group = groups[g]
+            kw_list = [reference] + [t for t in group if t != reference]
+
+            try:
+                df = self._fetch_interest(kw_list, f"batch {g + 1}/{len(groups)}")
+            except CircuitOpenError:
+                # Fail fast for everything left; fall back to stale cache where we can
+                for rest in groups[g:]:
+                    for t in rest:
+                        stale = self._stale_fallback(t, [self.CACHE_NAMESPACE, self.BASE_CACHE_NAMESPACE])
+                        results[t] = stale if stale else self.empty_result('error_circuit_open')
+                break
+            except Exception as e:
+                logger.error(f"Trends API error for batch {kw_list}: {e}")
+                # 429s back off in the pacing controller; the breaker stops the run if they persist
+                status = 'error_api' if "429" in str(e) else 'error_unknown'
+                for t in group:
+                    results[t] = self.empty_result(status)
+                g += 1
+                continue
+
+            if df.empty:
+                logger.warning(f"No data returned for batch {kw_list}")
+                for t in group:
+                    results[t] = self.empty_result('no_data')
+                g += 1
+                continue
+
+            recent_df = df.tail(Config.TRENDS_SIGNAL_WINDOW)
+            reference_avg = recent_df[reference].mean()
+
+            if reference_avg < 0.1:
+                if reference != anchor:
+                    # Bridge term dwarfed by this group; redo the group against the anchor
+                    logger.warning(f"Ladder reference '{reference}' near zero. Retrying group with anchor '{anchor}'")
+                    reference, reference_norm = anchor, 100.0
+                    continue
+                self.anchors.mark_bad(anchor, reference_avg)
+                if not anchors:
+                    logger.warning("All anchors near zero. Giving up on remaining batch.")
+                    for rest in groups[g:]:
+                        for t in rest:
+                            results[t] = self.empty_result('error_no_anchor')
+                    break
+                logger.warning(f"Anchor '{anchor}' has near-zero volume ({reference_avg}). Trying next anchor...")
+                anchor = anchors.pop(0)
+                reference, reference_norm = anchor, 100.0
+                continue
+
+            if reference == anchor:
+                self.anchors.record(anchor, float(reference_avg))
+            anchor_value = reference_avg * 100 / reference_norm
+            if reference == anchor:
+                notes = f"Anchor: {anchor} (Avg {anchor_value:.1f})"
+            else:
+                notes = f"Anchor: {anchor} (Ladder via {reference})"
+
+            for t in group:
+                record = pack_series(df, {'term': t, 'reference': reference}, anchor=anchor,
+                                     reference=reference, reference_norm=reference_norm)
+                signals = derive_signals(record)
+                norm_score = signals['normalized_score']
+                result_data = {
+                    'normalized_score': norm_score,
+                    'intent_manga': float('nan'),
+                    'intent_merch': float('nan'),
+                    'velocity': signals['velocity'],
+                    'status': 'success',
+                    'notes': notes,
+                    'anchor_term': anchor,
+                    'anchor_value': signals['anchor_value']
+                }
+                self._store_series(t, record, self.BASE_CACHE_NAMESPACE)
+                self._cache_set(t, result_data, self._ttl(), self.BASE_CACHE_NAMESPACE)
+                results[t] = result_data
+                logger.info(f"Trends batch success for '{t}' via '{reference}': Score {norm_score:.1f}")
+
+            # Next reference: the smallest term here that is still well resolved,
+            # so lower-volume titles in the next group don't round to zero
+            resolved = [(recent_df[t].mean(), t) for t in kw_list
+                        if recent_df[t].mean() >= Config.TRENDS_LADDER_MIN_RAW]
+            if resolved:
+                _, next_reference = min(resolved)
+                if next_reference != reference:
+                    reference_norm = results[next_reference]['normalized_score']
+                    reference = next_reference
+            g += 1
+
+        return results
+
+    def get_intents(self, term: str, anchor: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Intent phase: "{term} manga" / "{term} figure" / "{term} merch" normalized
+        to the anchor used for the base score. Cached separately from base
+        scores (TRENDS_INTENT_CACHE_DAYS) so the two phases expire independently.
+        Returns keys: intent_manga, intent_merch, intent_status
+        """
+        cached_data = None if refresh else self._cache_get(term, self.INTENT_CACHE_NAMESPACE)
+        if cached_data is None and not refresh:
+            # A full get_signals entry already carries intents
+            full = self._cache_get(term, self.CACHE_NAMESPACE)
+            if full:
+                cached_data = {'intent_manga': full['intent_manga'], 'intent_merch': full['intent_merch']}
+        if cached_data:
+            logger.info(f"Using cached Trends intents for '{term}'")
+            cached_data['intent_status'] = 'cached'
+            return cached_data
+
+        anchors = self.anchors.ordered(preferred=anchor)[:1 + self.MAX_ANCHOR_RETRIES]
+
+        status = 'error_no_anchor'
+        for anchor in anchors:
+            kw_list = [
+                anchor,
+                f"{term} manga",
+                f"{term} figure",
+                f"{term} merch"
+            ]
+            try:
+                df = self._fetch_interest(kw_list, f"{term} (intents)")
+            except CircuitOpenError:
+                stale = self._stale_fallback(term, [self.INTENT_CACHE_NAMESPACE])
+                if stale:
+                    stale['intent_status'] = stale.pop('status')
+                    return stale
+                status = 'error_circuit_open'
+                break
+            except Exception as e:
+                logger.error(f"Trends API error for intents [{term}, {anchor}]: {e}")
+                if "429" in str(e):
+                    status = 'error_api'
+                    break
+                status = 'error_unknown'
+                continue
+
+            if df.empty:
+                logger.warning(f"No intent data returned for [{term}, {anchor}]")
+                status = 'no_data'
+                break
+
+            recent_df = df.tail(Config.TRENDS_SIGNAL_WINDOW)
+            anchor_avg = recent_df[anchor].mean()
+            if anchor_avg < 0.1:
+                logger.warning(f"Anchor '{anchor}' has near-zero volume ({anchor_avg}). Trying next anchor...")
+                self.anchors.mark_bad(anchor, anchor_avg)
+                continue
+            self.anchors.record(anchor, float(anchor_avg))
+
+            record = pack_series(df, {'reference': anchor, 'manga': kw_list[1], 'figure': kw_list[2],
+                                      'merch': kw_list[3]}, anchor=anchor)
+            signals = derive_signals(record)
+            result_data = {
+                'intent_manga': signals['intent_manga'],
+                'intent_merch': signals['intent_merch'],
+                'intent_status': 'success'
+            }
+            ttl = Config.TRENDS_INTENT_CACHE_DAYS * 86400
+            self._store_series(term, record, self.INTENT_CACHE_NAMESPACE)
+            self._cache_set(term, result_data, ttl, self.INTENT_CACHE_NAMESPACE)
+            logger.info(f"Trends intents for '{term}' via '{anchor}': "
+                        f"manga {result_data['intent_manga']:.1f}, merch {result_data['intent_merch']:.1f}")
+            return result_data
+
+        return self.empty_intents(status)
+
+    def get_signals_many(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """get_signals for each term (one after another; see TrendsWorkerPool for parallel)."""
+        return {term: self.get_signals(term) for term in dict.fromkeys(terms)}
+
+    @property
+    def checkpoint_chunk_size(self) -> int:
+        """Terms to enrich between checkpoint writes."""
+        return Config.CHECKPOINT_CHUNK_SIZE
+
+    def get_intents_many(self, items: List[tuple], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        get_intents for each (term, anchor) pair.
+        """
+        return {term: self.get_intents(term, anchor=anchor, refresh=refresh) for term, anchor in items}
+
+    @staticmethod
+    def empty_intents(status: str) -> Dict[str, Any]:
+        return {'intent_manga': float('nan'), 'intent_merch': float('nan'), 'intent_status': status}
+
+    @staticmethod
+    def empty_result(status: str) -> Dict[str, Any]:
         return {
             'normalized_score': float('nan'),
             'intent_manga': float('nan'),
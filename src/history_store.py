@@ -0,0 +1,127 @@
+import os
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Iterable
+import numpy as np
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class HistoryStore:
+    """
+    Weekly AniList metrics per anilist_id, kept as dense arrays in one .npz:
+    ids (N), weeks (W, Monday date ordinals, ascending) and one float32
+    N x W matrix per metric (NaN where an id wasn't seen that week).
+    Re-running within a week overwrites that week's column.
+    """
+    METRICS = ('popularity', 'trending', 'favourites')
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.HISTORY_FILE
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.weeks = np.zeros(0, dtype=np.int32)
+        self.values = {metric: np.zeros((0, 0), dtype=np.float32) for metric in self.METRICS}
+        if os.path.exists(self.path):
+            with np.load(self.path) as data:
+                self.ids = data['ids']
+                self.weeks = data['weeks']
+                self.values = {metric: data[metric] for metric in self.METRICS}
+
+    @staticmethod
+    def week_of(day: Optional[date] = None) -> int:
+        day = day or date.today()
+        return (day - timedelta(days=day.weekday())).toordinal()
+
+    def record(self, items: Iterable[Dict[str, Any]], week: Optional[int] = None):
+        """Store this week's popularity/trending/favourites for `items` and save."""
+        items = [item for item in items if item.get('id') is not None]
+        if not items:
+            return
+        week = week if week is not None else self.week_of()
+
+        # New week column (kept sorted)
+        col = int(np.searchsorted(self.weeks, week))
+        if col == len(self.weeks) or self.weeks[col] != week:
+            self.weeks = np.insert(self.weeks, col, week)
+            for metric in self.METRICS:
+                self.values[metric] = np.insert(self.values[metric], col, np.nan, axis=1)
+
+        # New id rows
+        new_ids = np.setdiff1d(np.array([item['id'] for item in items], dtype=np.int64), self.ids)
+        if len(new_ids):
+            self.ids = np.concatenate([self.ids, new_ids])
+            for metric in self.METRICS:
+                pad = np.full((len(new_ids), len(self.weeks)), np.nan, dtype=np.float32)
+                self.values[metric] = np.vstack([self.values[metric], pad])
+
+        rows = self._rows([item['id'] for item in items])
+        for metric in self.METRICS:
+            self.values[metric][rows, col] = np.array(
+                [item.get(metric) if item.get(metric) is not None else np.nan for item in items],
+                dtype=np.float32
+            )
+        self.save()
+        logger.info(f"AniList history: recorded {len(items)} titles for week {date.fromordinal(week)} "
+                    f"({len(self.ids)} titles x {len(self.weeks)} weeks)")
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, ids=self.ids, weeks=self.weeks, **self.values)
+        os.replace(tmp_path, self.path)
+
+    def _rows(self, ids: Iterable[int]) -> np.ndarray:
+        """Row index per id (-1 if unknown)."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.full(len(ids), -1)
+        order = np.argsort(self.ids)
+        pos = np.searchsorted(self.ids, ids, sorter=order)
+        pos = np.minimum(pos, len(self.ids) - 1)
+        rows = order[pos]
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def signals(self, ids: Iterable[int], metric: str = 'popularity') -> Dict[str, np.ndarray]:
+        """
+        Per id, from the last three recorded weeks:
+        - velocity: week-over-week relative change (per week of gap)
+        - acceleration: change in velocity versus the week before
+        - delta: absolute change per week
+        NaN where there isn't enough history.
+        """
+        rows = self._rows(ids)
+        n = len(rows)
+        out = {key: np.full(n, np.nan) for key in ('velocity', 'acceleration', 'delta')}
+        if len(self.weeks) < 2 or n == 0:
+            return out
+
+        known = rows >= 0
+        window = self.values[metric][rows[known]][:, -3:].astype(float)
+        weeks = self.weeks[-3:].astype(float)
+        gaps = np.diff(weeks) / 7.0   # weeks between consecutive recorded columns
+
+        deltas = np.diff(window, axis=1) / gaps
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = deltas / window[:, :-1]
+        rates[~np.isfinite(rates)] = np.nan
+
+        out['delta'][known] = deltas[:, -1]
+        out['velocity'][known] = rates[:, -1]
+        if rates.shape[1] >= 2:
+            out['acceleration'][known] = rates[:, -1] - rates[:, -2]
+        return out
+
+    def movers(self, metric: str = 'popularity', top_n: int = 10) -> List[Dict[str, Any]]:
+        """Biggest week-over-week relative gainers among ids seen in the latest week."""
+        if len(self.weeks) < 2:
+            return []
+        latest = ~np.isnan(self.values[metric][:, -1])
+        ids = self.ids[latest]
+        stats = self.signals(ids, metric)
+        velocity = np.where(np.isnan(stats['velocity']), -np.inf, stats['velocity'])
+        order = np.argsort(-velocity, kind='stable')[:top_n]
+        return [
+            {'anilist_id': int(ids[i]), 'velocity': float(stats['velocity'][i]),
+             'acceleration': float(stats['acceleration'][i]), 'delta': float(stats['delta'][i])}
+            for i in order if np.isfinite(velocity[i])
+        ]
@@ -1,36 +1,54 @@
 import csv
 import logging
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional
 import os
+from src.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+MANUAL_COLUMNS = ['[MANUAL] Sold 30d', '[MANUAL] Price Range', '[MANUAL] Result (Pass/Fail)']
+
+FIELDNAMES = [
+    'Tier', 'Title', 'Anime', 'Actionable Score', 'Bonus', 'Pri Score', 'Trends Norm',
+    'Test SKU 1', 'Test SKU 2', 'eBay Query', 'Mercari Keywords (JP)',
+    *MANUAL_COLUMNS,
+    'Notes', 'AniList ID'
+]
+
 class MarketGate:
     def __init__(self, input_file: str = "report.csv", output_file: str = "buy_list.csv"):
         self.input_file = input_file
         self.output_file = output_file
 
-    def process(self):
+    def process(self, rows: Optional[List[Dict[str, Any]]] = None):
         """
-        Reads report.csv, applies market gate logic, and writes buy_list.csv.
+        Applies market gate logic to the processed rows (or report.csv when
+        none are passed) and writes buy_list.csv, carrying the [MANUAL]
+        columns over from the existing buy list.
         """
-        if not os.path.exists(self.input_file):
-            logger.error(f"Input file not found: {self.input_file}")
-            return
+        if rows is None:
+            if not os.path.exists(self.input_file):
+                logger.error(f"Input file not found: {self.input_file}")
+                return
+            rows = self._read_csv()
 
-        rows = self._read_csv()
-        processed_rows = []
+        with metrics.stage('market_gate'):
+            processed_rows = []
 
-        for row in rows:
-            processed_row = self._process_row(row)
-            if processed_row:
-                processed_rows.append(processed_row)
+            for row in rows:
+                processed_row = self._process_row(row)
+                if processed_row:
+                    processed_rows.append(processed_row)
 
-        # Sort by Tier (A->B->C) then Score (Desc)
-        # Tier logic: A < B < C (lexicographically A comes first)
-        processed_rows.sort(key=lambda x: (x['Tier'], -float(x['Pri Score'])))
+            # Sort by Tier (A->B->C) then Score (Desc)
+            # Tier logic: A < B < C (lexicographically A comes first)
+            processed_rows.sort(key=lambda x: (x['Tier'], -float(x['Pri Score'])))
 
-        self._write_csv(processed_rows)
+            processed_rows += self._merge_manual(processed_rows)
+            self._write_csv(processed_rows)
+        for tier, count in Counter(row['Tier'] for row in processed_rows).items():
+            metrics.inc('buy_list_rows', count, tier=tier)
         logger.info(f"Market Gate processed {len(processed_rows)} items. Saved to {self.output_file}")
 
     def _read_csv(self) -> List[Dict[str, str]]:
@@ -38,9 +56,49 @@ class MarketGate:
             reader = csv.DictReader(f)
             return list(reader)
 
+    @staticmethod
+    def _row_key(row: Dict[str, Any]) -> str:
+        # Buy lists written before the AniList ID column only have titles
+        media_id = row.get('AniList ID')
+        return f"id:{media_id}" if media_id else f"title:{row.get('Title', '')}"
+
+    def _merge_manual(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Copy analyst input from the existing buy list onto `rows` (in place),
+        matched by AniList ID, or by Title for legacy files. Old rows with
+        manual input that no longer pass through the gate are returned so they
+        can be kept at the end of the list.
+        """
+        if not os.path.exists(self.output_file):
+            return []
+        with open(self.output_file, mode='r', encoding='utf-8-sig') as f:
+            existing = [row for row in csv.DictReader(f)
+                        if any((row.get(c) or '').strip() for c in MANUAL_COLUMNS)]
+        if not existing:
+            return []
+
+        # Legacy rows are keyed by title, so new rows fall back to a title lookup
+        index = {self._row_key(row): row for row in existing}
+
+        matched = set()
+        for row in rows:
+            old = index.get(self._row_key(row)) or index.get(f"title:{row['Title']}")
+            if old is None or id(old) in matched:
+                continue
+            matched.add(id(old))
+            for column in MANUAL_COLUMNS:
+                if old.get(column):
+                    row[column] = old[column]
+
+        carried = [{c: row.get(c, '') for c in FIELDNAMES} for row in existing if id(row) not in matched]
+        logger.info(f"Market Gate: manual research carried forward for {len(matched)} rows; "
+                    f"kept {len(carried)} rows no longer in this batch")
+        return carried
+
     def _process_row(self, row: Dict[str, str]) -> Dict[str, Any]:
         try:
             # 1. Parse Base Data
+            media_id = row.get('anilist_id')
             title_en = row.get('title_en', 'Unknown')
             title_native = row.get('title_native', '')
             score_total = float(row.get('score_total', 0))
@@ -110,7 +168,8 @@ class MarketGate:
                 '[MANUAL] Sold 30d': '',
                 '[MANUAL] Price Range': '',
                 '[MANUAL] Result (Pass/Fail)': '',
-                'Notes': f"Qual: {data_quality}"
+                'Notes': f"Qual: {data_quality}",
+                'AniList ID': '' if media_id is None else str(media_id)
             }
         except Exception as e:
             logger.warning(f"Skipping row {row.get('title_en')}: {e}")
@@ -120,17 +179,13 @@ class MarketGate:
         if not rows:
             return
         
-        fieldnames = [
-                'Tier', 'Title', 'Anime', 'Actionable Score', 'Bonus', 'Pri Score', 'Trends Norm',
-                'Test SKU 1', 'Test SKU 2', 'eBay Query', 'Mercari Keywords (JP)',
-                '[MANUAL] Sold 30d', '[MANUAL] Price Range', '[MANUAL] Result (Pass/Fail)',
-                'Notes'
-            ]
-        
-        with open(self.output_file, mode='w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+        # Write next to the old list and swap, so a failure never loses manual input
+        partial_path = self.output_file + ".partial"
+        with open(partial_path, mode='w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
             writer.writeheader()
             writer.writerows(rows)
+        os.replace(partial_path, self.output_file)
 
 if __name__ == "__main__":
     # Test run
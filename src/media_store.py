@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, List, Any, Optional, Iterable
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class MediaStore:
+    """
+    Local snapshot of AniList media, keyed by AniList id.
+    Full records are only refetched when AniList's updatedAt moves
+    (or the snapshot is older than MEDIA_STORE_MAX_AGE_DAYS).
+    """
+    def __init__(self, path: str = None):
+        self.path = path or Config.MEDIA_STORE_FILE
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS media (
+                id INTEGER PRIMARY KEY,
+                updated_at INTEGER,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS list_index (
+                key TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+        ''')
+        self.conn.commit()
+
+    def get_many(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Returns {id: {'updatedAt', 'fetched_at', 'data'}} for ids present in the store.
+        """
+        ids = list(ids)
+        found = {}
+        with self.lock:
+            # Stay under SQLite's host-parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT id, updated_at, fetched_at, data FROM media WHERE id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for media_id, updated_at, fetched_at, data in rows:
+                    found[media_id] = {
+                        'updatedAt': updated_at,
+                        'fetched_at': fetched_at,
+                        'data': json.loads(data)
+                    }
+        return found
+
+    def put_many(self, items: List[Dict[str, Any]]):
+        now = time.time()
+        rows = [
+            (item['id'], item.get('updatedAt'), now, json.dumps(item, ensure_ascii=False))
+            for item in items
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO media (id, updated_at, fetched_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET updated_at=excluded.updated_at, "
+                "fetched_at=excluded.fetched_at, data=excluded.data",
+                rows
+            )
+
+    def get_index(self, key: str, max_age_seconds: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached light index (ID + sort keys) for a list request, if fresh enough.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, data FROM list_index WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        fetched_at, data = row
+        if time.time() - fetched_at > max_age_seconds:
+            return None
+        return json.loads(data)
+
+    def put_index(self, key: str, items: List[Dict[str, Any]]):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO list_index (key, fetched_at, data) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(items, ensure_ascii=False))
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
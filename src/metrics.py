@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class RunMetrics:
+    """
+    Per-run counters and stage timings, shared by every client and worker
+    thread in the process (use the module-level `metrics` instance).
+    Written at the end of a run as a JSON summary and as a Prometheus
+    textfile (node_exporter textfile collector format).
+
+    Counters are keyed by name + labels, e.g.
+        metrics.inc('requests', api='anilist')
+        metrics.inc('sleep_seconds', waited, api='trends')
+        metrics.cache_lookup('trends_base', 'hit')
+    Stage durations accumulate across calls:
+        with metrics.stage('trends.base'): ...
+    """
+    PREFIX = 'ip_research'
+    CACHE_OUTCOMES = ('hit', 'miss', 'expired')
+    SUMMARY_KEYS = ('status', 'started_at', 'finished_at', 'duration_seconds', 'stages', 'caches', 'counters')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters: Dict[tuple, float] = {}
+            self.stages: Dict[str, float] = {}
+            self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def cache_lookup(self, cache: str, outcome: str, count: int = 1):
+        """outcome: hit, miss or expired (present but stale)."""
+        if count:
+            self.inc('cache_lookups', count, cache=cache, outcome=outcome)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def summary(self, status: str = 'success', **info) -> Dict[str, Any]:
+        """`info`: extra run attributes (e.g. command=...), kept as-is."""
+        finished_at = time.time()
+        with self.lock:
+            counters = dict(self.counters)
+            stages = dict(self.stages)
+
+        grouped: Dict[str, list] = {}
+        for (name, labels), value in sorted(counters.items()):
+            grouped.setdefault(name, []).append({**dict(labels), 'value': round(value, 3)})
+
+        caches: Dict[str, Dict[str, Any]] = {}
+        for (name, labels), value in counters.items():
+            if name != 'cache_lookups':
+                continue
+            labels = dict(labels)
+            entry = caches.setdefault(labels['cache'], {outcome: 0 for outcome in self.CACHE_OUTCOMES})
+            entry[labels['outcome']] = entry.get(labels['outcome'], 0) + int(value)
+        for entry in caches.values():
+            lookups = sum(entry[outcome] for outcome in self.CACHE_OUTCOMES)
+            entry['hit_ratio'] = round(entry['hit'] / lookups, 4) if lookups else None
+
+        return {
+            'status': status,
+            **info,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'finished_at': datetime.fromtimestamp(finished_at).isoformat(timespec='seconds'),
+            'duration_seconds': round(finished_at - self.started_at, 3),
+            'stages': {name: round(seconds, 3) for name, seconds in stages.items()},
+            'caches': caches,
+            'counters': grouped,
+        }
+
+    def prometheus(self, summary: Dict[str, Any]) -> str:
+        """Render a summary() as Prometheus text exposition format."""
+        lines = []
+
+        def family(name: str, help_text: str, samples):
+            metric = f"{self.PREFIX}_{_metric_name(name)}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in samples:
+                lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+
+        info = {k: v for k, v in summary.items() if k not in self.SUMMARY_KEYS}
+        family('run_success', "1 if the last run finished successfully.",
+               [({}, 1 if summary['status'] == 'success' else 0)])
+        if info:
+            family('run_info', "Attributes of the last run.", [(info, 1)])
+        family('run_finished_timestamp_seconds', "Unix time the last run finished.",
+               [({}, datetime.fromisoformat(summary['finished_at']).timestamp())])
+        family('run_duration_seconds', "Wall time of the last run.", [({}, summary['duration_seconds'])])
+        family('stage_seconds', "Wall time per stage in the last run.",
+               [({'stage': name}, seconds) for name, seconds in summary['stages'].items()])
+        family('cache_hit_ratio', "Cache hits / lookups per cache in the last run.",
+               [({'cache': name}, entry['hit_ratio']) for name, entry in summary['caches'].items()
+                if entry['hit_ratio'] is not None])
+        for name, samples in summary['counters'].items():
+            family(name, f"{name.replace('_', ' ').capitalize()} in the last run.",
+                   [({k: v for k, v in sample.items() if k != 'value'}, sample['value']) for sample in samples])
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Optional[str] = None, prom_path: Optional[str] = None,
+              status: str = 'success', **info) -> Dict[str, Any]:
+        """Write the run summary (atomically, so collectors never read half a file)."""
+        summary = self.summary(status, **info)
+        if json_path:
+            _write_atomic(json_path, json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+        if prom_path:
+            _write_atomic(prom_path, self.prometheus(summary))
+        logger.info(f"Run metrics written ({summary['duration_seconds']:.1f}s, status {status})")
+        return summary
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{_metric_name(key)}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# Process-wide registry
+metrics = RunMetrics()
@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of sleeping when the breaker is open."""
+
+class PacingController:
+    """
+    Shared pacing for a rate-limited API.
+    - Delay grows by `backoff` on every error and decays by `recovery` on success.
+    - The breaker opens after `breaker_threshold` consecutive 429s, or at once on a
+      systematic error (one that will fail every request, e.g. the pytrends /
+      urllib3 `method_whitelist` incompatibility). While open, wait() fails fast.
+    - After `cooldown` seconds one trial request is let through (half-open);
+      success closes the breaker, failure re-opens it.
+    """
+    SYSTEMATIC_ERROR_MARKERS = ('method_whitelist', 'unexpected keyword argument')
+
+    def __init__(self, min_delay: float = 3.0, max_delay: float = 120.0, jitter: float = 1.0,
+                 backoff: float = 2.0, recovery: float = 0.8,
+                 breaker_threshold: int = 3, cooldown: float = 900.0,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.backoff = backoff
+        self.recovery = recovery
+        self.breaker_threshold = breaker_threshold
+        self.cooldown = cooldown
+        self.sleep = sleep
+        self.clock = clock
+
+        self.delay = min_delay
+        self.consecutive_429 = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.next_allowed = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self.lock:
+            return self._is_open(self.clock())
+
+    def _is_open(self, now: float) -> bool:
+        if self.opened_at is None:
+            return False
+        if now - self.opened_at >= self.cooldown and not self.trial_in_flight:
+            return False
+        return True
+
+    def wait(self, label: str = "") -> float:
+        """
+        Sleep until the next request is allowed. Returns seconds slept.
+        Raises CircuitOpenError if the breaker is open.
+        """
+        with self.lock:
+            now = self.clock()
+            if self._is_open(now):
+                raise CircuitOpenError(f"Circuit open; skipping Trends request for '{label}'")
+            if self.opened_at is not None:
+                # Half-open: let exactly one trial through
+                self.trial_in_flight = True
+
+            # Requests are spaced `delay * U(1, 1 + jitter)` apart; cache hits in
+            # between count towards the gap
+            gap = self.delay * random.uniform(1, 1 + self.jitter)
+            start = max(now, self.next_allowed)
+            self.next_allowed = start + gap
+            sleep_time = start - now
+
+        if sleep_time > 0:
+            logger.info(f"Sleeping {sleep_time:.2f}s before Trends request for '{label}'...")
+            self.sleep(sleep_time)
+        return max(0.0, sleep_time)
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_429 = 0
+            self.delay = max(self.min_delay, self.delay * self.recovery)
+            if self.opened_at is not None:
+                logger.info("Trends circuit closed after successful trial request.")
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_error(self, error: Exception):
+        message = str(error)
+        with self.lock:
+            self.delay = min(self.max_delay, self.delay * self.backoff)
+            now = self.clock()
+            self.next_allowed = max(self.next_allowed, now + self.delay)
+            if any(marker in message for marker in self.SYSTEMATIC_ERROR_MARKERS):
+                self._open(now, f"systematic error: {message}")
+            elif "429" in message:
+                self.consecutive_429 += 1
+                if self.consecutive_429 >= self.breaker_threshold or self.trial_in_flight:
+                    self._open(now, f"{self.consecutive_429} consecutive 429s")
+            elif self.trial_in_flight:
+                self._open(now, f"trial request failed: {message}")
+            logger.info(f"Trends pacing delay now {self.delay:.1f}s")
+
+    def _open(self, now: float, reason: str):
+        self.opened_at = now
+        self.trial_in_flight = False
+        logger.error(f"Trends circuit opened ({reason}). Cooling down {self.cooldown:.0f}s.")
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from typing import List, Dict, Any
+from src.config import Config
+from src.scoring import build_base_frame, score_rows
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output on its queue
+_DONE = object()
+
+class AsyncPipeline:
+    """
+    Streaming version of the batch: AniList details -> pre-scoring -> Trends
+    enrichment -> scoring, connected by bounded asyncio queues so each stage
+    starts as soon as its first input is ready.
+
+    Ranking only needs the light AniList index (popularity/trending), so the
+    top-K Trends selection is known before any detail request. Details are
+    then fetched in rank order, which lets enrichment start on the first chunk
+    while the rest are still downloading. Blocking clients run in threads.
+
+    Narrower than DataProcessor.process: Trends for a fixed top K only (no
+    Reddit, regions, TrendsSelector budget, checkpoints or AliasIndex merge),
+    intents on the score threshold alone, and rows are returned (for the
+    report) only once every stage is done, since the report is ranked.
+    """
+    def __init__(self, anilist, processor, queue_size: int = None):
+        self.anilist = anilist
+        self.processor = processor
+        self.queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+
+    def run(self, target_count: int = 200, trends_limit: int = 50) -> List[Dict[str, Any]]:
+        return asyncio.run(self.run_async(target_count, trends_limit))
+
+    async def run_async(self, target_count: int = 200, trends_limit: int = 50) -> List[Dict[str, Any]]:
+        index = await asyncio.to_thread(self.anilist.get_index, target_count)
+        if not index:
+            return []
+
+        # Rank on index fields alone; same ordering as DataProcessor's Stage 1
+        ranked_ids = build_base_frame(index)['anilist_id'].tolist()
+        rank = {media_id: i for i, media_id in enumerate(ranked_ids)}
+        by_id = {item['id']: item for item in index}
+        ranked_index = [by_id[media_id] for media_id in ranked_ids]
+
+        candidates_q = asyncio.Queue(maxsize=self.queue_size)
+        enrich_q = asyncio.Queue(maxsize=self.queue_size)
+        scored_q = asyncio.Queue(maxsize=self.queue_size)
+
+        results = []
+        await asyncio.gather(
+            self._fetch_stage(ranked_index, candidates_q),
+            self._prescore_stage(candidates_q, enrich_q, scored_q, rank, trends_limit),
+            self._enrich_stage(enrich_q, scored_q),
+            self._score_stage(scored_q, results),
+        )
+
+        # Final Sort: score desc, ties in AniList rank order (matches the batch path)
+        results.sort(key=lambda row: (-row['score_total'], rank.get(row['anilist_id'], len(rank))))
+        logger.info(f"Pipeline produced {len(results)} rows")
+        return results
+
+    async def _fetch_stage(self, ranked_index: List[Dict[str, Any]], out_q: asyncio.Queue):
+        iterator = self.anilist.iter_candidates(ranked_index)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, iterator, None)
+                if chunk is None:
+                    break
+                await out_q.put(chunk)
+        finally:
+            await out_q.put(_DONE)
+
+    async def _prescore_stage(self, in_q: asyncio.Queue, enrich_q: asyncio.Queue,
+                              scored_q: asyncio.Queue, rank: Dict[int, int], trends_limit: int):
+        try:
+            while True:
+                chunk = await in_q.get()
+                if chunk is _DONE:
+                    break
+                frame = build_base_frame(chunk)
+                if self.processor.history is not None:
+                    stats = self.processor.history.signals(frame['anilist_id'].tolist())
+                    frame['anilist_velocity'] = stats['velocity']
+                    frame['anilist_acceleration'] = stats['acceleration']
+                selected = frame['anilist_id'].map(lambda media_id: rank[media_id] < trends_limit).to_numpy(dtype=bool)
+                if selected.any():
+                    await enrich_q.put(frame[selected].reset_index(drop=True))
+                if (~selected).any():
+                    skipped = frame[~selected].reset_index(drop=True)
+                    await scored_q.put((skipped, [None] * len(skipped)))
+        finally:
+            await enrich_q.put(_DONE)
+            await scored_q.put(_DONE)
+
+    async def _enrich_stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue):
+        try:
+            while True:
+                frame = await in_q.get()
+                if frame is _DONE:
+                    break
+                terms = frame['search_term'].tolist()
+                # Rank-based intent selection needs the whole list; stream on the score threshold only
+                enriched = await asyncio.to_thread(self.processor.enrich_trends, terms, 0)
+                await out_q.put((frame, [enriched[term] for term in terms]))
+        finally:
+            await out_q.put(_DONE)
+
+    async def _score_stage(self, in_q: asyncio.Queue, results: List[Dict[str, Any]]):
+        # Skipped rows and enriched rows both arrive here, so two producers finish
+        done = 0
+        while done < 2:
+            item = await in_q.get()
+            if item is _DONE:
+                done += 1
+                continue
+            frame, trends_data = item
+            results.extend(score_rows(frame, trends_data))
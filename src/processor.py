@@ -1,174 +1,329 @@
+import math
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+import pandas as pd
+from src.config import Config
+from src.scoring import build_base_frame, score_rows
 from src.google_trends_client import GoogleTrendsClient
+from src.checkpoint import CheckpointStore
+from src.reddit_client import RedditClient
+from src.history_store import HistoryStore
+from src.refresh import RefreshScheduler
+from src.selection import TrendsSelector
+from src.reporter import region_column
+from src.titles import AliasIndex, canonical_title, search_term, title_names
+from src.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+def is_failed(status: Optional[str]) -> bool:
+    """Enrichment outcomes that --retry-failed should redo."""
+    return status is not None and (status.startswith('error') or status == 'no_data')
+
 class DataProcessor:
-    def __init__(self, trends_client: GoogleTrendsClient):
+    def __init__(self, trends_client: GoogleTrendsClient, reddit_client: Optional[RedditClient] = None,
+                 history: Optional[HistoryStore] = None, refresh: Optional[RefreshScheduler] = None):
         self.trends_client = trends_client
+        self.reddit_client = reddit_client
+        self.history = history
+        self.refresh = refresh
 
-    def process(self, anilist_data: List[Dict[str, Any]], trends_limit: int = 50) -> List[Dict[str, Any]]:
+    def process(self, anilist_data: List[Dict[str, Any]], trends_limit: int = 50,
+                batch_mode: bool = False, checkpoint: Optional[CheckpointStore] = None,
+                retry_failed: bool = False, sink=None,
+                trends_budget: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Two-Stage Processing:
         1. Calculate Base Metrics (AniList) + Anime Status
-        2. Filter Top K (trends_limit)
-        3. Fetch Trends for Top K
-        4. Return merged list
+           (+ AniList popularity velocity/acceleration from local history)
+        2. Filter Top K (trends_limit), or in batch_mode with a trends_budget
+           (live requests for base, intent and regional lookups together)
+           let TrendsSelector pick: every title with cached Trends plus the
+           uncached ones whose rank can move most
+        3. Fetch Trends for the selected titles
+           (batch_mode: packed base scores for all K, then intents only for
+            titles that pass the intent threshold; see enrich_trends)
+        4. Fetch Reddit signals for every candidate, in the background
+           while Trends runs (separate API, separate rate budget)
+        5. batch_mode with TRENDS_GEOS: regional base scores for the top
+           TRENDS_REGION_TOP_N scored titles (trends_<geo> columns)
+        6. Return merged list
+
+        With a checkpoint, the pre-processed frame and every finished
+        enrichment unit are saved as they complete; units already in the
+        checkpoint are reused instead of refetched, and so are the selector's
+        picks (see _pick). retry_failed also redoes units whose status is
+        error_* or no_data.
+        The ranked rows are then written to `sink` (see reporter.ReportSink).
+        They are buffered until scoring ends, not written per chunk: the
+        report is sorted by score_total and regional scores go to the top
+        scored titles, so no row is final before every title is enriched.
+        A crash mid-enrichment is recovered from the checkpoint (--resume).
         """
-        # --- Stage 1: Base Processing ---
-        pre_processed = []
-        
-        for item in anilist_data:
-            # Extract Titles
-            titles = item.get('title', {})
-            romaji = titles.get('romaji', 'Unknown')
-            english = titles.get('english')
-            native = titles.get('native', '')
-            search_term = english if english else romaji
-            
-            # AniList Scores
-            ani_pop = item.get('popularity', 0) or 0
-            ani_trend = item.get('trending', 0) or 0
-            score_anilist = (ani_pop / 1000) + (ani_trend / 10)
-            
-            # Anime Status Detection
-            anime_status = "None"
-            relations = item.get('relations', {}).get('edges', [])
-            for edge in relations:
-                if edge.get('relationType') == 'ADAPTATION':
-                    node = edge.get('node', {})
-                    if node.get('type') == 'ANIME':
-                        status = node.get('status')
-                        # Prioritize: RELEASING > NOT_YET_RELEASED > FINISHED
-                        if status == 'RELEASING':
-                            anime_status = "Airing"
-                            break # Highest priority found
-                        elif status == 'NOT_YET_RELEASED':
-                            anime_status = "Announced"
-                        elif status == 'FINISHED' and anime_status == "None":
-                            anime_status = "Finished"
-            
-            pre_processed.append({
-                'item': item,
-                'search_term': search_term,
-                'native': native,
-                'score_anilist': score_anilist,
-                'anime_status': anime_status
-            })
-            
-        # --- Stage 2: Selection & Enrichment ---
-        # Sort by AniList score to pick best candidates for expensive Trends API
-        pre_processed.sort(key=lambda x: x['score_anilist'], reverse=True)
-        
-        results = []
-        
-        for idx, entry in enumerate(pre_processed):
-            item = entry['item']
-            search_term = entry['search_term']
-            score_anilist = entry['score_anilist']
-            anime_status = entry['anime_status']
-            
-            # Determine if we check Trends
-            # Top N items get Trends, others are skipped
-            check_trends = idx < trends_limit
-            
-            if check_trends:
-                # Fetch Google Trends (Expensive)
-                trends_data = self.trends_client.get_signals(search_term)
-                
-                # Extract Signals
-                intent_manga = trends_data.get('intent_manga', float('nan'))
-                intent_merch = trends_data.get('intent_merch', float('nan'))
-                velocity = trends_data.get('velocity', float('nan'))
-                norm_score = trends_data.get('normalized_score', float('nan'))
-                trends_status = trends_data.get('status', 'unknown')
-                anchor_term = trends_data.get('anchor_term', 'None')
+        # --- Stage 1: Base Processing (columnar) ---
+        with metrics.stage('processor.base'):
+            frame = self._base_frame(anilist_data, checkpoint)
+            if self.history is not None:
+                # Free velocity signal for every candidate, not just the Trends top K
+                stats = self.history.signals(frame['anilist_id'].tolist())
+                frame['anilist_velocity'] = stats['velocity']
+                frame['anilist_acceleration'] = stats['acceleration']
+        metrics.inc('candidates', len(frame))
+
+        all_terms = frame['search_term'].tolist()
+        with ThreadPoolExecutor(max_workers=1) as background:
+            reddit_future = None
+            if self.reddit_client is not None:
+                reddit_future = background.submit(self._reddit_signals, all_terms,
+                                                  self._title_aliases(anilist_data))
+
+            # --- Stage 2: Selection & Enrichment ---
+            # Titles that are aliases of each other share one lookup (the higher-ranked term)
+            aliases = self._alias_index(frame, anilist_data)
+            selector = None
+            if batch_mode and trends_budget is not None:
+                selector = TrendsSelector(self.trends_client, budget=trends_budget)
+                query_terms = [aliases.representative(term) for term in all_terms]
+                # Frame is sorted by AniList score, so a group's first row carries its best score
+                group_scores = {}
+                for term, score in zip(query_terms, frame['score_anilist'].tolist()):
+                    group_scores.setdefault(term, score)
+                selected = set(self._pick(checkpoint, 'base', selector,
+                                          lambda: selector.select(list(group_scores), list(group_scores.values()))))
+                unique_terms = [term for term in group_scores if term in selected]
+                # Rows whose lookup was not selected are skipped
+                query_terms = [term if term in selected else None for term in query_terms]
             else:
-                # Skipped
-                intent_manga = 0.0
-                intent_merch = 0.0
-                velocity = 0.0
-                norm_score = 0.0
-                trends_status = 'skipped'
-                anchor_term = 'None'
-
-            # Safe values for calculation
-            import math
-            def is_valid(v): return v is not None and not math.isnan(v)
-            def safe_val(v, default=0.0): return v if is_valid(v) else default
-            
-            # Velocity Logic
-            velocity_score = 0.0
-            if check_trends and is_valid(velocity) and is_valid(norm_score):
-                if norm_score >= 0.5: 
-                    capped_velocity = min(velocity, 2.0)
-                    velocity_score = capped_velocity * 50
-            
-            # Data Quality Score
-            data_quality = 1.0
-            if trends_status == 'skipped':
-                data_quality = 0.5 # Medium confidence (AniList only)
-            elif not is_valid(norm_score):
-                data_quality = 0.1 # Failed API
-            elif trends_status.startswith('cached'):
-                data_quality = 0.8
-            
-            # Total Score Calculation
-            score_intent_manga = safe_val(intent_manga) * 1.5
-            
-            if data_quality < 0.5: # Failed API
-                total_score = score_anilist
-            elif trends_status == 'skipped':
-                total_score = score_anilist # Just AniList
+                # Frame is sorted by AniList score; top N items get Trends, others are skipped
+                top_terms = frame['search_term'][:trends_limit].tolist()
+                query_terms = [aliases.representative(term) for term in top_terms]
+                unique_terms = list(dict.fromkeys(query_terms))
+                query_terms += [None] * (len(frame) - len(query_terms))
+            covered = sum(term is not None for term in query_terms)
+            if len(unique_terms) < covered:
+                logger.info(f"Trends: {covered} titles share {len(unique_terms)} lookups after alias merge")
+            if self.refresh is not None:
+                # Ranked list the daily refresh keeps warm until the next batch
+                self.refresh.track(unique_terms)
+
+            if batch_mode:
+                batch_results = self.enrich_trends(unique_terms, checkpoint=checkpoint,
+                                                       retry_failed=retry_failed, selector=selector)
             else:
-                total_score = score_anilist + score_intent_manga + velocity_score
-            
-            # SKU Logic
-            status = item.get('status')
-            sku_manga = "Vol 1 (New)" if status == 'RELEASING' else "Complete Set (Used)"
-            
-            sku_goods = []
-            if safe_val(intent_merch) > 20: 
-                sku_goods.append("Scale Figure")
-            elif safe_val(intent_merch) > 5:
-                sku_goods.append("Acrylic Stand")
-            
-            if safe_val(velocity) > 0.5:
-                sku_goods.append("Preorder Bonus")
-                
-            if anime_status == 'Announced':
-                sku_goods.append("Anime Hype Investment")
-            
-            if not sku_goods:
-                sku_goods.append("General Merch")
-            
-            row = {
-                'title_native': entry['native'],
-                'title_en': search_term,
-                'anilist_id': item.get('id'),
-                'anilist_popularity': item.get('popularity', 0),
-                'anilist_trending': item.get('trending', 0),
-                
-                'score_total': round(total_score, 2),
-                'score_anilist': round(score_anilist, 2),
-                'score_intent_manga': round(safe_val(intent_manga), 2),
-                'score_intent_merch': round(safe_val(intent_merch), 2), 
-                'score_velocity': round(velocity_score, 2),
-                
-                'trends_normalized': round(safe_val(norm_score), 2),
-                'trends_status': trends_status,
-                'data_quality': data_quality,
-                'anchor_term': anchor_term,
-                'anime_adaptation': anime_status,
-                
-                'recommended_sku_manga': sku_manga,
-                'recommended_sku_goods': ", ".join(sku_goods),
-                'notes': f"Vel: {safe_val(velocity):.1%}, Status: {trends_status}"
-            }
-            
-            results.append(row)
-            
-        # Final Sort
-        results.sort(key=lambda x: x['score_total'], reverse=True)
+                with metrics.stage('processor.trends'):
+                    # Fetch Google Trends (Expensive); parallel on a worker pool
+                    signals = self._run_units('signals', unique_terms, self.trends_client.get_signals_many,
+                                              checkpoint, retry_failed, 'status')
+                    batch_results = {term: signals.get(term) or GoogleTrendsClient.empty_result('error_unknown')
+                                     for term in unique_terms}
+            for result in batch_results.values():
+                metrics.inc('trends_results', status=result.get('status'))
+            trends_data = [batch_results[term] if term is not None else None for term in query_terms]
+
+            with metrics.stage('processor.reddit_wait'):
+                reddit_results = reddit_future.result() if reddit_future is not None else {}
+        reddit_data = [reddit_results.get(term) for term in all_terms] if reddit_future is not None else None
+
+        # --- Stage 3: Scoring (vectorized) ---
+        with metrics.stage('processor.scoring'):
+            rows = score_rows(frame, trends_data, reddit_data)
+        if batch_mode and Config.TRENDS_GEOS:
+            with metrics.stage('processor.trends_regions'):
+                self._add_regions(rows, frame, query_terms, checkpoint, retry_failed, selector)
+        if checkpoint is not None:
+            checkpoint.save('results', rows)
+        if sink is not None:
+            # Only now is the ranking final (see docstring)
+            with metrics.stage('report.write'):
+                sink.write_rows(rows)
+        return rows
+
+    def enrich_trends(self, terms: List[str], intent_top_n: int = None,
+                      checkpoint: Optional[CheckpointStore] = None,
+                      retry_failed: bool = False,
+                      selector: Optional[TrendsSelector] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Trends signals for `terms`, keyed by term (failed lookups come back
+        with an error_* status, never missing).
+        Phase 1: cheap base interest for every term.
+        Phase 2: intent queries only where they can move the ranking
+        (normalized_score >= TRENDS_INTENT_MIN_SCORE or top TRENDS_INTENT_TOP_N;
+        with a selector, uncached ones only up to its live intent budget).
+        intent_top_n=0 keeps the threshold only, for callers that enrich
+        part of the list at a time (AsyncPipeline).
+        """
+        if intent_top_n is None:
+            intent_top_n = Config.TRENDS_INTENT_TOP_N
+        # Terms that differ only in case/punctuation are looked up once
+        lookup = {}
+        for term in terms:
+            lookup.setdefault(canonical_title(term) or term, term)
+        query_of = {term: lookup[canonical_title(term) or term] for term in terms}
+        terms = list(lookup.values())
+        with metrics.stage('processor.trends_base'):
+            base_results = self._run_units('base', terms, self.trends_client.get_base_scores,
+                                           checkpoint, retry_failed, 'status')
+
+        def base_score(term):
+            score = base_results.get(term, {}).get('normalized_score', float('nan'))
+            return score if score is not None and not math.isnan(score) else -1.0
+
+        ranked = sorted(terms, key=base_score, reverse=True)
+        intent_terms = [
+            term for rank, term in enumerate(ranked)
+            if base_score(term) >= 0 and (
+                base_score(term) >= Config.TRENDS_INTENT_MIN_SCORE or rank < intent_top_n
+            )
+        ]
+        if selector is not None:
+            intent_terms = self._pick(checkpoint, 'intent', selector, lambda: selector.limit_intents(intent_terms))
+        logger.info(f"Trends intent phase: {len(intent_terms)} of {len(terms)} titles")
+
+        # A term missing from base_results (lost worker shard) reads as a failed lookup, not a crash
+        merged = {term: dict(base_results.get(term) or GoogleTrendsClient.empty_result('error_unknown'))
+                  for term in terms}
+        with metrics.stage('processor.trends_intents'):
+            intents = self._run_units(
+                'intent', intent_terms,
+                lambda chunk: self.trends_client.get_intents_many(
+                    [(term, merged[term].get('anchor_term')) for term in chunk]
+                ),
+                checkpoint, retry_failed, 'intent_status'
+            )
+        for term in intent_terms:
+            intent = intents.get(term)
+            if intent is None:
+                continue
+            merged[term]['intent_manga'] = intent['intent_manga']
+            merged[term]['intent_merch'] = intent['intent_merch']
+        return {term: merged[query] for term, query in query_of.items()}
+
+    def _add_regions(self, rows: List[Dict[str, Any]], frame: pd.DataFrame, query_terms: List[Optional[str]],
+                     checkpoint: Optional[CheckpointStore], retry_failed: bool,
+                     selector: Optional[TrendsSelector] = None):
+        """
+        trends_<geo> columns: base score per TRENDS_GEOS region for the top
+        TRENDS_REGION_TOP_N enriched rows (others stay NaN); with a selector,
+        uncached ones only within what is left of its budget. Units are
+        '<geo>|<term>' so every region resumes from the checkpoint.
+        """
+        term_of = {media_id: term for media_id, term in zip(frame['anilist_id'].tolist(), query_terms)
+                   if term is not None}
+        top = [row for row in rows if row['anilist_id'] in term_of][:Config.TRENDS_REGION_TOP_N]
+        terms = list(dict.fromkeys(term_of[row['anilist_id']] for row in top))
+        terms_by_geo = {geo: terms for geo in Config.TRENDS_GEOS}
+        if selector is not None:
+            terms_by_geo = self._pick(checkpoint, 'regions', selector,
+                                      lambda: selector.limit_regions(terms, Config.TRENDS_GEOS))
+        keys = [f"{geo}|{term}" for geo, geo_terms in terms_by_geo.items() for term in geo_terms]
+        logger.info(f"Trends regions: {len(terms)} titles x {len(Config.TRENDS_GEOS)} regions "
+                    f"({len(keys)} lookups)")
+
+        def fetch(chunk):
+            terms_by_geo = {}
+            for key in chunk:
+                geo, term = key.split('|', 1)
+                terms_by_geo.setdefault(geo, []).append(term)
+            found = self.trends_client.get_regional_base_scores(terms_by_geo)
+            return {f"{geo}|{term}": result for geo, results in found.items() for term, result in results.items()}
+
+        results = self._run_units('regions', keys, fetch, checkpoint, retry_failed, 'status')
+        results = {key: results[key] for key in keys if key in results}
+        for key, result in results.items():
+            metrics.inc('trends_region_results', geo=key.split('|', 1)[0], status=result.get('status'))
+        for row in rows:
+            term = term_of.get(row['anilist_id'])
+            for geo in Config.TRENDS_GEOS:
+                score = results.get(f"{geo}|{term}", {}).get('normalized_score')
+                row[region_column(geo)] = (round(score, 2) if score is not None and not math.isnan(score)
+                                           else float('nan'))
+
+    def _reddit_signals(self, terms: List[str], aliases: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        with metrics.stage('processor.reddit'):
+            results = self.reddit_client.get_signals_many(terms, aliases)
+        for result in results.values():
+            metrics.inc('reddit_results', status=result.get('status'))
+        return results
+
+    @staticmethod
+    def _title_aliases(anilist_data: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """search_term -> every name (romaji/English/native/synonyms) it stands for."""
+        aliases = {}
+        for item in anilist_data:
+            term = search_term(item)
+            names = aliases.setdefault(term, [term])
+            for name in title_names(item):
+                if name not in names:
+                    names.append(name)
+        return aliases
+
+    @staticmethod
+    def _alias_index(frame: pd.DataFrame, anilist_data: List[Dict[str, Any]]) -> AliasIndex:
+        # Added in frame (rank) order so each group is represented by its best-ranked title
+        items = {item.get('id'): item for item in anilist_data}
+        index = AliasIndex()
+        for media_id, term in zip(frame['anilist_id'].tolist(), frame['search_term'].tolist()):
+            index.add(term, title_names(items.get(media_id, {})))
+        return index
+
+    @staticmethod
+    def _base_frame(anilist_data: List[Dict[str, Any]], checkpoint: Optional[CheckpointStore]) -> pd.DataFrame:
+        if checkpoint is None:
+            return build_base_frame(anilist_data)
+        records = checkpoint.load('pre_processed')
+        if records is not None:
+            logger.info(f"Resuming from checkpointed pre-processed list ({len(records)} rows)")
+            frame = pd.DataFrame(records, dtype=object)
+            frame['score_anilist'] = frame['score_anilist'].astype(float)
+            return frame
+        frame = build_base_frame(anilist_data)
+        checkpoint.save('pre_processed', frame.to_dict('records'))
+        return frame
+
+    @staticmethod
+    def _pick(checkpoint: Optional[CheckpointStore], part: str, selector: TrendsSelector, pick):
+        """
+        The selector's `part` picks ('base', 'intent' or 'regions'), kept in
+        the checkpoint's 'selection' entry with the budget spent so far.
+        --resume and --retry-failed reuse them: lookups fetched before a crash
+        are cached by then, and re-selecting would count them as free and
+        spend a fresh live budget on top. A different budget selects anew.
+        """
+        saved = (checkpoint.load('selection') if checkpoint is not None else None) or {}
+        if saved.get('budget') != selector.budget:
+            saved = {'budget': selector.budget}
+        if part in saved:
+            logger.info(f"Checkpoint 'selection': reusing the {part} picks")
+            selector.spent = saved[part]['spent']
+            return saved[part]['picked']
+        picked = pick()
+        if checkpoint is not None:
+            saved[part] = {'picked': picked, 'spent': selector.spent}
+            checkpoint.save('selection', saved)
+        return picked
+
+    def _run_units(self, stage: str, keys: List[str], fetch, checkpoint: Optional[CheckpointStore],
+                   retry_failed: bool, status_key: str) -> Dict[str, Dict[str, Any]]:
+        """
+        fetch(keys) -> {key: result}, run in chunks of the Trends client's
+        checkpoint_chunk_size (CHECKPOINT_CHUNK_SIZE, or enough to keep every
+        pool worker busy) so each finished chunk is on disk before the next
+        one starts. Keys already in the checkpoint are skipped (failed ones
+        too, unless retry_failed).
+        """
+        if checkpoint is None:
+            return fetch(keys)
+        results = checkpoint.load_units(stage)
+        pending = [
+            key for key in dict.fromkeys(keys)
+            if key not in results or (retry_failed and is_failed(results[key].get(status_key)))
+        ]
+        if len(pending) < len(keys):
+            logger.info(f"Checkpoint '{stage}': {len(keys) - len(pending)} of {len(keys)} units reused")
+        size = self.trends_client.checkpoint_chunk_size
+        for i in range(0, len(pending), size):
+            chunk_results = fetch(pending[i:i + size])
+            checkpoint.append_units(stage, chunk_results)
+            results.update(chunk_results)
         return results
@@ -0,0 +1,88 @@
+import threading
+import time
+import logging
+from typing import Callable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all workers hitting one API.
+    The refill rate and current budget are corrected from the server's
+    X-RateLimit-* / Retry-After headers after every response.
+    """
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute)))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.blocked_until = 0.0
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available. Returns seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (e.g. Retry-After)."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+            self.tokens = 0.0
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Headers: X-RateLimit-Limit, X-RateLimit-Remaining, X-RateLimit-Reset, Retry-After
+        """
+        limit = _to_float(headers.get('X-RateLimit-Limit'))
+        remaining = _to_float(headers.get('X-RateLimit-Remaining'))
+        retry_after = _to_float(headers.get('Retry-After'))
+
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            if limit and limit > 0 and abs(limit / 60.0 - self.rate) > 1e-9:
+                logger.info(f"Rate limit changed to {limit:.0f}/min")
+                self.rate = limit / 60.0
+            # Never hand out more tokens than the server says we have left
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+
+        if retry_after is not None:
+            reset = _to_float(headers.get('X-RateLimit-Reset'))
+            if reset and reset > time.time():
+                retry_after = max(retry_after, reset - time.time())
+            logger.warning(f"Rate limited. Pausing {retry_after:.1f}s (Retry-After)")
+            self.pause(retry_after)
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -1,64 +1,169 @@
-import praw
-import time
+import threading
 import logging
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 from src.config import Config
+from src.cache_store import CacheBackend, SQLiteCache
+from src.rate_limiter import TokenBucket
+from src.metrics import metrics
+
+if TYPE_CHECKING:
+    import praw
 
 logger = logging.getLogger(__name__)
 
 class RedditClient:
-    def __init__(self):
+    INTENT_QUERY = "(buy OR merch OR figure OR goods OR box OR price)"
+    CACHE_NAMESPACE = 'reddit'
+    # Posts fetched per title; an OR query over N titles asks for N times as many
+    POSTS_PER_TITLE = 20
+    MAX_LISTING_LIMIT = 100  # One listing page
+
+    def __init__(self, cache: Optional[CacheBackend] = None, limiter: Optional[TokenBucket] = None):
         # Only initialize if credentials actrually exist
-        if Config.REDDIT_CLIENT_ID and Config.REDDIT_CLIENT_SECRET:
-            self.reddit = praw.Reddit(
-                client_id=Config.REDDIT_CLIENT_ID,
-                client_secret=Config.REDDIT_CLIENT_SECRET,
-                user_agent=Config.REDDIT_USER_AGENT,
-                read_only=True
-            )
-        else:
-            self.reddit = None
+        self.enabled = bool(Config.REDDIT_CLIENT_ID and Config.REDDIT_CLIENT_SECRET)
+        if not self.enabled:
             logger.warning("Reddit credentials missing. Reddit client disabled.")
+        self._reddit = None
+        self.cache = cache if cache is not None else (SQLiteCache(Config.REDDIT_CACHE_DB) if self.enabled else None)
+        # Shared by all pool threads; keeps the whole client inside Reddit's OAuth budget
+        self.limiter = limiter if limiter is not None else TokenBucket(Config.REDDIT_RATE_LIMIT, burst=Config.REDDIT_BURST)
+        self._local = threading.local()
+
+    @property
+    def reddit(self) -> Optional['praw.Reddit']:
+        # Connected on first use, so runs served from cache never import praw
+        if self._reddit is None and self.enabled:
+            self._reddit = self._connect()
+        return self._reddit
+
+    @staticmethod
+    def _connect() -> 'praw.Reddit':
+        import praw
+        return praw.Reddit(
+            client_id=Config.REDDIT_CLIENT_ID,
+            client_secret=Config.REDDIT_CLIENT_SECRET,
+            user_agent=Config.REDDIT_USER_AGENT,
+            read_only=True
+        )
+
+    def _thread_reddit(self) -> 'praw.Reddit':
+        # PRAW instances are not thread-safe: one per pool thread
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+        if getattr(self._local, 'reddit', None) is None:
+            self._local.reddit = self._connect()
+        return self._local.reddit
+
+    @staticmethod
+    def _empty_result(status: str) -> Dict[str, Any]:
+        return {'intent_score': 0, 'reddit_velocity': 0, 'status': status}
+
+    def _build_batches(self, terms: List[str]) -> List[List[str]]:
+        """
+        Pack titles into OR queries, at most REDDIT_TITLES_PER_QUERY titles
+        and REDDIT_MAX_QUERY_LENGTH characters each.
+        """
+        batches, current = [], []
+        for term in terms:
+            candidate = current + [term]
+            if current and (len(candidate) > Config.REDDIT_TITLES_PER_QUERY
+                            or len(self._build_query(candidate)) > Config.REDDIT_MAX_QUERY_LENGTH):
+                batches.append(current)
+                candidate = [term]
+            current = candidate
+        if current:
+            batches.append(current)
+        return batches
+
+    def _build_query(self, terms: List[str]) -> str:
+        quoted = " OR ".join(f'"{term}"' for term in terms)
+        titles = quoted if len(terms) == 1 else f"({quoted})"
+        return f"{titles} {self.INTENT_QUERY}"
+
+    def _search_batch(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        One search for a batch of titles; each post is credited to every
+        title it mentions.
+        """
+        query = self._build_query(terms)
+        counts = {term: [0, 0] for term in terms}
+        try:
+            metrics.inc('sleep_seconds', self.limiter.acquire(), api='reddit')
+            metrics.inc('requests', api='reddit')
+            subreddit = self._thread_reddit().subreddit(Config.REDDIT_SUBREDDITS)
+            limit = min(self.MAX_LISTING_LIMIT, self.POSTS_PER_TITLE * len(terms))
+            for post in subreddit.search(query, sort='new', time_filter='month', limit=limit):
+                text = f"{post.title} {getattr(post, 'selftext', '')}".casefold()
+                matched = [term for term in terms if term.casefold() in text]
+                # Reddit matched the query, so a single-title batch owns the post
+                if not matched and len(terms) == 1:
+                    matched = terms
+                for term in matched:
+                    counts[term][0] += 1
+                    counts[term][1] += post.score
+        except Exception as e:
+            metrics.inc('rate_limited' if "429" in str(e) else 'errors', api='reddit')
+            logger.error(f"Reddit Search Failed for {terms}: {e}")
+            return {term: self._empty_result('error_api') for term in terms}
+
+        return {
+            term: {
+                'intent_score': post_count * 10 + score_sum, # Crude heuristic
+                'reddit_velocity': post_count, # Posts in last month matching buying intent
+                'raw_query': query,
+                'status': 'success'
+            }
+            for term, (post_count, score_sum) in counts.items()
+        }
+
+    def get_signals_many(self, terms: List[str],
+                         aliases: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Reddit signals for many titles: cache first, then OR-batched searches
+        on a bounded thread pool. Successful results are cached for
+        REDDIT_CACHE_HOURS. Searches use the term itself; `aliases` is
+        accepted for interface parity with RedditStreamMatcher.
+        """
+        terms = list(dict.fromkeys(terms))
+        if not self.enabled:
+            return {term: self._empty_result('disabled') for term in terms}
+
+        results = {}
+        missing = []
+        for term in terms:
+            cached = self.cache.get(term.casefold(), namespace=self.CACHE_NAMESPACE)
+            if cached:
+                cached['status'] = 'cached'
+                results[term] = cached
+            else:
+                missing.append(term)
+        metrics.cache_lookup(self.CACHE_NAMESPACE, 'hit', len(results))
+        metrics.cache_lookup(self.CACHE_NAMESPACE, 'miss', len(missing))
+
+        batches = self._build_batches(missing)
+        if batches:
+            logger.info(f"Reddit: {len(results)} cached, {len(missing)} titles in {len(batches)} searches")
+            with ThreadPoolExecutor(max_workers=min(len(batches), Config.REDDIT_MAX_WORKERS)) as executor:
+                for batch_results in executor.map(self._search_batch, batches):
+                    for term, data in batch_results.items():
+                        if data['status'] == 'success':
+                            self.cache.set(term.casefold(), data, Config.REDDIT_CACHE_HOURS * 3600,
+                                           namespace=self.CACHE_NAMESPACE)
+                        results[term] = data
+        return results
 
     def get_signals(self, keywords: List[str]) -> Dict[str, Any]:
         """
         Search for purchase intent signals for a given title (or list of aliases).
         Returns a dictionary with metrics.
         """
-        if not self.reddit:
+        if not self.enabled:
             return {'intent_score': 0, 'velocity': 0}
 
-        # Construct query: (Title1 OR Title2) AND (buy OR merch OR goods OR figure)
-        # However, search queries can't be too long.
         # MVP: Just use the primary title (Romaji or English) + "buy/merch"
-        
         primary_term = keywords[0]
-        query = f'"{primary_term}" (buy OR merch OR figure OR goods OR box OR price)'
-        
-        try:
-            # Search in relevant subreddits or globally?
-            # Global is noisy. Specific subs: manga, anime, AnimeFigures, MangaCollectors
-            subreddit = self.reddit.subreddit("manga+anime+AnimeFigures+MangaCollectors")
-            
-            # Fetch recent posts
-            results = subreddit.search(query, sort='new', time_filter='month', limit=20)
-            
-            post_count = 0
-            score_sum = 0
-            
-            for post in results:
-                post_count += 1
-                score_sum += post.score
-            
-            return {
-                'intent_score': post_count * 10 + score_sum, # Crude heuristic
-                'reddit_velocity': post_count, # Posts in last month matching buying intent
-                'raw_query': query
-            }
-            
-        except Exception as e:
-            logger.error(f"Reddit Search Failed for {primary_term}: {e}")
-            return {'intent_score': 0, 'velocity': 0}
+        return self.get_signals_many([primary_term])[primary_term]
 
 if __name__ == "__main__":
     # Test run
@@ -68,7 +173,7 @@ if __name__ == "__main__":
     # Assuming .env is present or vars are set
     
     client = RedditClient()
-    if client.reddit:
+    if client.enabled:
         print("Testing Reddit Client...")
         met = client.get_signals(["Frieren"]) # Example
         print(f"Signals for Frieren: {met}")
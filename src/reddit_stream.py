@@ -0,0 +1,242 @@
+import itertools
+import json
+import logging
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+from src.config import Config
+from src.rate_limiter import TokenBucket
+from src.reddit_client import RedditClient
+
+logger = logging.getLogger(__name__)
+
+INTENT_KEYWORDS = [
+    "buy", "bought", "buying", "merch", "figure", "figures", "goods", "box set",
+    "price", "preorder", "pre-order", "haul", "collection", "first print"
+]
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.casefold()).strip()
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: finds every occurrence of every pattern in one
+    pass over the text, independent of the number of patterns.
+    """
+    def __init__(self, patterns: Dict[str, List[Any]]):
+        # patterns: pattern text -> payloads reported on a match
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, Any]]] = [[]]
+        for pattern, payloads in patterns.items():
+            if pattern:
+                self._add(pattern, payloads)
+        self._link()
+
+    def _add(self, pattern: str, payloads: List[Any]):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].extend((len(pattern), payload) for payload in payloads)
+
+    def _link(self):
+        # BFS: a state's failure link is the longest proper suffix that is also a prefix
+        # (depth-1 states fail to the root)
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self.goto[state].items():
+                pending.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yields (start, end, payload) for every match."""
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in out[state]:
+                yield i + 1 - length, i + 1, payload
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    """
+    Latin-script matches must be whole words ('Naruto' not inside
+    'Narutomaki'); CJK text has no word spacing, so native titles match anywhere.
+    """
+    def is_word(ch: str) -> bool:
+        return ch.isascii() and ch.isalnum()
+    if is_word(text[start]) and start > 0 and is_word(text[start - 1]):
+        return False
+    if is_word(text[end - 1]) and end < len(text) and is_word(text[end]):
+        return False
+    return True
+
+class TitleIndex:
+    """
+    One automaton over every alias of every candidate plus the intent
+    keywords, so a post is scanned once no matter how many titles we track.
+    """
+    def __init__(self, aliases: Dict[str, List[str]], intent_keywords: List[str] = None,
+                 min_length: int = None):
+        min_length = min_length if min_length is not None else Config.REDDIT_MIN_TITLE_LENGTH
+        patterns: Dict[str, List[Any]] = {}
+        for key, names in aliases.items():
+            for name in names:
+                if not name:
+                    continue
+                pattern = normalize_text(name)
+                # Very short Latin aliases ("Ao", "K") match everything
+                if pattern.isascii() and len(pattern) < min_length:
+                    continue
+                payloads = patterns.setdefault(pattern, [])
+                if ('title', key) not in payloads:
+                    payloads.append(('title', key))
+        for keyword in intent_keywords or INTENT_KEYWORDS:
+            patterns.setdefault(normalize_text(keyword), []).append(('intent', keyword))
+        self.automaton = AhoCorasick(patterns)
+
+    def scan(self, text: str) -> Tuple[set, bool]:
+        """Returns (matched title keys, whether any intent keyword occurs)."""
+        text = normalize_text(text)
+        titles, intent = set(), False
+        for start, end, (kind, value) in self.automaton.iter_matches(text):
+            if not _bounded(text, start, end):
+                continue
+            if kind == 'title':
+                titles.add(value)
+            else:
+                intent = True
+        return titles, intent
+
+class RedditStreamMatcher:
+    """
+    Reddit signals without per-title searches: recent submissions and
+    comments from the target subreddits are pulled once per run and matched
+    against all candidates in one pass (see TitleIndex). Cost depends on
+    subreddit volume, not on the number of titles tracked.
+
+    Posts are plain dicts {'kind', 'text', 'score'}, so a run can be recorded
+    with save_posts() and replayed from the file with from_fixture().
+    """
+    def __init__(self, reddit=None, posts: Optional[List[Dict[str, Any]]] = None,
+                 limiter: Optional[TokenBucket] = None, intent_keywords: List[str] = None):
+        self.reddit = reddit
+        self.posts = posts
+        self.limiter = limiter if limiter is not None else TokenBucket(Config.REDDIT_RATE_LIMIT, burst=Config.REDDIT_BURST)
+        self.intent_keywords = intent_keywords or INTENT_KEYWORDS
+
+    @classmethod
+    def from_fixture(cls, path: str, **kwargs) -> 'RedditStreamMatcher':
+        return cls(posts=cls.load_posts(path), **kwargs)
+
+    @staticmethod
+    def load_posts(path: str) -> List[Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def save_posts(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for post in self.fetch_posts():
+                f.write(json.dumps(post, ensure_ascii=False) + "\n")
+
+    def fetch_posts(self) -> List[Dict[str, Any]]:
+        """Recent submissions + comments, fetched once and reused for the run."""
+        if self.posts is not None:
+            return self.posts
+        posts = []
+        if self.reddit is None:
+            logger.warning("Reddit stream: no client or fixture; no posts to match.")
+            self.posts = posts
+            return posts
+        subreddit = self.reddit.subreddit(Config.REDDIT_SUBREDDITS)
+        limit = Config.REDDIT_STREAM_LIMIT
+        try:
+            for submission in self._paged(subreddit.new(limit=limit), limit):
+                posts.append({'kind': 'submission', 'text': f"{submission.title}\n{submission.selftext}",
+                              'score': submission.score})
+            for comment in self._paged(subreddit.comments(limit=limit), limit):
+                posts.append({'kind': 'comment', 'text': comment.body, 'score': comment.score})
+        except Exception as e:
+            logger.error(f"Reddit stream fetch failed after {len(posts)} posts: {e}")
+        logger.info(f"Reddit stream: {len(posts)} posts/comments from {Config.REDDIT_SUBREDDITS}")
+        self.posts = posts
+        return posts
+
+    def _paged(self, listing: Iterable[Any], limit: int) -> Iterator[Any]:
+        """
+        Items of a lazy PRAW listing, taking one limiter token before each
+        API page (MAX_LISTING_LIMIT items) is fetched.
+        """
+        items = iter(listing)
+        for count in itertools.count():
+            if count >= limit:
+                return
+            if count % RedditClient.MAX_LISTING_LIMIT == 0:
+                self.limiter.acquire()
+            try:
+                yield next(items)
+            except StopIteration:
+                return
+
+    @property
+    def enabled(self) -> bool:
+        return self.posts is not None or self.reddit is not None
+
+    def match(self, aliases: Dict[str, List[str]], posts: Iterable[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Per title key: mentions, and posts where the title co-occurs with a
+        purchase-intent keyword (scored like RedditClient's search results).
+        """
+        if posts is None and not self.enabled:
+            logger.warning("Reddit stream: no client or fixture. Reddit signals disabled.")
+            return {key: RedditClient._empty_result('disabled') for key in aliases}
+        index = TitleIndex(aliases, self.intent_keywords)
+        counts = {key: [0, 0, 0] for key in aliases}  # mentions, intent posts, intent score sum
+        for post in posts if posts is not None else self.fetch_posts():
+            titles, intent = index.scan(post.get('text') or '')
+            for key in titles:
+                counts[key][0] += 1
+                if intent:
+                    counts[key][1] += 1
+                    counts[key][2] += post.get('score') or 0
+        return {
+            key: {
+                'intent_score': intent_posts * 10 + score_sum, # Same heuristic as search mode
+                'reddit_velocity': intent_posts,
+                'reddit_mentions': mentions,
+                'status': 'success'
+            }
+            for key, (mentions, intent_posts, score_sum) in counts.items()
+        }
+
+    def get_signals_many(self, terms: List[str],
+                         aliases: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Same interface as RedditClient.get_signals_many."""
+        aliases = aliases or {}
+        return self.match({term: aliases.get(term) or [term] for term in dict.fromkeys(terms)})
+
+if __name__ == "__main__":
+    # Replay a recorded post fixture: python -m src.reddit_stream posts.jsonl "Frieren" "Chainsaw Man"
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 3:
+        print("Usage: python -m src.reddit_stream <posts.jsonl> <title> [<title> ...]")
+    else:
+        matcher = RedditStreamMatcher.from_fixture(sys.argv[1])
+        for title, signals in matcher.get_signals_many(sys.argv[2:]).items():
+            print(f"{title}: {signals}")
@@ -0,0 +1,121 @@
+import math
+import time
+import logging
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from src.config import Config
+from src.google_trends_client import GoogleTrendsClient
+from src.titles import canonical_title
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    """
+    Keeps the Trends cache warm between weekly batches.
+
+    Each batch records its Trends terms in rank order (track()). A daily
+    run() then re-fetches, within a request budget, the tracked base and
+    intent entries that expire within TRENDS_REFRESH_HORIZON_DAYS: soonest
+    to expire first, and within the same day highest-ranked first. Combined
+    with jittered TTLs this spreads live Trends requests across the week, so
+    the weekly batch mostly finds warm entries.
+    """
+    NAMESPACE = 'trends_refresh'
+
+    def __init__(self, client, budget: Optional[int] = None, horizon_days: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        self.client = client
+        self.cache = client.cache
+        self.budget = budget if budget is not None else Config.TRENDS_REFRESH_BUDGET
+        self.horizon = (horizon_days if horizon_days is not None else Config.TRENDS_REFRESH_HORIZON_DAYS) * 86400
+        self.clock = clock
+
+    def track(self, terms: List[str]):
+        """Remember this batch's Trends terms; list order is the rank."""
+        ttl = Config.TRENDS_REFRESH_TRACK_DAYS * 86400
+        for rank, term in enumerate(dict.fromkeys(terms)):
+            self.cache.set(self._key(term), {'term': term, 'rank': rank}, ttl, namespace=self.NAMESPACE)
+
+    @staticmethod
+    def _key(term: str) -> str:
+        return canonical_title(term) or term
+
+    def _entry(self, term: str, namespace: str) -> Optional[Dict[str, Any]]:
+        # Same key scheme as GoogleTrendsClient (canonical, then legacy raw key)
+        for key in dict.fromkeys([self._key(term), term]):
+            entry = self.cache.get_entry(key, namespace=namespace)
+            if entry is not None:
+                return entry
+        return None
+
+    def _freshest(self, term: str, namespaces: List[str]) -> Optional[Dict[str, Any]]:
+        """The entry that expires last across `namespaces` (None if none exists)."""
+        entries = [entry for entry in (self._entry(term, ns) for ns in namespaces) if entry is not None]
+        return max(entries, key=lambda entry: entry['expires_at'], default=None)
+
+    def plan(self) -> Tuple[List[str], List[Tuple[str, Optional[str]]]]:
+        """
+        Base terms and (term, anchor) intent items to refresh this run.
+        A packed base request covers TITLES_PER_PAYLOAD terms; an intent
+        request covers one.
+        """
+        now = self.clock()
+        due = now + self.horizon
+        jobs = []
+        for tracked in self.cache.scan(self.NAMESPACE).values():
+            if tracked['expires_at'] <= now:
+                continue
+            term, rank = tracked['data']['term'], tracked['data']['rank']
+            # A full get_signals entry also serves base scores and intents
+            # (see GoogleTrendsClient.get_base_scores / get_intents)
+            base = self._freshest(term, [GoogleTrendsClient.CACHE_NAMESPACE,
+                                         GoogleTrendsClient.BASE_CACHE_NAMESPACE])
+            # Missing entries (e.g. failed last time) count as already expired
+            base_expiry = base['expires_at'] if base else now
+            if base_expiry <= due:
+                jobs.append((base_expiry, rank, 'base', term, None))
+            intent = self._freshest(term, [GoogleTrendsClient.CACHE_NAMESPACE,
+                                           GoogleTrendsClient.INTENT_CACHE_NAMESPACE])
+            if intent is not None and intent['expires_at'] <= due:
+                anchor = base['data'].get('anchor_term') if base else None
+                jobs.append((intent['expires_at'], rank, 'intent', term, anchor))
+
+        # Soonest day first, then rank; overdue entries share day 0
+        jobs.sort(key=lambda job: (max(0, int((job[0] - now) // 86400)), job[1], job[2]))
+
+        base_terms, intent_items = [], []
+        for _, _, kind, term, anchor in jobs:
+            n_base = len(base_terms) + (kind == 'base')
+            n_intent = len(intent_items) + (kind == 'intent')
+            if math.ceil(n_base / GoogleTrendsClient.TITLES_PER_PAYLOAD) + n_intent > self.budget:
+                continue
+            if kind == 'base':
+                base_terms.append(term)
+            else:
+                intent_items.append((term, anchor))
+        if len(base_terms) + len(intent_items) < len(jobs):
+            logger.info(f"Trends refresh: {len(jobs) - len(base_terms) - len(intent_items)} due entries "
+                        f"left for later runs (budget {self.budget} requests)")
+        return base_terms, intent_items
+
+    def run(self) -> Dict[str, int]:
+        base_terms, intent_items = self.plan()
+        logger.info(f"Trends refresh: {len(base_terms)} base terms, {len(intent_items)} intent terms")
+        with metrics.stage('trends.refresh'):
+            base_results = self.client.get_base_scores(base_terms, refresh=True) if base_terms else {}
+            # Intents follow the anchor of a base score refreshed just now
+            intent_items = [
+                (term, base_results[term]['anchor_term']
+                 if base_results.get(term, {}).get('status') == 'success' else anchor)
+                for term, anchor in intent_items
+            ]
+            intent_results = self.client.get_intents_many(intent_items, refresh=True) if intent_items else {}
+        refreshed = {
+            'base': sum(1 for r in base_results.values() if r.get('status') == 'success'),
+            'intent': sum(1 for r in intent_results.values() if r.get('intent_status') == 'success'),
+        }
+        metrics.inc('trends_refreshed', refreshed['base'], kind='base')
+        metrics.inc('trends_refreshed', refreshed['intent'], kind='intent')
+        logger.info(f"Trends refresh done: {refreshed['base']}/{len(base_terms)} base, "
+                    f"{refreshed['intent']}/{len(intent_items)} intents")
+        return refreshed
@@ -1,40 +1,247 @@
-import pandas as pd
+import csv
+import json
+import math
+import os
+import sqlite3
 import logging
-from typing import List, Dict, Any
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterable, Optional
 from src.config import Config
+from src.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Report column order (shared by every sink)
+REPORT_COLUMNS = [
+    'title_native', 'title_en', 'anime_adaptation', 'score_total', 'data_quality',
+    'score_anilist', 'score_intent_manga',
+    'score_intent_merch', 'score_velocity',
+    'trends_normalized', 'trends_status', 'anchor_term',
+    'anilist_popularity', 'anilist_trending',
+    'recommended_sku_manga', 'recommended_sku_goods',
+    'notes', 'anilist_id',
+    # Added columns go at the end so existing consumers keep their positions
+    'anilist_velocity', 'anilist_acceleration',
+    'reddit_posts', 'reddit_intent_score'
+]
+
+def region_column(geo: str) -> str:
+    return f"trends_{geo.lower()}"
+
+def report_columns() -> List[str]:
+    """REPORT_COLUMNS followed by one trends_<geo> column per TRENDS_GEOS market."""
+    return list(REPORT_COLUMNS) + [region_column(geo) for geo in Config.TRENDS_GEOS]
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+class ReportSink(ABC):
+    """
+    Report output written row by row (no DataFrame copy of the report) to
+    `<path>.partial`; finalize() atomically renames it over `path`. If the
+    run fails, the previous report stays in place and the partial file is
+    kept. Usable as a context manager (finalize on success, close on error).
+    """
+    def __init__(self, path: str, columns: List[str] = None):
+        self.path = path
+        self.partial_path = path + ".partial"
+        self.columns = list(columns or report_columns())
+        self.rows_written = 0
+        self._open()
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _write(self, row: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def _close(self):
+        pass
+
+    def write_row(self, row: Dict[str, Any]):
+        self._write(row)
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.write_row(row)
+        self.flush()
+
+    def flush(self):
+        pass
+
+    def finalize(self):
+        self._close()
+        os.replace(self.partial_path, self.path)
+        fmt = os.path.splitext(self.path)[1].lstrip('.')
+        metrics.inc('report_rows', self.rows_written, format=fmt)
+        metrics.inc('report_bytes', os.path.getsize(self.path), format=fmt)
+        logger.info(f"Report generated successfully: {self.path} ({self.rows_written} rows)")
+
+    def abort(self):
+        self._close()
+        logger.warning(f"Report not finalized; partial output kept at {self.partial_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+        return False
+
+class CSVSink(ReportSink):
+    """
+    CSV with a BOM (utf-8-sig, for Excel compatibility). None/NaN are empty
+    cells and floats are written via repr, as DataFrame.to_csv did. Unlike
+    to_csv, an integer column with missing values keeps its integers (`5`,
+    not `5.0`): rows are written one at a time, without column dtypes.
+    """
+    def _open(self):
+        self.file = open(self.partial_path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file, lineterminator=os.linesep)
+        self.writer.writerow(self.columns)
+
+    def _write(self, row: Dict[str, Any]):
+        self.writer.writerow(['' if _is_missing(row.get(c)) else row.get(c) for c in self.columns])
+
+    def flush(self):
+        self.file.flush()
+
+    def _close(self):
+        if not self.file.closed:
+            self.file.close()
+
+class JSONLSink(ReportSink):
+    """One JSON object per line, NaN written as null."""
+    def _open(self):
+        self.file = open(self.partial_path, 'w', encoding='utf-8')
+
+    def _write(self, row: Dict[str, Any]):
+        record = {c: None if _is_missing(row.get(c)) else row.get(c) for c in self.columns}
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def _close(self):
+        if not self.file.closed:
+            self.file.close()
+
+class SQLiteSink(ReportSink):
+    """
+    Rows in a `report` table (one column per report column, in order).
+    Committed on every flush, so a partial database is readable after a crash.
+    """
+    TABLE = 'report'
+
+    def _open(self):
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+        self.conn = sqlite3.connect(self.partial_path)
+        column_defs = ", ".join(f'"{c}"' for c in self.columns)
+        self.conn.execute(f'CREATE TABLE {self.TABLE} ({column_defs})')
+        placeholders = ", ".join("?" for _ in self.columns)
+        self.insert_sql = f'INSERT INTO {self.TABLE} VALUES ({placeholders})'
+
+    def _write(self, row: Dict[str, Any]):
+        self.conn.execute(self.insert_sql, [None if _is_missing(row.get(c)) else row.get(c) for c in self.columns])
+
+    def flush(self):
+        self.conn.commit()
+
+    def _close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+class MultiSink:
+    """Fans rows out to several sinks; finalizes or aborts them together."""
+    def __init__(self, sinks: List[ReportSink]):
+        self.sinks = sinks
+
+    @property
+    def rows_written(self) -> int:
+        return self.sinks[0].rows_written if self.sinks else 0
+
+    def write_row(self, row: Dict[str, Any]):
+        for sink in self.sinks:
+            sink.write_row(row)
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.write_row(row)
+        self.flush()
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def finalize(self):
+        for sink in self.sinks:
+            sink.finalize()
+
+    def abort(self):
+        for sink in self.sinks:
+            sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+        return False
+
 class Reporter:
-    @staticmethod
-    def generate_csv(data: List[Dict[str, Any]], filename: str = Config.REPORT_FILE):
+    SINKS = {'csv': CSVSink, 'jsonl': JSONLSink, 'sqlite': SQLiteSink}
+    EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'sqlite': '.db'}
+
+    @classmethod
+    def open(cls, filename: str = Config.REPORT_FILE, formats: Optional[List[str]] = None) -> MultiSink:
         """
-        Convert processed data to CSV.
+        Open one sink per format. `filename` names the CSV report; the other
+        formats share its stem (report.jsonl, report.db).
+        """
+        formats = formats or Config.REPORT_FORMATS
+        stem = os.path.splitext(filename)[0]
+        sinks = []
+        for fmt in formats:
+            if fmt not in cls.SINKS:
+                raise ValueError(f"Unknown report format: {fmt}")
+            path = filename if fmt == 'csv' else stem + cls.EXTENSIONS[fmt]
+            sinks.append(cls.SINKS[fmt](path))
+        return MultiSink(sinks)
+
+    @classmethod
+    def generate(cls, data: Iterable[Dict[str, Any]], filename: str = Config.REPORT_FILE,
+                 formats: Optional[List[str]] = None):
+        """
+        Write already-computed rows to every configured format.
         """
-        if not data:
+        rows = iter(data)
+        first = next(rows, None)
+        if first is None:
             logger.warning("No data to report.")
             return
-
         try:
-            df = pd.DataFrame(data)
-            
-            # Ensure column order
-            columns = [
-                'title_native', 'title_en', 'anime_adaptation', 'score_total', 'data_quality',
-                'score_anilist', 'score_intent_manga', 
-                'score_intent_merch', 'score_velocity',
-                'trends_normalized', 'trends_status', 'anchor_term',
-                'anilist_popularity', 'anilist_trending',
-                'recommended_sku_manga', 'recommended_sku_goods',
-                'notes', 'anilist_id'
-            ]
-            
-            # Filter valid columns that exist in data
-            valid_columns = [c for c in columns if c in df.columns]
-            df = df[valid_columns]
-            
-            df.to_csv(filename, index=False, encoding='utf-8-sig') # sig for Excel compatibility
-            logger.info(f"Report generated successfully: {filename}")
-            
+            with metrics.stage('report.write'), cls.open(filename, formats) as sink:
+                sink.write_row(first)
+                sink.write_rows(rows)
         except Exception as e:
             logger.error(f"Failed to generate report: {e}")
+
+    @classmethod
+    def generate_csv(cls, data: List[Dict[str, Any]], filename: str = Config.REPORT_FILE):
+        """
+        Convert processed data to CSV.
+        """
+        cls.generate(data, filename, formats=['csv'])
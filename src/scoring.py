@@ -0,0 +1,221 @@
+import math
+import logging
+from typing import List, Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Anime adaptation priority: RELEASING > NOT_YET_RELEASED > FINISHED
+ANIME_STATUS_RANK = {'FINISHED': 1, 'NOT_YET_RELEASED': 2, 'RELEASING': 3}
+ANIME_STATUS_LABEL = np.array(["None", "Finished", "Announced", "Airing"], dtype=object)
+
+MERCH_SKU = ["", "Acrylic Stand", "Scale Figure"]
+
+def _goods_table() -> np.ndarray:
+    """
+    recommended_sku_goods for every (merch tier, preorder, announced) combination,
+    indexed by merch_tier * 4 + preorder * 2 + announced.
+    """
+    table = []
+    for merch in MERCH_SKU:
+        for preorder in (False, True):
+            for announced in (False, True):
+                goods = [merch] if merch else []
+                if preorder:
+                    goods.append("Preorder Bonus")
+                if announced:
+                    goods.append("Anime Hype Investment")
+                table.append(", ".join(goods) if goods else "General Merch")
+    return np.array(table, dtype=object)
+
+GOODS_TABLE = _goods_table()
+
+# Reddit statuses that carry real numbers (others are written blank)
+REDDIT_MEASURED = ('success', 'cached')
+
+def build_base_frame(anilist_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Stage 1 as a frame: one row per AniList item with titles, anime status
+    and score_anilist, sorted by score_anilist (desc, stable).
+    """
+    ids, natives, terms, pops, trends, statuses, anime_ranks = [], [], [], [], [], [], []
+    for item in anilist_data:
+        titles = item.get('title', {})
+        english = titles.get('english')
+        terms.append(english if english else titles.get('romaji', 'Unknown'))
+        natives.append(titles.get('native', ''))
+        ids.append(item.get('id'))
+        pops.append(item.get('popularity', 0))
+        trends.append(item.get('trending', 0))
+        statuses.append(item.get('status'))
+
+        best = 0
+        for edge in item.get('relations', {}).get('edges', []):
+            if edge.get('relationType') == 'ADAPTATION':
+                node = edge.get('node', {})
+                if node.get('type') == 'ANIME':
+                    best = max(best, ANIME_STATUS_RANK.get(node.get('status'), 0))
+        anime_ranks.append(best)
+
+    frame = pd.DataFrame({
+        'anilist_id': pd.Series(ids, dtype=object),
+        'title_native': pd.Series(natives, dtype=object),
+        'search_term': pd.Series(terms, dtype=object),
+        'anilist_popularity': pd.Series(pops, dtype=object),
+        'anilist_trending': pd.Series(trends, dtype=object),
+        'status': pd.Series(statuses, dtype=object),
+        'anime_status': ANIME_STATUS_LABEL[np.array(anime_ranks, dtype=int)] if anime_ranks else pd.Series([], dtype=object),
+    })
+
+    # `x or 0` semantics: None and 0 both count as 0
+    pop = pd.to_numeric(frame['anilist_popularity'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    trend = pd.to_numeric(frame['anilist_trending'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    frame['score_anilist'] = (pop / 1000) + (trend / 10)
+
+    # Sort by AniList score to pick best candidates for expensive Trends API
+    order = np.argsort(-frame['score_anilist'].to_numpy(), kind='stable')
+    return frame.iloc[order].reset_index(drop=True)
+
+def _as_float(values) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+def _round2(values: np.ndarray) -> List[float]:
+    """
+    round(v, 2) for a whole column. np.round only disagrees with Python's
+    correctly-rounded round() when v * 100 sits right on a .5 boundary, so
+    those few values go through round() to keep output identical.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    with np.errstate(invalid='ignore'):
+        ties = np.abs(np.abs(values * 100) % 1 - 0.5) < 1e-6
+    out = rounded.tolist()
+    for i in np.flatnonzero(ties).tolist():
+        out[i] = round(values[i].item(), 2)
+    return out
+
+def _history_column(frame: pd.DataFrame, column: str) -> List[float]:
+    if column not in frame:
+        return [float('nan')] * len(frame)
+    return np.round(frame[column].to_numpy(dtype=float), 4).tolist()
+
+def trends_uplift(data: Optional[Dict[str, Any]]) -> float:
+    """
+    What one title's Trends signals add to its score_total (the
+    intent_manga and velocity terms of score_rows). 0 for missing or
+    unusable data.
+    """
+    if not data:
+        return 0.0
+    norm = data.get('normalized_score')
+    if norm is None or math.isnan(norm):
+        return 0.0
+    uplift = 0.0
+    intent_manga = data.get('intent_manga')
+    if intent_manga is not None and not math.isnan(intent_manga):
+        uplift += intent_manga * 1.5
+    velocity = data.get('velocity')
+    if velocity is not None and not math.isnan(velocity) and norm >= 0.5:
+        uplift += min(velocity, 2.0) * 50
+    return uplift
+
+def score_rows(frame: pd.DataFrame, trends_data: List[Optional[Dict[str, Any]]],
+               reddit_data: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Post-enrichment scoring for the whole frame at once.
+    trends_data[i] holds the Trends signals for frame row i, or None if the
+    row was skipped; reddit_data[i] likewise for Reddit (reported, not scored).
+    Returns report rows sorted by score_total.
+    """
+    if len(frame) == 0:
+        return []
+    checked = np.array([data is not None for data in trends_data], dtype=bool)
+    terms = frame['search_term'].tolist()
+
+    def signal(key, default):
+        return [data.get(key, default) if data is not None else None for data in trends_data]
+
+    # Skipped rows: 0.0 signals, status 'skipped'
+    intent_manga = np.where(checked, _as_float(signal('intent_manga', float('nan'))), 0.0)
+    intent_merch = np.where(checked, _as_float(signal('intent_merch', float('nan'))), 0.0)
+    velocity = np.where(checked, _as_float(signal('velocity', float('nan'))), 0.0)
+    norm_score = np.where(checked, _as_float(signal('normalized_score', float('nan'))), 0.0)
+    trends_status = pd.Series(np.where(checked, signal('status', 'unknown'), 'skipped'), dtype=object)
+    anchor_term = np.where(checked, signal('anchor_term', 'None'), 'None')
+
+    valid_velocity = ~np.isnan(velocity)
+    valid_norm = ~np.isnan(norm_score)
+    safe_intent_manga = np.where(np.isnan(intent_manga), 0.0, intent_manga)
+    safe_intent_merch = np.where(np.isnan(intent_merch), 0.0, intent_merch)
+    safe_velocity = np.where(valid_velocity, velocity, 0.0)
+    safe_norm = np.where(valid_norm, norm_score, 0.0)
+
+    # Velocity Logic
+    with np.errstate(invalid='ignore'):
+        velocity_score = np.where(checked & valid_velocity & valid_norm & (norm_score >= 0.5),
+                                  np.minimum(velocity, 2.0) * 50, 0.0)
+
+    # Data Quality Score
+    skipped = (trends_status == 'skipped').to_numpy()
+    cached = trends_status.str.startswith('cached').fillna(False).to_numpy(dtype=bool)
+    data_quality = np.select(
+        [skipped, ~valid_norm, cached],
+        [0.5, 0.1, 0.8],   # AniList only / Failed API / cached
+        default=1.0
+    )
+
+    # Total Score Calculation
+    score_anilist = frame['score_anilist'].to_numpy(dtype=float)
+    score_intent_manga = safe_intent_manga * 1.5
+    total_score = np.where((data_quality < 0.5) | skipped,
+                           score_anilist,
+                           score_anilist + score_intent_manga + velocity_score)
+
+    # SKU Logic
+    sku_manga = np.where(frame['status'].to_numpy() == 'RELEASING', "Vol 1 (New)", "Complete Set (Used)")
+    merch_tier = np.select([safe_intent_merch > 20, safe_intent_merch > 5], [2, 1], default=0)
+    goods_index = merch_tier * 4 + (safe_velocity > 0.5) * 2 + (frame['anime_status'].to_numpy() == 'Announced')
+    sku_goods = GOODS_TABLE[goods_index]
+
+    statuses = trends_status.tolist()
+    if reddit_data is None:
+        reddit_data = [None] * len(frame)
+    # Blank (not 0) when Reddit is disabled or the lookup failed
+    measured = [data is not None and data.get('status') in REDDIT_MEASURED for data in reddit_data]
+    reddit_posts = [data['reddit_velocity'] if ok else None for data, ok in zip(reddit_data, measured)]
+    reddit_intent = [data['intent_score'] if ok else None for data, ok in zip(reddit_data, measured)]
+    columns = {
+        'title_native': frame['title_native'].tolist(),
+        'title_en': terms,
+        'anilist_id': frame['anilist_id'].tolist(),
+        'anilist_popularity': frame['anilist_popularity'].tolist(),
+        'anilist_trending': frame['anilist_trending'].tolist(),
+        # Week-over-week AniList popularity change (see HistoryStore); blank without history
+        'anilist_velocity': _history_column(frame, 'anilist_velocity'),
+        'anilist_acceleration': _history_column(frame, 'anilist_acceleration'),
+
+        'score_total': _round2(total_score),
+        'score_anilist': _round2(score_anilist),
+        'score_intent_manga': _round2(safe_intent_manga),
+        'score_intent_merch': _round2(safe_intent_merch),
+        'score_velocity': _round2(velocity_score),
+
+        'trends_normalized': _round2(safe_norm),
+        'trends_status': statuses,
+        'data_quality': data_quality.tolist(),
+        'anchor_term': anchor_term.tolist(),
+        'anime_adaptation': frame['anime_status'].tolist(),
+        'reddit_posts': reddit_posts,
+        'reddit_intent_score': reddit_intent,
+
+        'recommended_sku_manga': sku_manga.tolist(),
+        'recommended_sku_goods': sku_goods.tolist(),
+        'notes': [f"Vel: {v:.1%}, Status: {s}" for v, s in zip(safe_velocity.tolist(), statuses)]
+    }
+
+    # Final Sort (stable, like list.sort(reverse=True))
+    order = np.argsort(-np.array(columns['score_total']), kind='stable')
+    keys = list(columns)
+    rows = list(zip(*columns.values()))
+    return [dict(zip(keys, rows[i])) for i in order.tolist()]
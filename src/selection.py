@@ -0,0 +1,132 @@
+import math
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+from src.config import Config
+from src.google_trends_client import GoogleTrendsClient
+from src.scoring import trends_uplift
+
+logger = logging.getLogger(__name__)
+
+def expected_rank_gain(scores: np.ndarray, candidates: np.ndarray, uplift: float) -> np.ndarray:
+    """
+    For each candidate score, the rank change if Trends added `uplift` to
+    it, in reciprocal rank (1/rank after - 1/rank before) since the report
+    is read from the top: #10 -> #5 outweighs #1000 -> #300.
+    """
+    ordered = np.sort(scores)
+    rank = len(ordered) - np.searchsorted(ordered, candidates, side='right') + 1
+    rank_after = len(ordered) - np.searchsorted(ordered, candidates + uplift, side='right') + 1
+    return 1.0 / rank_after - 1.0 / rank
+
+class TrendsSelector:
+    """
+    Picks which Trends lookups a batch makes within one live request budget.
+
+    Cached lookups cost nothing and are always included; with a budget of 0
+    the batch runs from the cache alone. Live requests are spent phase by
+    phase, each phase taking what the earlier ones left:
+    - base scores (select), at most TRENDS_BASE_BUDGET_SHARE of the budget,
+      for the uncached titles whose expected rank change is largest
+      (expected_rank_gain with the median uplift of the cached titles,
+      else TRENDS_EXPECTED_UPLIFT);
+    - intents (limit_intents), keeping region_reserve() for the last phase;
+    - regional base scores (limit_regions).
+    A packed base or regional request covers TITLES_PER_PAYLOAD titles; an
+    intent request covers one. `spent` counts the live requests picked so far.
+    """
+    def __init__(self, client, budget: Optional[int] = None):
+        self.client = client
+        self.budget = budget if budget is not None else Config.TRENDS_LIVE_BUDGET
+        self.spent = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.spent)
+
+    @staticmethod
+    def region_reserve() -> int:
+        """Requests the regional phase needs when none of it is cached."""
+        return (math.ceil(Config.TRENDS_REGION_TOP_N / GoogleTrendsClient.TITLES_PER_PAYLOAD)
+                * len(Config.TRENDS_GEOS))
+
+    def select(self, terms: List[str], scores: List[float]) -> List[str]:
+        """
+        terms/scores: unique lookup terms and their score_anilist, in rank
+        order. Returns the selected terms, still in rank order.
+        """
+        cached = self.client.cached_base_scores(terms)
+        scores = np.asarray(scores, dtype=float)
+        uplifts = np.array([trends_uplift(cached.get(term)) for term in terms])
+        # Cached titles compete with their Trends uplift already applied
+        effective = scores + uplifts
+        uplift = float(np.median(uplifts[[term in cached for term in terms]])) if cached else 0.0
+        if uplift <= 0:
+            uplift = Config.TRENDS_EXPECTED_UPLIFT
+
+        live = np.array([i for i, term in enumerate(terms) if term not in cached], dtype=int)
+        base_budget = min(self.remaining, math.ceil(self.budget * Config.TRENDS_BASE_BUDGET_SHARE))
+        slots = base_budget * GoogleTrendsClient.TITLES_PER_PAYLOAD
+        chosen = set()
+        if len(live) and slots > 0:
+            gains = expected_rank_gain(effective, scores[live], uplift)
+            # Largest expected gain first; ties go to the higher-ranked title
+            order = np.lexsort((live, -gains))
+            chosen = set(live[order[:slots]].tolist())
+        requests = math.ceil(len(chosen) / GoogleTrendsClient.TITLES_PER_PAYLOAD)
+        self.spent += requests
+
+        selected = [term for i, term in enumerate(terms) if term in cached or i in chosen]
+        logger.info(f"Trends selection: {len(cached)} cached (free) + {len(chosen)} live "
+                    f"({requests} requests) of {len(terms)} titles")
+        return selected
+
+    def limit_intents(self, terms: List[str]) -> List[str]:
+        """
+        Intent terms (ranked) trimmed to what is left of the budget after the
+        base phase and the regional reserve; cached intents are free, so wider
+        coverage does not grow the live cost.
+        """
+        cached = self.client.cached_intents(terms)
+        live_budget = max(0, self.remaining - self.region_reserve())
+        selected = []
+        for term in terms:
+            if term in cached:
+                selected.append(term)
+            elif live_budget > 0:
+                selected.append(term)
+                live_budget -= 1
+                self.spent += 1
+        if len(selected) < len(terms):
+            logger.info(f"Trends intent phase: {len(terms) - len(selected)} uncached titles over "
+                        f"the live budget ({self.budget} requests, {self.spent} spent)")
+        return selected
+
+    def limit_regions(self, terms: List[str], geos: List[str]) -> Dict[str, List[str]]:
+        """
+        {geo: terms} for the regional phase, from what is left of the budget.
+        Titles are taken in rank order across all regions; cached regional
+        scores are free.
+        """
+        cached = self.client.cached_regional_base_scores({geo: terms for geo in geos})
+        per_request = GoogleTrendsClient.TITLES_PER_PAYLOAD
+        selected = {geo: [] for geo in geos}
+        live = {geo: 0 for geo in geos}
+        dropped = 0
+        for term in terms:
+            for geo in geos:
+                if term in cached.get(geo, {}):
+                    selected[geo].append(term)
+                    continue
+                # A live title costs a request when it opens a new packed payload
+                cost = 1 if live[geo] % per_request == 0 else 0
+                if cost > self.remaining:
+                    dropped += 1
+                    continue
+                selected[geo].append(term)
+                live[geo] += 1
+                self.spent += cost
+        if dropped:
+            logger.info(f"Trends regions: {dropped} uncached (region, title) lookups over "
+                        f"the live budget ({self.budget} requests, {self.spent} spent)")
+        return selected
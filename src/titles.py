@@ -0,0 +1,92 @@
+import re
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+# Anything that isn't a letter/digit separates words ("One-Punch Man" == "One Punch Man")
+_SEPARATORS = re.compile(r"[^\w]+|_")
+_APOSTROPHES = re.compile(r"['’`]")
+
+def canonical_title(title: Optional[str]) -> str:
+    """
+    Comparison/cache key for a title: NFKC (full-width -> ASCII), casefolded,
+    apostrophes dropped, punctuation and whitespace collapsed to single spaces.
+    """
+    if not title:
+        return ''
+    text = unicodedata.normalize('NFKC', title).casefold()
+    text = _APOSTROPHES.sub('', text)
+    return _SEPARATORS.sub(' ', text).strip()
+
+def search_term(item: Dict[str, Any]) -> str:
+    """The title we search for: English, else romaji."""
+    titles = item.get('title', {})
+    english = titles.get('english')
+    return english if english else titles.get('romaji', 'Unknown')
+
+def title_names(item: Dict[str, Any]) -> List[str]:
+    """Every name AniList has for an item: romaji, English, native, synonyms."""
+    titles = item.get('title', {})
+    names = [titles.get('romaji'), titles.get('english'), titles.get('native')]
+    names += item.get('synonyms') or []
+    return [name for name in dict.fromkeys(names) if name]
+
+class AliasIndex:
+    """
+    Groups search terms that name the same thing. Two items are merged when
+    any of their names share a canonical form (e.g. one item's English title
+    is another's synonym). Each group is represented by the first term added,
+    which is the one sent to Trends.
+    """
+    MIN_KEY_LENGTH = 3  # Shorter canonical names are too generic to merge on
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._representative: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+
+    @classmethod
+    def from_media(cls, anilist_data: List[Dict[str, Any]]) -> 'AliasIndex':
+        index = cls()
+        for item in anilist_data:
+            index.add(search_term(item), title_names(item))
+        return index
+
+    def _find(self, key: str) -> str:
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _make(self, key: str, term: str):
+        if key not in self._parent:
+            self._parent[key] = key
+            self._representative[key] = term
+            self._order[key] = len(self._order)
+
+    def _union(self, a: str, b: str):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        # The older group keeps its representative
+        if self._order[root_b] < self._order[root_a]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+
+    def add(self, term: str, names: List[str] = ()):
+        key = canonical_title(term) or term
+        self._make(key, term)
+        for name in names:
+            alias = canonical_title(name)
+            if len(alias) < self.MIN_KEY_LENGTH or alias == key:
+                continue
+            self._make(alias, term)
+            self._union(key, alias)
+
+    def representative(self, term: str) -> str:
+        """The term to query for `term` (itself if unknown)."""
+        key = canonical_title(term) or term
+        if key not in self._parent:
+            return term
+        return self._representative[self._find(key)]
@@ -0,0 +1,249 @@
+import itertools
+import math
+import logging
+import queue
+import threading
+from typing import Dict, List, Any, Optional, Callable
+import requests
+from pytrends.request import TrendReq, BASE_TRENDS_URL
+from src.config import Config
+from src.cache_store import CacheBackend
+from src.pacing import PacingController
+from src.google_trends_client import GoogleTrendsClient, AnchorHealth
+
+logger = logging.getLogger(__name__)
+
+class RebasedTrendReq(TrendReq):
+    """
+    TrendReq that talks to `base_url` instead of trends.google.com.
+    Used to run workers against a local fake Trends endpoint.
+    """
+    def __init__(self, base_url: str, **kwargs):
+        self.base_url = base_url.rstrip('/')
+        super().__init__(**kwargs)
+
+    def GetGoogleCookie(self):
+        response = requests.get(f'{self.base_url}/explore/?geo={self.hl[-2:]}',
+                                timeout=self.timeout, **self.requests_args)
+        return dict(filter(lambda i: i[0] == 'NID', response.cookies.items()))
+
+    def _get_data(self, url, *args, **kwargs):
+        return super()._get_data(url.replace(BASE_TRENDS_URL, self.base_url), *args, **kwargs)
+
+class TrendsWorkerConfig:
+    """
+    One worker: its own TrendReq session, egress proxy and pacing.
+    """
+    def __init__(self, name: str, proxy: Optional[str] = None, min_delay: float = None,
+                 base_url: Optional[str] = None):
+        self.name = name
+        self.proxy = proxy
+        self.min_delay = min_delay if min_delay is not None else Config.TRENDS_MIN_DELAY
+        self.base_url = base_url
+
+    def build_pytrends(self) -> TrendReq:
+        kwargs = {'hl': 'en-US', 'tz': 360}
+        if self.proxy:
+            kwargs['proxies'] = [self.proxy]
+        if self.base_url:
+            return RebasedTrendReq(self.base_url, **kwargs)
+        return TrendReq(**kwargs)
+
+class TrendsWorkerPool:
+    """
+    Runs Trends enrichment on several GoogleTrendsClient workers in parallel.
+    Workers pull from one shared queue, write into one shared cache and share
+    anchor health (kept per region); each keeps its own session, proxy and
+    PacingController so a throttled egress backs off (or trips its breaker)
+    without stalling the rest.
+    Exposes the same enrichment methods as GoogleTrendsClient.
+    """
+    def __init__(self, worker_configs: List[TrendsWorkerConfig], cache: Optional[CacheBackend] = None,
+                 client_factory: Optional[Callable[[TrendsWorkerConfig, CacheBackend, AnchorHealth], GoogleTrendsClient]] = None):
+        if not worker_configs:
+            raise ValueError("TrendsWorkerPool needs at least one worker")
+        self.anchors = AnchorHealth(GoogleTrendsClient.ANCHOR_CANDIDATES)
+        factory = client_factory or self._default_client
+        self.workers = []
+        for config in worker_configs:
+            worker = factory(config, cache, self.anchors)
+            # The first worker opens the default cache; the rest share it
+            cache = worker.cache
+            self.workers.append(worker)
+        self.cache = cache
+        self.names = [config.name for config in worker_configs]
+        self._round_robin = itertools.cycle(range(len(self.workers)))
+
+    @staticmethod
+    def _default_client(config: TrendsWorkerConfig, cache: Optional[CacheBackend],
+                        anchors: AnchorHealth) -> GoogleTrendsClient:
+        pacing = PacingController(
+            min_delay=config.min_delay,
+            max_delay=Config.TRENDS_MAX_DELAY,
+            breaker_threshold=Config.TRENDS_BREAKER_THRESHOLD,
+            cooldown=Config.TRENDS_BREAKER_COOLDOWN
+        )
+        return GoogleTrendsClient(cache=cache, pacing=pacing, anchors=anchors,
+                                  pytrends_factory=config.build_pytrends)
+
+    @classmethod
+    def from_config(cls) -> 'TrendsWorkerPool':
+        """
+        One worker per TRENDS_PROXIES entry (at least TRENDS_WORKERS workers).
+        """
+        proxies = Config.TRENDS_PROXIES
+        count = max(Config.TRENDS_WORKERS, len(proxies), 1)
+        configs = [
+            TrendsWorkerConfig(
+                name=f"worker-{i}",
+                proxy=proxies[i % len(proxies)] if proxies else None,
+                base_url=Config.TRENDS_BASE_URL
+            )
+            for i in range(count)
+        ]
+        return cls(configs)
+
+    # Times a failed task is handed to another worker before its keys get error results
+    TASK_RETRIES = 1
+
+    def _run(self, tasks: List[Any], fn: Callable[[GoogleTrendsClient, Any], Dict[str, Any]],
+             on_error: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Drain `tasks` across all workers. fn(worker, task) returns a dict of
+        results that is merged into the output. A task whose fn raises is
+        handed to another running worker (the failing worker stops taking
+        work); if none is left, or after TASK_RETRIES, on_error(task) fills
+        in error results for its keys, so callers always get every key back.
+        """
+        work = queue.Queue()
+        for task in tasks:
+            work.put((task, 0))
+        results = {}
+        lock = threading.Lock()
+        running = [True] * len(self.workers)
+
+        def others_running(index: int, healthy: bool = False) -> bool:
+            return any(running[i] and not (healthy and self.workers[i].pacing.is_open)
+                       for i in range(len(self.workers)) if i != index)
+
+        def hand_off(index: int, healthy: bool = False) -> bool:
+            with lock:
+                if others_running(index, healthy):
+                    running[index] = False
+                    return True
+                return False
+
+        def worker_loop(index: int):
+            worker = self.workers[index]
+            try:
+                while True:
+                    try:
+                        task, attempt = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    # A worker with an open breaker hands its work to healthy workers
+                    if worker.pacing.is_open and hand_off(index, healthy=True):
+                        work.put((task, attempt))
+                        logger.warning(f"{self.names[index]}: circuit open, leaving remaining work to other workers")
+                        return
+                    try:
+                        out = fn(worker, task)
+                    except Exception as e:
+                        if attempt < self.TASK_RETRIES and hand_off(index):
+                            logger.error(f"{self.names[index]}: task failed ({e}); handing it to another worker",
+                                         exc_info=True)
+                            work.put((task, attempt + 1))
+                            return
+                        logger.error(f"{self.names[index]}: task failed: {e}", exc_info=True)
+                        out = on_error(task)
+                    with lock:
+                        results.update(out)
+            finally:
+                with lock:
+                    running[index] = False
+
+        threads = [threading.Thread(target=worker_loop, args=(i,), name=self.names[i], daemon=True)
+                   for i in range(len(self.workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Handed-off tasks that every remaining worker stopped before picking up
+        while True:
+            try:
+                task, _ = work.get_nowait()
+            except queue.Empty:
+                break
+            logger.error("Trends pool: no worker left for a handed-off task; marking it failed")
+            results.update(on_error(task))
+        return results
+
+    @property
+    def checkpoint_chunk_size(self) -> int:
+        """
+        Terms to enrich between checkpoint writes: whole ladder chains, at
+        least one per worker, so a chunk keeps every worker busy.
+        """
+        chain = GoogleTrendsClient.TITLES_PER_PAYLOAD * Config.TRENDS_POOL_CHAIN_GROUPS
+        return max(math.ceil(Config.CHECKPOINT_CHUNK_SIZE / chain), len(self.workers)) * chain
+
+    def cached_base_scores(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        # Workers share one cache
+        return self.workers[0].cached_base_scores(terms)
+
+    def cached_intents(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        return self.workers[0].cached_intents(terms)
+
+    def cached_regional_base_scores(self, terms_by_geo: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return self.workers[0].cached_regional_base_scores(terms_by_geo)
+
+    def recompute(self, window: Optional[int] = None, velocity: Optional[str] = None) -> Dict[str, int]:
+        return self.workers[0].recompute(window=window, velocity=velocity)
+
+    def get_signals(self, term: str) -> Dict[str, Any]:
+        return self.workers[next(self._round_robin)].get_signals(term)
+
+    def get_signals_many(self, terms: List[str]) -> Dict[str, Dict[str, Any]]:
+        return self._run(list(dict.fromkeys(terms)), lambda w, term: {term: w.get_signals(term)},
+                         lambda term: {term: GoogleTrendsClient.empty_result('error_unknown')})
+
+    def get_base_scores(self, terms: List[str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Terms are split into short ladder chains (each restarts at the anchor)
+        so chains can run on different workers.
+        """
+        terms = list(dict.fromkeys(terms))
+        chain = GoogleTrendsClient.TITLES_PER_PAYLOAD * Config.TRENDS_POOL_CHAIN_GROUPS
+        chains = [terms[i:i + chain] for i in range(0, len(terms), chain)]
+        logger.info(f"Trends pool: {len(terms)} terms in {len(chains)} chains across {len(self.workers)} workers")
+        return self._run(chains, lambda w, chunk: w.get_base_scores(chunk, refresh=refresh),
+                         lambda chunk: {t: GoogleTrendsClient.empty_result('error_unknown') for t in chunk})
+
+    def get_regional_base_scores(self, terms_by_geo: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Every region's ladder chains go into one queue, so regions run on
+        whichever worker is free (each worker's pacing covers all regions)
+        instead of one full pass per region.
+        """
+        chain = GoogleTrendsClient.TITLES_PER_PAYLOAD * Config.TRENDS_POOL_CHAIN_GROUPS
+        tasks = []
+        for geo, terms in terms_by_geo.items():
+            terms = list(dict.fromkeys(terms))
+            tasks += [(geo, terms[i:i + chain]) for i in range(0, len(terms), chain)]
+        logger.info(f"Trends pool: {len(terms_by_geo)} regions in {len(tasks)} chains across {len(self.workers)} workers")
+        found = self._run(tasks, lambda w, task: {
+            (task[0], term): result for term, result in w.for_geo(task[0]).get_base_scores(task[1]).items()
+        }, lambda task: {(task[0], t): GoogleTrendsClient.empty_result('error_unknown') for t in task[1]})
+        results = {geo: {} for geo in terms_by_geo}
+        for (geo, term), result in found.items():
+            results[geo][term] = result
+        return results
+
+    def get_intents(self, term: str, anchor: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+        return self.workers[next(self._round_robin)].get_intents(term, anchor=anchor, refresh=refresh)
+
+    def get_intents_many(self, items: List[tuple], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        return self._run(list(items), lambda w, item: {item[0]: w.get_intents(item[0], anchor=item[1],
+                                                                              refresh=refresh)},
+                         lambda item: {item[0]: GoogleTrendsClient.empty_intents('error_unknown')})
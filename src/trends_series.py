@@ -0,0 +1,98 @@
+import base64
+from datetime import date
+from typing import Dict, Any, Optional, Callable
+import numpy as np
+from src.config import Config
+
+# Roles a stored series column can play. 'reference' is what the others are
+# normalized against: the anchor, or a ladder bridge term whose score relative
+# to the anchor is meta['reference_norm'].
+ROLES = ('term', 'reference', 'manga', 'figure', 'merch')
+
+def pack_series(df, columns: Dict[str, str], **meta) -> Dict[str, Any]:
+    """
+    Compact, JSON-safe copy of interest_over_time columns: role -> column
+    name in df. Google's 0-100 integers are kept as one uint8 block (about
+    70 base64 bytes per column-year); anything else falls back to float32.
+    """
+    roles = [role for role in ROLES if role in columns]
+    values = np.vstack([df[columns[role]].to_numpy(dtype=float) for role in roles])
+    integral = np.all((values >= 0) & (values <= 255) & (values == np.round(values)))
+    dtype = 'uint8' if integral else 'float32'
+    return {
+        'roles': roles,
+        'start': date.fromisoformat(str(df.index[0])[:10]).isoformat() if len(df) else None,
+        'weeks': values.shape[1],
+        'dtype': dtype,
+        'values': base64.b64encode(values.astype(dtype).tobytes()).decode('ascii'),
+        'meta': meta,
+    }
+
+def unpack_series(record: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """role -> float series (oldest week first)."""
+    raw = np.frombuffer(base64.b64decode(record['values']), dtype=record['dtype'])
+    values = raw.reshape(len(record['roles']), record['weeks']).astype(float)
+    return dict(zip(record['roles'], values))
+
+def step_velocity(series: np.ndarray) -> float:
+    """Step-over-step change of the last complete week (the last row is partial)."""
+    if len(series) < 3:
+        return float('nan')
+    current, prev = series[-2], series[-3]
+    if prev > 0:
+        return float((current - prev) / prev)
+    return 1.0 if current > 0 else 0.0
+
+def window_velocity(series: np.ndarray, window: int = 4) -> float:
+    """Last `window` complete weeks against the `window` before them."""
+    complete = series[:-1]
+    if len(complete) < 2 * window:
+        return float('nan')
+    current, prev = complete[-window:].mean(), complete[-2 * window:-window].mean()
+    if prev > 0:
+        return float((current - prev) / prev)
+    return 1.0 if current > 0 else 0.0
+
+VELOCITY_VARIANTS: Dict[str, Callable[[np.ndarray], float]] = {
+    'step': step_velocity,
+    'window': window_velocity,
+}
+
+def derive_signals(record: Dict[str, Any], window: Optional[int] = None,
+                   velocity: Optional[str] = None) -> Dict[str, float]:
+    """
+    Trends signals from a stored series record. Pure: the same record and
+    parameters always give the same numbers, so formula changes can be
+    replayed offline. Returns only the keys the record's roles support:
+    normalized_score/velocity ('term'), intent_manga/intent_merch ('manga'),
+    and anchor_value.
+    """
+    window = window or Config.TRENDS_SIGNAL_WINDOW
+    velocity_fn = VELOCITY_VARIANTS[velocity or Config.TRENDS_VELOCITY]
+    series = unpack_series(record)
+    reference_norm = record['meta'].get('reference_norm', 100.0)
+    reference_avg = series['reference'][-window:].mean()
+
+    def normalized(role):
+        # 100 = the anchor's volume, also when the reference is a ladder bridge
+        if reference_avg <= 0:
+            return float('nan')
+        return float(series[role][-window:].mean() / reference_avg * reference_norm)
+
+    signals = {'anchor_value': float(reference_avg * 100 / reference_norm) if reference_norm else float('nan')}
+    if 'term' in series:
+        signals['normalized_score'] = normalized('term')
+        signals['velocity'] = velocity_fn(series['term'])
+    if 'manga' in series:
+        signals['intent_manga'] = normalized('manga')
+        signals['intent_merch'] = max(normalized('figure'), normalized('merch'))
+    return signals
+
+def rederive(data: Dict[str, Any], record: Dict[str, Any], window: Optional[int] = None,
+             velocity: Optional[str] = None) -> Dict[str, Any]:
+    """Cached result `data` with its numeric signals recomputed from `record`."""
+    updated = dict(data)
+    for key, value in derive_signals(record, window, velocity).items():
+        if key in updated:
+            updated[key] = value
+    return updated
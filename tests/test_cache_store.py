@@ -0,0 +1,68 @@
+import json
+import sqlite3
+import threading
+import pytest
+from src.cache_store import MemoryCache, SQLiteCache
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmp_path):
+    backend = MemoryCache() if request.param == 'memory' else SQLiteCache(str(tmp_path / 'cache.db'))
+    yield backend
+    backend.close()
+
+def test_namespaces_are_separate(cache):
+    cache.set('Frieren', {'score': 1}, 3600, namespace='trends_base')
+    cache.set('Frieren', {'score': 2}, 3600, namespace='trends_intent')
+
+    assert cache.get('Frieren', 'trends_base') == {'score': 1}
+    assert cache.get('Frieren', 'trends_intent') == {'score': 2}
+    assert cache.get('Frieren') is None
+    assert list(cache.scan('trends_intent')) == ['Frieren']
+
+def test_reads_are_independent_copies(cache):
+    cache.set('Frieren', {'tags': ['manga']}, 3600)
+    data = cache.get('Frieren')
+    data['tags'].append('merch')
+    assert cache.get('Frieren') == {'tags': ['manga']}
+    assert cache.get_many(['Frieren'])['Frieren'] == {'tags': ['manga']}
+
+def test_expired_entries_are_hidden_but_scannable(cache):
+    cache.set_many([('old', {'v': 1}, -10), ('new', {'v': 2}, 3600)], namespace='ns')
+    assert cache.get_many(['old', 'new', 'new'], 'ns') == {'new': {'v': 2}}
+    assert cache.get_entry('old', 'ns')['data'] == {'v': 1}
+    assert sorted(cache.scan('ns')) == ['new', 'old']
+    assert cache.evict_expired() == 1
+    assert cache.get_entry('old', 'ns') is None
+
+def test_both_backends_reject_non_json_values(cache):
+    with pytest.raises(TypeError):
+        cache.set('Frieren', {'when': object()}, 3600)
+
+def test_sqlite_close_closes_every_thread_connection(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    thread = threading.Thread(target=lambda: cache.set('Frieren', {'v': 1}, 3600))
+    thread.start()
+    thread.join()
+    assert len(cache.connections) == 2
+
+    connections = list(cache.connections.values())
+    cache.close()
+    assert cache.connections == {}
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+    # Reopens on demand
+    assert cache.get('Frieren') == {'v': 1}
+    cache.close()
+
+def test_legacy_json_import_runs_once(tmp_path):
+    legacy = tmp_path / 'trends_cache.json'
+    legacy.write_text(json.dumps({
+        'Frieren': {'timestamp': '2099-01-01T00:00:00', 'data': {'v': 1}},
+        'broken': {'data': {'v': 2}},
+    }), encoding='utf-8')
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    assert cache.import_json(str(legacy), 3600) == 1
+    assert cache.import_json(str(legacy), 3600) == 0
+    assert cache.get_entry('Frieren')['data'] == {'v': 1}
+    cache.close()
@@ -0,0 +1,96 @@
+import pytest
+from bench.fakes import FakeAniListSession, FakeTrendReq, RequestCounter
+from bench.fixtures import Fixtures
+from src.anilist_client import AniListClient
+from src.cache_store import MemoryCache
+from src.checkpoint import CheckpointStore
+from src.config import Config
+from src.google_trends_client import GoogleTrendsClient
+from src.pacing import PacingController
+from src.processor import DataProcessor, is_failed
+
+class Crash(BaseException):
+    """Stands in for the process dying (not caught like a request error)."""
+
+class FailingTrendReq(FakeTrendReq):
+    """Crashes the run after `crash_after` requests; every request from `fail_from` on errors."""
+    def __init__(self, fixtures, counter, crash_after=None, fail_from=None):
+        super().__init__(fixtures, counter)
+        self.crash_after = crash_after
+        self.fail_from = fail_from
+
+    def interest_over_time(self):
+        if self.crash_after is not None and self.counter.counts['trends'] >= self.crash_after:
+            raise Crash()
+        if self.fail_from is not None and self.counter.counts['trends'] >= self.fail_from:
+            self.counter.hit('trends')
+            raise ValueError("The request failed: Google returned a response with code 500")
+        return super().interest_over_time()
+
+@pytest.fixture
+def world(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', [])
+    fixtures = Fixtures.generate(120, seed=1)
+    anilist = AniListClient()
+    anilist.session = FakeAniListSession(fixtures, RequestCounter())
+    return fixtures, anilist.get_candidates(target_count=60)
+
+def run(fixtures, candidates, checkpoint, cache, counter, retry_failed=False, **fake):
+    client = GoogleTrendsClient(cache=cache, pacing=PacingController(min_delay=0.0, sleep=lambda s: None),
+                                pytrends=FailingTrendReq(fixtures, counter, **fake))
+    return DataProcessor(client).process(candidates, batch_mode=True, checkpoint=checkpoint,
+                                         retry_failed=retry_failed, trends_budget=30)
+
+def enriched(rows):
+    return {row['anilist_id']: row['score_total'] for row in rows if row['trends_status'] != 'skipped'}
+
+def test_units_survive_a_torn_line_and_later_lines_win(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path))
+    checkpoint.append_units('base', {'Frieren': {'status': 'error_api'}, 'Dandadan': {'status': 'success'}})
+    checkpoint.append_units('base', {'Frieren': {'status': 'success'}})
+    with open(tmp_path / 'base.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"key": "Sakamoto')
+
+    assert checkpoint.load_units('base') == {'Frieren': {'status': 'success'}, 'Dandadan': {'status': 'success'}}
+    checkpoint.drop('base')
+    assert checkpoint.load_units('base') == {}
+
+def test_resume_after_a_crash_matches_a_clean_run(tmp_path, world):
+    fixtures, candidates = world
+    clean_counter = RequestCounter()
+    clean = run(fixtures, candidates, CheckpointStore(str(tmp_path / 'clean')), MemoryCache(), clean_counter)
+
+    counter = RequestCounter()
+    cache = MemoryCache()
+    checkpoint = CheckpointStore(str(tmp_path / 'crashed'))
+    with pytest.raises(Crash):
+        run(fixtures, candidates, checkpoint, cache, counter, crash_after=6)
+    assert counter.counts['trends'] == 6
+    resumed = run(fixtures, candidates, checkpoint, cache, counter)
+
+    assert counter.counts['trends'] == clean_counter.counts['trends']
+    assert enriched(resumed) == enriched(clean)
+
+def test_retry_failed_redoes_only_failed_units(tmp_path, world):
+    fixtures, candidates = world
+    clean = run(fixtures, candidates, CheckpointStore(str(tmp_path / 'clean')), MemoryCache(), RequestCounter())
+
+    counter = RequestCounter()
+    cache = MemoryCache()
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoints'))
+    first = run(fixtures, candidates, checkpoint, cache, counter, fail_from=4)
+    assert any(is_failed(row['trends_status']) for row in first)
+
+    # Plain resume reuses every finished unit, failed ones included
+    before = counter.counts['trends']
+    run(fixtures, candidates, checkpoint, cache, counter)
+    assert counter.counts['trends'] == before
+
+    # Same picks as the clean run, with the failures redone
+    retried = run(fixtures, candidates, checkpoint, cache, counter, retry_failed=True)
+    assert counter.counts['trends'] > before
+    assert enriched(retried) == enriched(clean)
+    after = counter.counts['trends']
+    run(fixtures, candidates, checkpoint, cache, counter, retry_failed=True)
+    assert counter.counts['trends'] == after
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from src.cache_store import MemoryCache
+from src.google_trends_client import GoogleTrendsClient
+from src.pacing import PacingController
+
+ANCHOR = GoogleTrendsClient.ANCHOR_CANDIDATES[0]
+
+class FakeTrendReq:
+    """interest_over_time for constant search volumes, scaled like Google (max = 100)."""
+    def __init__(self, volumes):
+        self.volumes = volumes
+        self.payloads = []
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 12-m', geo='', gprop=''):
+        self.kw_list = list(kw_list)
+        self.payloads.append(self.kw_list)
+
+    def interest_over_time(self):
+        peak = max(self.volumes[kw] for kw in self.kw_list)
+        index = pd.date_range('2025-01-05', periods=12, freq='W')
+        df = pd.DataFrame({kw: [round(self.volumes[kw] / peak * 100)] * len(index) for kw in self.kw_list},
+                          index=index)
+        df['isPartial'] = False
+        return df
+
+def make_client(volumes):
+    pytrends = FakeTrendReq(volumes)
+    pacing = PacingController(min_delay=0.0, sleep=lambda seconds: None)
+    return GoogleTrendsClient(cache=MemoryCache(), pacing=pacing, pytrends=pytrends), pytrends
+
+def test_ladder_rescales_later_groups_to_the_anchor():
+    volumes = {ANCHOR: 10000, 'A': 2000, 'B': 1500, 'C': 1000, 'D': 800,
+               'E': 100, 'F': 50, 'G': 30, 'H': 20}
+    client, pytrends = make_client(volumes)
+    results = client.get_base_scores(list('ABCDEFGH'))
+
+    # Group 1 runs against the anchor; C is its smallest well-resolved term
+    # (raw 10 >= TRENDS_LADDER_MIN_RAW) and becomes group 2's reference
+    assert pytrends.payloads == [[ANCHOR, 'A', 'B', 'C', 'D'], ['C', 'E', 'F', 'G', 'H']]
+    for term in 'ABCDEFGH':
+        assert results[term]['status'] == 'success'
+        assert results[term]['anchor_term'] == ANCHOR
+        # 100 = the anchor's volume
+        assert results[term]['normalized_score'] == pytest.approx(volumes[term] / volumes[ANCHOR] * 100)
+    assert "Ladder via C" in results['E']['notes']
+
+def test_ladder_falls_back_to_the_anchor_when_the_bridge_is_dwarfed():
+    volumes = {ANCHOR: 10000, 'A': 1000, 'B': 900, 'C': 800, 'D': 700,
+               'E': 900000, 'F': 5000, 'G': 4000, 'H': 3000}
+    client, pytrends = make_client(volumes)
+    results = client.get_base_scores(list('ABCDEFGH'))
+
+    # The bridge (A) rounds to zero next to E; the group is redone against the anchor
+    assert [payload[0] for payload in pytrends.payloads] == [ANCHOR, 'A', ANCHOR]
+    assert results['E']['notes'].startswith(f"Anchor: {ANCHOR}")
+    # Coarse (the anchor is 1 on E's scale) but on the anchor's scale, not the bridge's
+    assert results['E']['normalized_score'] == pytest.approx(9000.0, rel=0.2)
+
+def test_cached_terms_skip_live_requests():
+    volumes = {ANCHOR: 10000, 'A': 2000}
+    client, pytrends = make_client(volumes)
+    client.get_base_scores(['A'])
+    again = client.get_base_scores(['A'])
+    assert len(pytrends.payloads) == 1
+    assert again['A']['status'] == 'cached'
+    assert again['A']['normalized_score'] == pytest.approx(20.0)
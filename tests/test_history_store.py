@@ -0,0 +1,51 @@
+import math
+from datetime import date
+from src.history_store import HistoryStore
+from src.reporter import REPORT_COLUMNS
+
+WEEK = HistoryStore.week_of(date(2025, 3, 3))
+
+def media(media_id, popularity, trending=0):
+    return {'id': media_id, 'popularity': popularity, 'trending': trending, 'favourites': 0}
+
+def test_week_of_is_the_monday():
+    assert HistoryStore.week_of(date(2025, 3, 6)) == WEEK
+    assert HistoryStore.week_of(date(2025, 3, 9)) == WEEK
+
+def test_velocity_and_acceleration_over_three_weeks(tmp_path):
+    path = str(tmp_path / 'history.npz')
+    store = HistoryStore(path)
+    store.record([media(1, 100), media(2, 50)], week=WEEK)
+    store.record([media(1, 110), media(2, 50)], week=WEEK + 7)
+    store.record([media(1, 132)], week=WEEK + 14)
+
+    # Reloaded from disk
+    stats = HistoryStore(path).signals([1, 2, 3])
+    assert math.isclose(stats['velocity'][0], 0.2, rel_tol=1e-6)
+    assert math.isclose(stats['acceleration'][0], 0.1, rel_tol=1e-6)
+    assert math.isclose(stats['delta'][0], 22.0)
+    # Missing this week / never seen: no signal
+    assert math.isnan(stats['velocity'][1])
+    assert math.isnan(stats['velocity'][2])
+
+def test_gaps_are_per_week_and_reruns_overwrite_the_week(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.npz'))
+    store.record([media(1, 100)], week=WEEK)
+    store.record([media(1, 999)], week=WEEK + 14)
+    store.record([media(1, 120)], week=WEEK + 14)
+
+    assert len(store.weeks) == 2
+    stats = store.signals([1])
+    assert math.isclose(stats['velocity'][0], 0.1, rel_tol=1e-6)
+    assert math.isnan(stats['acceleration'][0])
+
+def test_movers_rank_by_velocity(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.npz'))
+    store.record([media(1, 100), media(2, 100), media(3, 100)], week=WEEK)
+    store.record([media(1, 110), media(2, 150), media(3, 90)], week=WEEK + 7)
+
+    assert [m['anilist_id'] for m in store.movers(top_n=2)] == [2, 1]
+
+def test_history_columns_come_after_the_original_report_columns():
+    assert REPORT_COLUMNS.index('anilist_velocity') > REPORT_COLUMNS.index('anilist_id')
+    assert REPORT_COLUMNS.index('anilist_acceleration') > REPORT_COLUMNS.index('anilist_id')
@@ -0,0 +1,64 @@
+import csv
+from src.market_gate import MarketGate, FIELDNAMES
+
+def report_row(media_id, title, score=200.0):
+    return {
+        'anilist_id': media_id, 'title_en': title, 'title_native': '', 'score_total': score,
+        'data_quality': 1.0, 'trends_normalized': 20.0, 'anime_adaptation': 'None',
+    }
+
+def read(path):
+    with open(path, encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+def write(path, rows):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_manual_columns_follow_the_anilist_id(tmp_path):
+    output = str(tmp_path / 'buy_list.csv')
+    gate = MarketGate(output_file=output)
+    gate.process([report_row(1, 'Frieren'), report_row(2, 'Dandadan')])
+
+    rows = read(output)
+    for row in rows:
+        if row['AniList ID'] == '1':
+            row['[MANUAL] Sold 30d'] = '42'
+            row['[MANUAL] Result (Pass/Fail)'] = 'Pass'
+    write(output, rows)
+
+    # Next week the English title changed; the ID still matches
+    gate.process([report_row(1, "Frieren: Beyond Journey's End"), report_row(2, 'Dandadan')])
+    rows = {row['AniList ID']: row for row in read(output)}
+    assert rows['1']['Title'] == "Frieren: Beyond Journey's End"
+    assert rows['1']['[MANUAL] Sold 30d'] == '42'
+    assert rows['1']['[MANUAL] Result (Pass/Fail)'] == 'Pass'
+    assert rows['2']['[MANUAL] Sold 30d'] == ''
+
+def test_rows_with_manual_input_are_kept_when_they_drop_out(tmp_path):
+    output = str(tmp_path / 'buy_list.csv')
+    gate = MarketGate(output_file=output)
+    gate.process([report_row(1, 'Frieren'), report_row(2, 'Dandadan')])
+    rows = read(output)
+    rows[0]['[MANUAL] Price Range'] = '10-20'
+    kept_id = rows[0]['AniList ID']
+    write(output, rows)
+
+    gate.process([report_row(3, 'Kagurabachi')])
+    rows = read(output)
+    assert [row['AniList ID'] for row in rows] == ['3', kept_id]
+    assert rows[1]['[MANUAL] Price Range'] == '10-20'
+
+def test_legacy_buy_list_matches_by_title(tmp_path):
+    output = str(tmp_path / 'buy_list.csv')
+    legacy = {c: '' for c in FIELDNAMES if c != 'AniList ID'}
+    legacy.update({'Tier': 'A', 'Title': 'Frieren', '[MANUAL] Sold 30d': '7'})
+    write(output, [legacy])
+
+    MarketGate(output_file=output).process([report_row(1, 'Frieren')])
+    rows = read(output)
+    assert len(rows) == 1
+    assert rows[0]['AniList ID'] == '1'
+    assert rows[0]['[MANUAL] Sold 30d'] == '7'
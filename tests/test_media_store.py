@@ -0,0 +1,60 @@
+import time
+from src.anilist_client import AniListClient
+from src.config import Config
+from src.media_store import MediaStore
+
+def detail(media_id, updated_at, title='Frieren'):
+    return {'id': media_id, 'updatedAt': updated_at, 'title': {'english': title}}
+
+def make_client(tmp_path, fetched):
+    client = AniListClient(store=MediaStore(str(tmp_path / 'anilist_store.db')))
+
+    def fetch_details(ids):
+        fetched.append(list(ids))
+        return {media_id: detail(media_id, None, 'fresh') for media_id in ids}
+    client.fetch_details = fetch_details
+    return client
+
+def test_store_round_trip_and_upsert(tmp_path):
+    store = MediaStore(str(tmp_path / 'anilist_store.db'))
+    store.put_many([detail(1, 100), detail(2, 200, 'Dandadan')])
+    store.put_many([detail(1, 101, 'Sousou no Frieren')])
+
+    found = store.get_many([1, 2, 3])
+    assert sorted(found) == [1, 2]
+    assert found[1]['updatedAt'] == 101
+    assert found[1]['data']['title']['english'] == 'Sousou no Frieren'
+    store.close()
+
+def test_index_expires_after_max_age(tmp_path):
+    store = MediaStore(str(tmp_path / 'anilist_store.db'))
+    store.put_index('TRENDING_DESC:10', [{'id': 1}])
+    assert store.get_index('TRENDING_DESC:10', 3600) == [{'id': 1}]
+    assert store.get_index('TRENDING_DESC:10', -1) is None
+    assert store.get_index('POPULARITY_DESC:10', 3600) is None
+    store.close()
+
+def test_details_refetched_only_when_updated_at_moves(tmp_path):
+    fetched = []
+    client = make_client(tmp_path, fetched)
+    index = [{'id': 1, 'updatedAt': 100}, {'id': 2, 'updatedAt': 200}]
+    client.get_details(index)
+    assert fetched == [[1, 2]]
+
+    details = client.get_details(index)
+    assert len(fetched) == 1
+    assert details[1]['updatedAt'] == 100
+
+    client.get_details([{'id': 1, 'updatedAt': 100}, {'id': 2, 'updatedAt': 201}, {'id': 3, 'updatedAt': 5}])
+    assert fetched[-1] == [2, 3]
+
+def test_details_refetched_when_snapshot_ages_out(tmp_path, monkeypatch):
+    fetched = []
+    client = make_client(tmp_path, fetched)
+    index = [{'id': 1, 'updatedAt': 100}]
+    client.get_details(index)
+    monkeypatch.setattr(Config, 'MEDIA_STORE_MAX_AGE_DAYS', 14)
+    later = time.time() + 15 * 86400
+    monkeypatch.setattr(time, 'time', lambda: later)
+    client.get_details(index)
+    assert fetched == [[1], [1]]
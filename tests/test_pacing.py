@@ -0,0 +1,83 @@
+import pytest
+from src.pacing import PacingController, CircuitOpenError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def make_pacing(**kwargs):
+    clock = FakeClock()
+    options = dict(min_delay=1.0, max_delay=8.0, jitter=0.0, breaker_threshold=3, cooldown=60.0)
+    options.update(kwargs)
+    return PacingController(sleep=clock.sleep, clock=clock, **options), clock
+
+def test_delay_backs_off_on_errors_and_recovers_on_success():
+    pacing, _ = make_pacing()
+    for expected in (2.0, 4.0, 8.0, 8.0):
+        pacing.record_error(Exception("timeout"))
+        assert pacing.delay == expected
+    pacing.record_success()
+    assert pacing.delay == pytest.approx(6.4)
+    for _ in range(20):
+        pacing.record_success()
+    assert pacing.delay == 1.0
+
+def test_requests_are_spaced_by_the_current_delay():
+    pacing, clock = make_pacing()
+    assert pacing.wait("a") == 0.0
+    assert pacing.wait("b") == 1.0
+    pacing.record_error(Exception("timeout"))
+    # The error pushes the next request a full (doubled) delay out
+    assert pacing.wait("c") == pytest.approx(2.0)
+
+def test_breaker_opens_after_consecutive_429s_and_fails_fast():
+    pacing, clock = make_pacing()
+    pacing.record_error(Exception("429 Too Many Requests"))
+    pacing.record_error(Exception("429 Too Many Requests"))
+    assert not pacing.is_open
+    pacing.record_error(Exception("429 Too Many Requests"))
+    assert pacing.is_open
+    slept = len(clock.slept)
+    with pytest.raises(CircuitOpenError):
+        pacing.wait("x")
+    assert len(clock.slept) == slept
+
+def test_success_resets_the_429_count():
+    pacing, _ = make_pacing()
+    for _ in range(2):
+        pacing.record_error(Exception("429"))
+    pacing.record_success()
+    pacing.record_error(Exception("429"))
+    assert not pacing.is_open
+
+def test_systematic_error_opens_at_once():
+    pacing, _ = make_pacing()
+    pacing.record_error(TypeError("__init__() got an unexpected keyword argument 'method_whitelist'"))
+    assert pacing.is_open
+
+def test_half_open_trial_closes_or_reopens_the_breaker():
+    pacing, clock = make_pacing()
+    for _ in range(3):
+        pacing.record_error(Exception("429"))
+    clock.now += 60.0
+    assert not pacing.is_open
+    pacing.wait("trial")
+    # Only one trial request while half-open
+    with pytest.raises(CircuitOpenError):
+        pacing.wait("second")
+    pacing.record_error(Exception("429"))
+    assert pacing.is_open
+
+    clock.now += 60.0
+    pacing.wait("trial")
+    pacing.record_success()
+    assert not pacing.is_open
+    pacing.wait("next")
@@ -0,0 +1,50 @@
+import pytest
+from src.rate_limiter import TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def make_bucket(rate_per_minute=60, burst=2):
+    clock = FakeClock()
+    return TokenBucket(rate_per_minute, burst=burst, clock=clock, sleep=clock.sleep), clock
+
+def test_burst_then_steady_rate():
+    bucket, clock = make_bucket()
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert clock.now == pytest.approx(2.0)
+
+def test_idle_time_refills_up_to_the_burst():
+    bucket, clock = make_bucket()
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 100
+    for _ in range(2):
+        assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+def test_headers_lower_the_rate_and_the_budget():
+    bucket, _ = make_bucket(rate_per_minute=90, burst=5)
+    bucket.update_from_headers({'X-RateLimit-Limit': '30', 'X-RateLimit-Remaining': '1'})
+    assert bucket.rate == pytest.approx(0.5)
+    assert bucket.acquire() == 0.0
+    # Remaining said one token, so the next waits a full refill at the new rate
+    assert bucket.acquire() == pytest.approx(2.0)
+
+def test_retry_after_pauses_the_bucket():
+    bucket, clock = make_bucket()
+    bucket.update_from_headers({'Retry-After': '30', 'X-RateLimit-Limit': 'garbage'})
+    assert bucket.rate == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(30.0)
+    assert clock.now == pytest.approx(30.0)
@@ -0,0 +1,40 @@
+from src.reddit_stream import AhoCorasick, TitleIndex, RedditStreamMatcher
+
+def test_reports_overlapping_and_nested_patterns():
+    automaton = AhoCorasick({'he': ['he'], 'she': ['she'], 'his': ['his'], 'hers': ['hers']})
+    matches = sorted(automaton.iter_matches("ushers"))
+    assert matches == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+def test_pattern_payloads_are_all_reported():
+    automaton = AhoCorasick({'abc': ['x', 'y'], 'bc': ['z']})
+    assert sorted(payload for _, _, payload in automaton.iter_matches("xabc")) == ['x', 'y', 'z']
+
+def test_overlapping_aliases_match_both_titles():
+    index = TitleIndex({'Dragon Ball': ['Dragon Ball'], 'Dragon Ball Super': ['Dragon Ball Super']},
+                       intent_keywords=['figure'], min_length=3)
+    titles, intent = index.scan("Got the Dragon Ball Super figure today")
+    assert titles == {'Dragon Ball', 'Dragon Ball Super'}
+    assert intent
+
+def test_latin_aliases_match_whole_words_only():
+    index = TitleIndex({'Naruto': ['Naruto']}, intent_keywords=['buy'], min_length=3)
+    assert index.scan("narutomaki ramen")[0] == set()
+    assert index.scan("Naruto!")[0] == {'Naruto'}
+    # CJK titles have no word spacing and match anywhere
+    cjk = TitleIndex({'Frieren': ['葬送のフリーレン']}, intent_keywords=['buy'], min_length=3)
+    assert cjk.scan("新刊の葬送のフリーレンを買った")[0] == {'Frieren'}
+
+def test_matcher_counts_mentions_and_intent_posts():
+    posts = [
+        {'kind': 'submission', 'text': "Where to buy Frieren merch?", 'score': 5},
+        {'kind': 'comment', 'text': "Sousou no Frieren is great", 'score': 2},
+        {'kind': 'comment', 'text': "unrelated", 'score': 9},
+    ]
+    matcher = RedditStreamMatcher(posts=posts)
+    signals = matcher.get_signals_many(['Frieren'], {'Frieren': ['Frieren', 'Sousou no Frieren']})
+    assert signals['Frieren']['reddit_mentions'] == 2
+    assert signals['Frieren']['reddit_velocity'] == 1
+    assert signals['Frieren']['intent_score'] == 15
+
+def test_matcher_without_client_or_posts_is_disabled():
+    assert RedditStreamMatcher().get_signals_many(['Frieren'])['Frieren']['status'] == 'disabled'
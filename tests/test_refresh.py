@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from src.cache_store import MemoryCache
+from src.google_trends_client import GoogleTrendsClient
+from src.refresh import RefreshScheduler
+
+DAY = 86400
+
+def make_scheduler(budget, horizon_days=1.0):
+    client = SimpleNamespace(cache=MemoryCache())
+    return RefreshScheduler(client, budget=budget, horizon_days=horizon_days), client.cache
+
+def cache_base(cache, term, days, namespace=GoogleTrendsClient.BASE_CACHE_NAMESPACE):
+    cache.set(term, {'normalized_score': 10.0, 'anchor_term': 'One Piece'}, days * DAY, namespace=namespace)
+
+def cache_intent(cache, term, days):
+    cache.set(term, {'intent_manga': 1.0}, days * DAY, namespace=GoogleTrendsClient.INTENT_CACHE_NAMESPACE)
+
+def test_base_terms_pack_into_requests_and_intents_cost_one_each():
+    scheduler, cache = make_scheduler(budget=2)
+    terms = [f"Title {i}" for i in range(6)]
+    scheduler.track(terms)
+    for term in terms:
+        cache_base(cache, term, 0.5)
+    cache_intent(cache, 'Title 5', 0.5)
+
+    base_terms, intent_items = scheduler.plan()
+    # Six packed base terms are two requests; the lowest-ranked intent does not fit
+    assert base_terms == terms
+    assert intent_items == []
+
+    scheduler.budget = 3
+    base_terms, intent_items = scheduler.plan()
+    assert intent_items == [('Title 5', 'One Piece')]
+
+def test_soonest_expiry_first_then_rank():
+    scheduler, cache = make_scheduler(budget=1, horizon_days=3)
+    scheduler.track(['Frieren', 'Dandadan', 'Sakamoto Days', 'Kagurabachi', 'Blue Box'])
+    cache_base(cache, 'Frieren', 2.5)
+    cache_base(cache, 'Dandadan', 0.5)
+    cache_base(cache, 'Sakamoto Days', 0.2)
+    cache_base(cache, 'Kagurabachi', 30)
+    # 'Blue Box' has no entry at all: overdue, but last in rank
+
+    base_terms, _ = scheduler.plan()
+    assert base_terms == ['Dandadan', 'Sakamoto Days', 'Blue Box', 'Frieren']
+
+def test_full_signals_entries_count_as_base_and_intent():
+    scheduler, cache = make_scheduler(budget=10)
+    scheduler.track(['Frieren', 'Dandadan'])
+    cache.set('Frieren', {'normalized_score': 10.0, 'anchor_term': 'Naruto'}, 30 * DAY,
+              namespace=GoogleTrendsClient.CACHE_NAMESPACE)
+    cache_base(cache, 'Frieren', 0.5)
+    cache_intent(cache, 'Frieren', 0.5)
+    cache_base(cache, 'Dandadan', 0.5, namespace=GoogleTrendsClient.CACHE_NAMESPACE)
+
+    base_terms, intent_items = scheduler.plan()
+    # Frieren's fresh get_signals entry covers both; Dandadan's is due for both
+    assert base_terms == ['Dandadan']
+    assert intent_items == [('Dandadan', 'One Piece')]
+
+def test_untracked_and_zero_budget_plan_nothing():
+    scheduler, cache = make_scheduler(budget=10)
+    cache_base(cache, 'Frieren', 0.5)
+    assert scheduler.plan() == ([], [])
+    scheduler.track(['Frieren'])
+    assert scheduler.plan() == (['Frieren'], [])
+    scheduler.budget = 0
+    assert scheduler.plan() == ([], [])
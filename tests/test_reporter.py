@@ -0,0 +1,59 @@
+import json
+import os
+import sqlite3
+import pytest
+from src.reporter import CSVSink, Reporter
+
+COLUMNS = ['title_en', 'score_total', 'reddit_posts', 'anilist_id']
+ROWS = [
+    {'title_en': 'Frieren', 'score_total': 212.5, 'reddit_posts': 5, 'anilist_id': 1},
+    {'title_en': 'Dandadan', 'score_total': float('nan'), 'reddit_posts': None, 'anilist_id': 2},
+]
+
+def test_csv_keeps_bom_column_order_and_blank_cells(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    with CSVSink(path, COLUMNS) as sink:
+        sink.write_rows(ROWS)
+
+    with open(path, 'rb') as f:
+        assert f.read(3) == b'\xef\xbb\xbf'
+    with open(path, encoding='utf-8-sig') as f:
+        lines = f.read().splitlines()
+    assert lines == ['title_en,score_total,reddit_posts,anilist_id', 'Frieren,212.5,5,1', 'Dandadan,,,2']
+    assert not os.path.exists(path + '.partial')
+
+def test_every_format_gets_the_same_rows(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    with Reporter.open(path, ['csv', 'jsonl', 'sqlite']) as sink:
+        sink.write_rows(ROWS)
+
+    with open(tmp_path / 'report.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [r['title_en'] for r in records] == ['Frieren', 'Dandadan']
+    assert records[1]['score_total'] is None and records[1]['reddit_posts'] is None
+
+    conn = sqlite3.connect(str(tmp_path / 'report.db'))
+    try:
+        rows = conn.execute('SELECT title_en, score_total, anilist_id FROM report').fetchall()
+    finally:
+        conn.close()
+    assert rows == [('Frieren', 212.5, 1), ('Dandadan', None, 2)]
+
+def test_failed_run_keeps_the_previous_report(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    with CSVSink(path, COLUMNS) as sink:
+        sink.write_rows(ROWS[:1])
+
+    with pytest.raises(RuntimeError):
+        with CSVSink(path, COLUMNS) as sink:
+            sink.write_rows(ROWS)
+            raise RuntimeError("enrichment died")
+
+    with open(path, encoding='utf-8-sig') as f:
+        assert len(f.read().splitlines()) == 2
+    with open(path + '.partial', encoding='utf-8-sig') as f:
+        assert len(f.read().splitlines()) == 3
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Reporter.open(str(tmp_path / 'report.csv'), ['parquet'])
@@ -0,0 +1,171 @@
+import math
+from src.scoring import build_base_frame, score_rows
+from src.reddit_client import RedditClient
+from src.config import Config
+from src.reporter import REPORT_COLUMNS, report_columns
+
+def media(media_id, title, popularity, trending=0, status='RELEASING'):
+    return {'id': media_id, 'title': {'english': title, 'native': ''}, 'popularity': popularity,
+            'trending': trending, 'status': status, 'relations': {'edges': []}}
+
+ITEMS = [media(1, 'Frieren', 90000, 40), media(2, 'Dandadan', 60000, 120), media(3, 'Sakamoto Days', 30000)]
+
+def trends(score, status='success'):
+    return {'base_score': score, 'intent_manga': score / 2, 'intent_merch': score / 4,
+            'velocity': 0.1, 'status': status, 'anchor_term': 'One Piece', 'data_quality': 1.0}
+
+def test_reddit_columns_are_blank_when_reddit_is_off():
+    frame = build_base_frame(ITEMS)
+    rows = score_rows(frame, [trends(30), None, None])
+    assert all(row['reddit_posts'] is None and row['reddit_intent_score'] is None for row in rows)
+
+    disabled = [RedditClient._empty_result('disabled')] * 3
+    rows = score_rows(frame, [trends(30), None, None], disabled)
+    assert all(row['reddit_posts'] is None and row['reddit_intent_score'] is None for row in rows)
+
+def test_reddit_columns_carry_measured_values():
+    frame = build_base_frame(ITEMS)
+    reddit = [{'intent_score': 4, 'reddit_velocity': 7, 'status': 'success'},
+              RedditClient._empty_result('error_api'),
+              {'intent_score': 0, 'reddit_velocity': 0, 'status': 'cached'}]
+    rows = {row['anilist_id']: row for row in score_rows(frame, [None] * 3, reddit)}
+    assert (rows[1]['reddit_posts'], rows[1]['reddit_intent_score']) == (7, 4)
+    assert rows[2]['reddit_posts'] is None
+    assert (rows[3]['reddit_posts'], rows[3]['reddit_intent_score']) == (0, 0)
+
+def test_reddit_columns_come_after_the_original_report_columns():
+    assert REPORT_COLUMNS.index('reddit_posts') > REPORT_COLUMNS.index('anilist_id')
+    assert REPORT_COLUMNS.index('reddit_intent_score') > REPORT_COLUMNS.index('anilist_id')
+
+def test_region_columns_are_appended_last(monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', ['US', 'FR'])
+    columns = report_columns()
+    assert columns[:len(REPORT_COLUMNS)] == REPORT_COLUMNS
+    assert columns[len(REPORT_COLUMNS):] == ['trends_us', 'trends_fr']
+
+def baseline_rows(anilist_data, signals, trends_limit):
+    """The per-row scoring loop DataProcessor.process ran before score_rows (kept as the reference)."""
+    def is_valid(v): return v is not None and not math.isnan(v)
+    def safe_val(v, default=0.0): return v if is_valid(v) else default
+
+    pre_processed = []
+    for item in anilist_data:
+        titles = item.get('title', {})
+        search_term = titles.get('english') or titles.get('romaji', 'Unknown')
+        score_anilist = ((item.get('popularity', 0) or 0) / 1000) + ((item.get('trending', 0) or 0) / 10)
+        anime_status = "None"
+        for edge in item.get('relations', {}).get('edges', []):
+            if edge.get('relationType') == 'ADAPTATION':
+                node = edge.get('node', {})
+                if node.get('type') == 'ANIME':
+                    status = node.get('status')
+                    if status == 'RELEASING':
+                        anime_status = "Airing"
+                        break
+                    elif status == 'NOT_YET_RELEASED':
+                        anime_status = "Announced"
+                    elif status == 'FINISHED' and anime_status == "None":
+                        anime_status = "Finished"
+        pre_processed.append((item, search_term, titles.get('native', ''), score_anilist, anime_status))
+    pre_processed.sort(key=lambda x: x[3], reverse=True)
+
+    results = []
+    for idx, (item, search_term, native, score_anilist, anime_status) in enumerate(pre_processed):
+        check_trends = idx < trends_limit
+        if check_trends:
+            data = signals[search_term]
+            intent_manga = data.get('intent_manga', float('nan'))
+            intent_merch = data.get('intent_merch', float('nan'))
+            velocity = data.get('velocity', float('nan'))
+            norm_score = data.get('normalized_score', float('nan'))
+            trends_status = data.get('status', 'unknown')
+            anchor_term = data.get('anchor_term', 'None')
+        else:
+            intent_manga = intent_merch = velocity = norm_score = 0.0
+            trends_status, anchor_term = 'skipped', 'None'
+
+        velocity_score = 0.0
+        if check_trends and is_valid(velocity) and is_valid(norm_score) and norm_score >= 0.5:
+            velocity_score = min(velocity, 2.0) * 50
+        data_quality = 1.0
+        if trends_status == 'skipped':
+            data_quality = 0.5
+        elif not is_valid(norm_score):
+            data_quality = 0.1
+        elif trends_status.startswith('cached'):
+            data_quality = 0.8
+        score_intent_manga = safe_val(intent_manga) * 1.5
+        if data_quality < 0.5 or trends_status == 'skipped':
+            total_score = score_anilist
+        else:
+            total_score = score_anilist + score_intent_manga + velocity_score
+
+        sku_goods = []
+        if safe_val(intent_merch) > 20:
+            sku_goods.append("Scale Figure")
+        elif safe_val(intent_merch) > 5:
+            sku_goods.append("Acrylic Stand")
+        if safe_val(velocity) > 0.5:
+            sku_goods.append("Preorder Bonus")
+        if anime_status == 'Announced':
+            sku_goods.append("Anime Hype Investment")
+        if not sku_goods:
+            sku_goods.append("General Merch")
+
+        results.append({
+            'title_native': native, 'title_en': search_term, 'anilist_id': item.get('id'),
+            'anilist_popularity': item.get('popularity', 0), 'anilist_trending': item.get('trending', 0),
+            'score_total': round(total_score, 2), 'score_anilist': round(score_anilist, 2),
+            'score_intent_manga': round(safe_val(intent_manga), 2),
+            'score_intent_merch': round(safe_val(intent_merch), 2),
+            'score_velocity': round(velocity_score, 2),
+            'trends_normalized': round(safe_val(norm_score), 2), 'trends_status': trends_status,
+            'data_quality': data_quality, 'anchor_term': anchor_term, 'anime_adaptation': anime_status,
+            'recommended_sku_manga': "Vol 1 (New)" if item.get('status') == 'RELEASING' else "Complete Set (Used)",
+            'recommended_sku_goods': ", ".join(sku_goods),
+            'notes': f"Vel: {safe_val(velocity):.1%}, Status: {trends_status}",
+        })
+    results.sort(key=lambda x: x['score_total'], reverse=True)
+    return results
+
+def adapted(media_id, romaji, popularity, trending, status, *anime, english=None):
+    edges = [{'relationType': 'ADAPTATION', 'node': {'type': 'ANIME', 'status': s}} for s in anime]
+    edges.append({'relationType': 'SEQUEL', 'node': {'type': 'ANIME', 'status': 'RELEASING'}})
+    return {'id': media_id, 'title': {'romaji': romaji, 'english': english, 'native': f'n{media_id}'},
+            'popularity': popularity, 'trending': trending, 'status': status, 'relations': {'edges': edges}}
+
+FIXED_ITEMS = [
+    adapted(1, 'Sousou no Frieren', 90000, 40, 'RELEASING', 'FINISHED', 'RELEASING', english='Frieren'),
+    adapted(2, 'Dandadan', 60000, 120, 'RELEASING', 'NOT_YET_RELEASED', 'FINISHED'),
+    adapted(3, 'Sakamoto Days', 45000, 15, 'FINISHED', 'FINISHED'),
+    adapted(4, 'Kagurabachi', 30000, 300, 'RELEASING', 'NOT_YET_RELEASED'),
+    adapted(5, 'Blue Box', 1005, 0, 'RELEASING'),
+    adapted(6, 'Kaiju No. 8', 25000, None, 'FINISHED', 'RELEASING'),
+    adapted(7, 'Akane-banashi', None, 20, 'RELEASING'),
+    adapted(8, 'Ichi the Witch', 500, 0, 'RELEASING'),
+]
+FIXED_SIGNALS = {
+    'Frieren': {'normalized_score': 42.123, 'intent_manga': 12.345, 'intent_merch': 25.0, 'velocity': 0.75,
+                'status': 'success', 'anchor_term': 'One Piece'},
+    'Dandadan': {'normalized_score': 18.0, 'intent_manga': 6.0, 'intent_merch': 8.0, 'velocity': 3.5,
+                 'status': 'cached', 'anchor_term': 'Naruto'},
+    'Sakamoto Days': {'normalized_score': float('nan'), 'status': 'error_api'},
+    'Kagurabachi': {'normalized_score': 0.3, 'intent_manga': float('nan'), 'intent_merch': 4.0,
+                    'velocity': 1.2, 'status': 'success', 'anchor_term': 'Naruto'},
+    'Blue Box': {'normalized_score': 2.0, 'intent_manga': 0.335, 'intent_merch': 5.0, 'velocity': -0.2,
+                 'status': 'cached_stale', 'anchor_term': 'One Piece'},
+    'Kaiju No. 8': {'normalized_score': 9.0, 'status': 'no_data'},
+    'Akane-banashi': {'normalized_score': 0.5, 'intent_manga': 1.0, 'velocity': 0.4, 'status': 'success'},
+}
+
+def test_score_rows_matches_the_per_row_loop():
+    trends_limit = 7
+    frame = build_base_frame(FIXED_ITEMS)
+    trends_data = [FIXED_SIGNALS[term] if i < trends_limit else None
+                   for i, term in enumerate(frame['search_term'].tolist())]
+    rows = score_rows(frame, trends_data)
+    expected = baseline_rows(FIXED_ITEMS, FIXED_SIGNALS, trends_limit)
+
+    assert [row['anilist_id'] for row in rows] == [row['anilist_id'] for row in expected]
+    for row, old in zip(rows, expected):
+        assert {key: row[key] for key in old} == old
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from src.checkpoint import CheckpointStore
+from src.config import Config
+from src.processor import DataProcessor
+from src.selection import TrendsSelector, expected_rank_gain
+
+class FakeCacheView:
+    """The cached_* lookups TrendsSelector asks the Trends client for."""
+    def __init__(self, base=(), intents=(), regional=None):
+        self.base = {term: {'normalized_score': 50.0, 'status': 'cached'} for term in base}
+        self.intents = {term: {} for term in intents}
+        self.regional = regional or {}
+
+    def cached_base_scores(self, terms):
+        return {term: self.base[term] for term in terms if term in self.base}
+
+    def cached_intents(self, terms):
+        return {term: self.intents[term] for term in terms if term in self.intents}
+
+    def cached_regional_base_scores(self, terms_by_geo):
+        return {geo: {term: {} for term in terms if term in self.regional.get(geo, ())}
+                for geo, terms in terms_by_geo.items()}
+
+@pytest.fixture
+def no_regions(monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', [])
+
+def test_expected_rank_gain_favours_titles_near_the_top():
+    scores = np.array([100.0, 90.0, 80.0, 10.0, 5.0])
+    gains = expected_rank_gain(scores, np.array([80.0, 5.0]), uplift=15.0)
+    # #3 -> #2 beats #5 -> #4 in reciprocal rank
+    assert gains[0] == pytest.approx(1 / 2 - 1 / 3)
+    assert gains[1] == pytest.approx(1 / 4 - 1 / 5)
+
+def test_base_phase_takes_at_most_its_share_and_cached_titles_are_free(no_regions, monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDS_BASE_BUDGET_SHARE', 0.2)
+    terms = [f"T{i}" for i in range(30)]
+    selector = TrendsSelector(FakeCacheView(base=['T29']), budget=10)
+    selected = selector.select(terms, list(range(30, 0, -1)))
+    # ceil(10 * 0.2) = 2 requests = 8 live titles, plus the cached one
+    assert len(selected) == 9
+    assert 'T29' in selected
+    assert selector.spent == 2
+    assert selector.remaining == 8
+
+def test_partial_payload_costs_a_whole_request(no_regions):
+    selector = TrendsSelector(FakeCacheView(), budget=10)
+    selector.select(['A', 'B', 'C', 'D', 'E'], [5, 4, 3, 2, 1])
+    assert selector.spent == 2
+
+def test_intents_use_what_the_base_phase_left(no_regions):
+    selector = TrendsSelector(FakeCacheView(intents=['X']), budget=5)
+    selector.spent = 2
+    picked = selector.limit_intents(['A', 'X', 'B', 'C', 'D'])
+    assert picked == ['A', 'X', 'B', 'C']
+    assert selector.spent == 5
+
+def test_intents_keep_the_regional_reserve(monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', ['US', 'FR'])
+    monkeypatch.setattr(Config, 'TRENDS_REGION_TOP_N', 8)
+    selector = TrendsSelector(FakeCacheView(), budget=10)
+    assert selector.region_reserve() == 4
+    assert len(selector.limit_intents([f"T{i}" for i in range(10)])) == 6
+    assert selector.remaining == 4
+
+def test_regions_pack_titles_and_skip_cached_lookups():
+    selector = TrendsSelector(FakeCacheView(regional={'US': ['A']}), budget=2)
+    picked = selector.limit_regions(['A', 'B', 'C', 'D', 'E', 'F'], ['US', 'FR'])
+    # One request per region covers four live titles; US has A cached
+    assert picked == {'US': ['A', 'B', 'C', 'D', 'E'], 'FR': ['A', 'B', 'C', 'D']}
+    assert selector.spent == 2
+
+def test_budget_zero_uses_the_cache_only(monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', ['US'])
+    view = FakeCacheView(base=['A'], intents=['A'], regional={'US': ['A']})
+    selector = TrendsSelector(view, budget=0)
+    assert selector.select(['A', 'B'], [2, 1]) == ['A']
+    assert selector.limit_intents(['A', 'B']) == ['A']
+    assert selector.limit_regions(['A', 'B'], ['US']) == {'US': ['A']}
+    assert selector.spent == 0
+
+def test_picks_are_reused_from_the_checkpoint(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path))
+    first = TrendsSelector(FakeCacheView(), budget=10)
+
+    def pick():
+        first.spent += 3
+        return ['A', 'B']
+    assert DataProcessor._pick(checkpoint, 'base', first, pick) == ['A', 'B']
+
+    # After a crash the fetched titles are cached; the saved picks and spend still win
+    resumed = TrendsSelector(FakeCacheView(base=['A', 'B']), budget=10)
+    assert DataProcessor._pick(checkpoint, 'base', resumed, lambda: ['A', 'B', 'C', 'D']) == ['A', 'B']
+    assert resumed.spent == 3
+
+    # A different budget selects anew
+    other = TrendsSelector(FakeCacheView(), budget=4)
+    assert DataProcessor._pick(checkpoint, 'base', other, lambda: ['Z']) == ['Z']
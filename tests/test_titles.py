@@ -0,0 +1,33 @@
+from src.titles import AliasIndex, canonical_title
+
+def test_canonical_title_ignores_case_and_punctuation():
+    assert canonical_title("One-Punch Man") == canonical_title("ONE PUNCH MAN")
+    assert canonical_title("Frieren: Beyond Journey's End") == "frieren beyond journeys end"
+
+def test_items_sharing_a_name_get_the_first_term():
+    index = AliasIndex()
+    index.add("Frieren: Beyond Journey's End", ["Sousou no Frieren", "葬送のフリーレン"])
+    index.add("Sousou no Frieren", ["Sousou no Frieren"])
+    assert index.representative("Sousou no Frieren") == "Frieren: Beyond Journey's End"
+    assert index.representative("葬送のフリーレン") == "Frieren: Beyond Journey's End"
+
+def test_groups_merge_transitively_and_keep_the_older_representative():
+    index = AliasIndex()
+    index.add("A Title", ["Alpha"])
+    index.add("B Title", ["Beta"])
+    index.add("C Title", ["Gamma"])
+    assert index.representative("B Title") == "B Title"
+    # An item named both Beta and Alpha joins the A and B groups
+    index.add("D Title", ["Beta", "Alpha"])
+    for term in ("A Title", "B Title", "D Title", "Alpha", "Beta"):
+        assert index.representative(term) == "A Title"
+    assert index.representative("C Title") == "C Title"
+
+def test_short_aliases_do_not_merge():
+    index = AliasIndex()
+    index.add("Blue Lock", ["BL"])
+    index.add("Boys Love Anthology", ["BL"])
+    assert index.representative("Boys Love Anthology") == "Boys Love Anthology"
+
+def test_unknown_term_is_its_own_representative():
+    assert AliasIndex().representative("Naruto") == "Naruto"
@@ -0,0 +1,84 @@
+import threading
+import time
+from src.cache_store import MemoryCache
+from src.checkpoint import CheckpointStore
+from src.config import Config
+from src.google_trends_client import GoogleTrendsClient
+from src.pacing import PacingController
+from src.processor import DataProcessor
+from src.trends_pool import TrendsWorkerPool, TrendsWorkerConfig
+
+class FakeWorker:
+    """Stands in for a GoogleTrendsClient worker; `failures` calls raise first."""
+    def __init__(self, name, cache, failures=0):
+        self.name = name
+        self.cache = cache
+        self.pacing = PacingController(min_delay=0.0, sleep=lambda s: None)
+        self.failures = failures
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _call(self, terms):
+        with self.lock:
+            self.calls.append(list(terms))
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("database is locked")
+        # Long enough for the other workers to pick up their share
+        time.sleep(0.02)
+
+    def get_base_scores(self, terms, refresh=False):
+        self._call(terms)
+        return {term: {'normalized_score': 1.0, 'status': 'success', 'worker': self.name} for term in terms}
+
+    def get_signals(self, term):
+        self._call([term])
+        return {'normalized_score': 1.0, 'status': 'success', 'worker': self.name}
+
+def make_pool(*failures):
+    configs = [TrendsWorkerConfig(f"worker-{i}") for i in range(len(failures))]
+    failing = dict(zip((config.name for config in configs), failures))
+    return TrendsWorkerPool(configs, cache=MemoryCache(),
+                            client_factory=lambda config, cache, anchors: FakeWorker(config.name, cache,
+                                                                                     failing[config.name]))
+
+def test_failed_chain_is_handed_to_another_worker():
+    pool = make_pool(0, 1)
+    terms = [f"T{i}" for i in range(48)]
+    results = pool.get_base_scores(terms)
+    assert set(results) == set(terms)
+    assert all(result['status'] == 'success' for result in results.values())
+    # The failing worker stops taking work after handing its chain over
+    assert len(pool.workers[1].calls) == 1
+
+def test_terms_of_a_task_nobody_can_run_get_error_results():
+    pool = make_pool(10 ** 6)
+    results = pool.get_base_scores(['A', 'B'])
+    assert {term: result['status'] for term, result in results.items()} == {'A': 'error_unknown', 'B': 'error_unknown'}
+
+def test_retries_are_bounded():
+    pool = make_pool(10 ** 6, 10 ** 6)
+    results = pool.get_base_scores(['A'])
+    assert results['A']['status'] == 'error_unknown'
+    # One hand-off at most (none if the other worker already found the queue empty)
+    assert sum(len(worker.calls) for worker in pool.workers) <= 1 + TrendsWorkerPool.TASK_RETRIES
+
+def test_signals_run_on_every_worker():
+    pool = make_pool(0, 0, 0)
+    results = pool.get_signals_many([f"T{i}" for i in range(30)])
+    assert len(results) == 30
+    assert {result['worker'] for result in results.values()} == {'worker-0', 'worker-1', 'worker-2'}
+
+def test_checkpoint_chunks_fill_every_worker(tmp_path):
+    chain = GoogleTrendsClient.TITLES_PER_PAYLOAD * Config.TRENDS_POOL_CHAIN_GROUPS
+    assert make_pool(0).checkpoint_chunk_size >= Config.CHECKPOINT_CHUNK_SIZE
+    pool = make_pool(0, 0, 0, 0)
+    assert pool.checkpoint_chunk_size == 4 * chain
+
+    processor = DataProcessor(pool)
+    terms = [f"T{i}" for i in range(8 * chain)]
+    checkpoint = CheckpointStore(str(tmp_path))
+    results = processor._run_units('base', terms, pool.get_base_scores, checkpoint, False, 'status')
+    assert len(results) == len(terms)
+    assert {result['worker'] for result in results.values()} == {f"worker-{i}" for i in range(4)}
+    assert len(checkpoint.load_units('base')) == len(terms)
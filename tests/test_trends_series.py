@@ -0,0 +1,100 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from bench.fakes import FakeAniListSession, FakeTrendReq, RequestCounter
+from bench.fixtures import Fixtures
+from src.anilist_client import AniListClient
+from src.cache_store import MemoryCache
+from src.checkpoint import CheckpointStore
+from src.config import Config
+from src.google_trends_client import GoogleTrendsClient
+from src.pacing import PacingController
+from src.processor import DataProcessor
+from src.trends_series import pack_series, unpack_series, derive_signals, rederive, step_velocity, window_velocity
+
+def make_frame(columns):
+    index = pd.date_range('2025-01-05', periods=len(next(iter(columns.values()))), freq='W')
+    return pd.DataFrame(columns, index=index)
+
+def test_pack_unpack_round_trip():
+    df = make_frame({'Anchor': [50, 60, 70, 80], 'Title': [1, 2, 3, 4]})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Anchor'}, anchor='Anchor')
+    assert record['dtype'] == 'uint8'
+    assert record['start'] == '2025-01-05'
+    series = unpack_series(record)
+    np.testing.assert_array_equal(series['term'], [1, 2, 3, 4])
+    np.testing.assert_array_equal(series['reference'], [50, 60, 70, 80])
+
+def test_non_integer_series_are_stored_as_float32():
+    df = make_frame({'Anchor': [50.5, 60.0], 'Title': [1.25, 2.0]})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Anchor'})
+    assert record['dtype'] == 'float32'
+    np.testing.assert_allclose(unpack_series(record)['term'], [1.25, 2.0])
+
+def test_derive_signals_from_anchor_series():
+    # Last row is the partial week
+    df = make_frame({'Anchor': [100, 100, 100, 100, 100], 'Title': [10, 10, 20, 30, 40]})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Anchor'}, anchor='Anchor', reference_norm=100.0)
+    signals = derive_signals(record, window=2, velocity='step')
+    assert signals['normalized_score'] == pytest.approx(35.0)
+    assert signals['velocity'] == pytest.approx(0.5)  # 30 vs 20
+    assert signals['anchor_value'] == pytest.approx(100.0)
+    assert 'intent_manga' not in signals
+
+def test_derive_signals_through_a_ladder_bridge():
+    # The bridge term is worth 10 on the anchor's scale
+    df = make_frame({'Bridge': [100] * 4, 'Title': [50] * 4})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Bridge'}, reference_norm=10.0)
+    signals = derive_signals(record, window=4)
+    assert signals['normalized_score'] == pytest.approx(5.0)
+    assert signals['anchor_value'] == pytest.approx(1000.0)
+
+def test_derive_intent_signals():
+    df = make_frame({'Anchor': [80] * 4, 'M': [40] * 4, 'F': [8] * 4, 'G': [16] * 4})
+    record = pack_series(df, {'reference': 'Anchor', 'manga': 'M', 'figure': 'F', 'merch': 'G'})
+    signals = derive_signals(record, window=4)
+    assert signals['intent_manga'] == pytest.approx(50.0)
+    assert signals['intent_merch'] == pytest.approx(20.0)
+    assert 'normalized_score' not in signals
+
+def test_zero_reference_gives_nan():
+    df = make_frame({'Anchor': [0] * 4, 'Title': [5] * 4})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Anchor'})
+    assert math.isnan(derive_signals(record, window=4)['normalized_score'])
+
+def test_velocity_variants_ignore_the_partial_week():
+    series = np.array([10, 10, 10, 10, 20, 20, 20, 20, 999], dtype=float)
+    assert step_velocity(series) == pytest.approx(0.0)
+    assert window_velocity(series, window=4) == pytest.approx(1.0)
+    assert math.isnan(window_velocity(series[:5], window=4))
+
+def test_rederive_updates_only_existing_keys():
+    df = make_frame({'Anchor': [100] * 4, 'Title': [25] * 4})
+    record = pack_series(df, {'term': 'Title', 'reference': 'Anchor'})
+    data = {'normalized_score': 1.0, 'status': 'success', 'notes': 'x'}
+    updated = rederive(data, record, window=4)
+    assert updated == {'normalized_score': 25.0, 'status': 'success', 'notes': 'x'}
+    assert data['normalized_score'] == 1.0
+
+def test_recompute_then_budget_zero_rescoring_is_cache_only(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'TRENDS_GEOS', ['US'])
+    fixtures = Fixtures.generate(120, seed=1)
+    counter = RequestCounter()
+    anilist = AniListClient()
+    anilist.session = FakeAniListSession(fixtures, counter)
+    candidates = anilist.get_candidates(target_count=60)
+    client = GoogleTrendsClient(cache=MemoryCache(), pacing=PacingController(min_delay=0.0, sleep=lambda s: None),
+                                pytrends=FakeTrendReq(fixtures, counter))
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoints'))
+    first = DataProcessor(client).process(candidates, batch_mode=True, checkpoint=checkpoint, trends_budget=20)
+    live = counter.counts['trends']
+    assert live > 0
+
+    assert sum(client.recompute(window=2).values()) > 0
+    checkpoint.drop('selection', 'signals', 'base', 'intent', 'regions', 'results')
+    again = DataProcessor(client).process(candidates, batch_mode=True, checkpoint=checkpoint, trends_budget=0)
+    assert counter.counts['trends'] == live
+    enriched = lambda rows: {row['anilist_id'] for row in rows if row['trends_status'] != 'skipped'}
+    assert enriched(again) == enriched(first)